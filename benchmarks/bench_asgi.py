@@ -0,0 +1,183 @@
+"""Load test: async stats views under ASGI vs the WSGI deployment.
+
+Usage::
+
+    python -m benchmarks.bench_asgi [--concurrency 8,64,256] [--duration 10]
+                                    [--path /api/dashboard/] [--threads 8]
+
+Seeds a throw-away database with ``generate_load_data`` (``--users``,
+``--vacations``, ``--likes``), then serves the stats backend from a child
+process, once per server:
+
+* ``wsgi`` – the threaded WSGI server of bench_db_pool with ``--threads``
+  workers (a threaded gunicorn/uwsgi worker); views run their aggregates
+  one after another
+* ``asgi`` – ``uvicorn stats_backend.asgi:application``, one worker; the
+  dashboard aggregates run concurrently on ``STATS_QUERY_WORKERS`` threads
+
+Both use the psycopg3 pool (``DB_POOL=1``) with the result cache disabled,
+so every request reaches the database. At each concurrency level, that many
+asyncio clients in this process send requests back to back for
+``--duration`` seconds (one connection per request, as wsgiref speaks
+HTTP/1.0).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from io import StringIO
+from typing import Dict, List, Tuple
+
+from benchmarks.common import setup_django, test_database
+
+SERVERS = ("wsgi", "asgi")
+NO_CACHE: Dict[str, str] = {
+    f"STATS_CACHE_TTL_{name}": "0"
+    for name in ("VACATIONS", "USERS", "LIKES", "DISTRIBUTION", "DASHBOARD", "TREND", "HISTORY",
+                 "OCCUPANCY")
+}
+
+
+def _serve_wsgi(port: int, threads: int) -> None:
+    """Child process: serve the stats backend from the worker-pool WSGI server."""
+    setup_django()
+    from django.core.wsgi import get_wsgi_application
+    from wsgiref.simple_server import make_server
+    from benchmarks.bench_db_pool import _QuietHandler, _WorkerPoolServer
+
+    _WorkerPoolServer.workers = threads
+    _WorkerPoolServer.request_queue_size = 1024
+    make_server("127.0.0.1", port, get_wsgi_application(),
+                server_class=_WorkerPoolServer, handler_class=_QuietHandler).serve_forever()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start(server: str, port: int, env: Dict[str, str], threads: int) -> subprocess.Popen:
+    if server == "asgi":
+        command = [sys.executable, "-m", "uvicorn", "stats_backend.asgi:application",
+                   "--port", str(port), "--log-level", "warning", "--no-access-log",
+                   "--backlog", "1024"]
+    else:
+        command = [sys.executable, "-m", "benchmarks.bench_asgi", "--serve", str(port),
+                   "--threads", str(threads)]
+    process = subprocess.Popen(command, env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"{server} server did not start on port {port}")
+
+
+async def _request(port: int, raw: bytes) -> Tuple[int, float]:
+    started = time.perf_counter()
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(raw)
+    data = await reader.read()
+    writer.close()
+    return int(data.split(b" ", 2)[1]), (time.perf_counter() - started) * 1000
+
+
+async def _load(port: int, raw: bytes, clients: int, duration: float) -> Dict[str, float]:
+    samples: List[float] = []
+    errors = 0
+    stop = time.perf_counter() + duration
+
+    async def client() -> None:
+        nonlocal errors
+        while time.perf_counter() < stop:
+            try:
+                status, elapsed = await _request(port, raw)
+            except (OSError, IndexError, ValueError):  # refused, reset or empty reply
+                status, elapsed = 0, 0.0
+            if status == 200:
+                samples.append(elapsed)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+    cuts = statistics.quantiles(samples, n=100) if len(samples) > 1 else [0.0] * 99
+    return {"rps": len(samples) / elapsed, "errors": errors,
+            "p50": cuts[49], "p95": cuts[94], "p99": cuts[98]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", default="8,64,256", help="Comma-separated client counts.")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per level.")
+    parser.add_argument("--path", default="/api/dashboard/")
+    parser.add_argument("--threads", type=int, default=8, help="WSGI worker threads.")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--vacations", type=int, default=20000)
+    parser.add_argument("--likes", type=int, default=100000)
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        _serve_wsgi(args.serve, args.threads)
+        return
+
+    levels = [int(n) for n in args.concurrency.split(",")]
+    setup_django()
+    from django.contrib.sessions.backends.db import SessionStore
+    from django.core.management import call_command
+    from django.db import connection
+    from vacations.models import Role, User
+
+    with test_database():
+        admin = User.objects.create(
+            first_name="Admin", last_name="Bench", email="admin@bench.local", password="adminadmin",
+            role=Role.objects.create(name="admin"), is_staff=True,
+        )
+        call_command("generate_load_data", users=args.users, vacations=args.vacations,
+                     likes=args.likes, stdout=StringIO())
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        store = SessionStore()
+        store["user_id"] = admin.id
+        store.create()
+        raw = (f"GET {args.path} HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+               f"Cookie: sessionid={store.session_key}\r\nConnection: close\r\n\r\n").encode()
+        env = {
+            **os.environ, **NO_CACHE, "DB_NAME": connection.settings_dict["NAME"],
+            "DB_POOL": "1", "DB_POOL_MAX_SIZE": os.environ.get("DB_POOL_MAX_SIZE", "32"),
+            "DB_POOL_TIMEOUT": "60",  # queue for a connection rather than fail
+            "DEBUG": "0", "QUERY_BUDGET_ACTION": "off",
+        }
+        connection.close()
+
+        print(f"{args.path}: {args.users} users, {args.vacations} vacations, {args.likes} likes")
+        print(f"{'server':>6} {'clients':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+              f"{'p99 ms':>8} {'errors':>6}")
+        for server in SERVERS:
+            port = _free_port()
+            process = _start(server, port, env, args.threads)
+            try:
+                asyncio.run(_load(port, raw, 4, 1))  # warm up the pool and code paths
+                for clients in levels:
+                    r = asyncio.run(_load(port, raw, clients, args.duration))
+                    print(f"{server:>6} {clients:>7} {r['rps']:>8.0f} {r['p50']:>8.2f} "
+                          f"{r['p95']:>8.2f} {r['p99']:>8.2f} {r['errors']:>6}")
+            finally:
+                process.terminate()
+                process.wait()
+
+
+if __name__ == "__main__":
+    main()
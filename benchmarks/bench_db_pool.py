@@ -0,0 +1,166 @@
+"""Load test for database connection reuse.
+
+Usage::
+
+    python -m benchmarks.bench_db_pool [--clients 8] [--requests 100]
+
+Serves the stats backend from a threaded WSGI server and hits
+``/api/vacations/stats/`` (result cache disabled) from concurrent clients,
+once per connection mode:
+
+* ``fresh``      – ``CONN_MAX_AGE=0``: a new Postgres connection per request
+* ``persistent`` – ``CONN_MAX_AGE=60``: one connection per server thread
+* ``pool``       – ``DB_POOL=1``: psycopg3 pool shared by all threads
+
+Connection churn (new backends opened during the load phase) is read from
+``pg_stat_database.sessions`` (Postgres 14+).
+Each mode runs in its own process because the settings are read at start-up.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from benchmarks.common import clear_data, seed, setup_django, test_database
+
+MODES: Dict[str, Dict[str, str]] = {
+    "fresh": {"DB_POOL": "0", "DB_CONN_MAX_AGE": "0"},
+    "persistent": {"DB_POOL": "0", "DB_CONN_MAX_AGE": "60"},
+    "pool": {"DB_POOL": "1"},
+}
+
+
+class _WorkerPoolServer(WSGIServer):
+    """WSGI server handling requests on a fixed set of worker threads, like a
+    threaded gunicorn/uwsgi worker (so persistent connections can be reused)."""
+
+    workers = 8
+
+    def server_activate(self) -> None:
+        super().server_activate()
+        self.executor = ThreadPoolExecutor(max_workers=self.workers)
+
+    def process_request(self, request, client_address) -> None:
+        self.executor.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address) -> None:
+        try:
+            self.finish_request(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+def _sessions_opened() -> int:
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sessions FROM pg_stat_database WHERE datname = current_database()")
+        return int(cursor.fetchone()[0])
+
+
+def _run_mode(clients: int, requests: int) -> Dict[str, float]:
+    """Seed, serve and load-test the current process configuration."""
+    setup_django()
+    from django.contrib.sessions.backends.db import SessionStore
+    from django.core.wsgi import get_wsgi_application
+    from django.db import connection
+
+    with test_database():
+        clear_data()
+        ids = seed(vacations=1000, likes=0)
+        store = SessionStore()
+        store["user_id"] = ids["admin_id"]
+        store.create()
+        connection.close()
+
+        _WorkerPoolServer.workers = clients
+        server = make_server("127.0.0.1", 0, get_wsgi_application(),
+                             server_class=_WorkerPoolServer, handler_class=_QuietHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}/api/vacations/stats/"
+        headers = {"Cookie": f"sessionid={store.session_key}"}
+
+        samples: List[float] = []
+        lock = threading.Lock()
+
+        def worker() -> None:
+            local: List[float] = []
+            for _ in range(requests):
+                started = time.perf_counter()
+                with urllib.request.urlopen(urllib.request.Request(url, headers=headers)) as response:
+                    response.read()
+                local.append((time.perf_counter() - started) * 1000)
+            with lock:
+                samples.extend(local)
+
+        before = _sessions_opened()
+        connection.close()
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker) for _ in range(clients)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+        server.shutdown()
+        server.executor.shutdown()
+        opened = _sessions_opened() - before - 1
+        if hasattr(connection, "close_pool"):
+            connection.close_pool()
+        with connection.cursor() as cursor:
+            # Worker threads still hold their persistent connections.
+            cursor.execute(
+                "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+                "WHERE datname = current_database() AND pid <> pg_backend_pid()"
+            )
+        connection.close()
+
+    cuts = statistics.quantiles(samples, n=100)
+    return {
+        "connections": opened, "rps": len(samples) / elapsed,
+        "p50": cuts[49], "p95": cuts[94], "p99": cuts[98],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=100, help="Requests per client.")
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(_run_mode(args.clients, args.requests)))
+        return
+
+    print(f"{'mode':>11} {'conns':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for mode, env in MODES.items():
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_db_pool", "--mode", mode,
+             "--clients", str(args.clients), "--requests", str(args.requests)],
+            env={**os.environ, **env, "STATS_CACHE_TTL_VACATIONS": "0",
+                 "DB_POOL_MAX_SIZE": str(args.clients)},
+            check=True, capture_output=True, text=True,
+        ).stdout
+        r = json.loads(output.strip().splitlines()[-1])
+        print(f"{mode:>11} {r['connections']:>6} {r['rps']:>8.0f} "
+              f"{r['p50']:>8.2f} {r['p95']:>8.2f} {r['p99']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,434 @@
+"""Latency and query-count benchmark for every HTTP endpoint.
+
+Usage::
+
+    python -m benchmarks.bench_endpoints run [--tiers 1k,100k,1m] [--repeat 20]
+        [--output results.json] [--baseline baseline.json] [--cached]
+    python -m benchmarks.bench_endpoints compare baseline.json results.json [--threshold 0.2]
+
+``run`` seeds each dataset tier (1k / 100k / 1M likes, bulk-loaded with the
+``generate_load_data`` command) into a throw-away Postgres test database and
+drives every route of ``stats_backend.urls`` (which mounts ``stats_api`` and
+the vacation apps) and of ``vacations_backend.urls`` through the Django test
+client. Each probe records p50/p95/p99 latency in ms, the SQL statement count
+and the status code, and the results are written as JSON.
+
+Requests that write (likes, add/edit/delete, logins, logouts) run inside a
+transaction that is rolled back, so every sample sees the same data. The stats
+result cache is disabled unless ``--cached`` is given, so the numbers measure
+the database path. The exports and ``?all=true`` list are sampled
+``--heavy-repeat`` times only.
+
+``compare`` (or ``run --baseline``) flags a probe as a regression when its
+p95 grows by more than ``--threshold`` (and by at least ``--min-ms``), when it
+issues more queries, or when its status code changes, and exits with status 1.
+Routes without a probe are reported and also fail the run, except the
+long-lived ones in ``UNTIMED`` (listed under ``untimed``); routes shadowed
+by an earlier pattern with the same path are listed under ``shadowed``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from io import StringIO
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from benchmarks.common import login, setup_django, test_database
+
+# vacations_backend is deployed with vacations/ as its working directory.
+sys.path.append(str(Path(__file__).resolve().parent.parent / "vacations"))
+
+URLCONFS: Dict[str, str] = {
+    "stats": "stats_backend.urls",
+    "vacations": "vacations_backend.urls",
+}
+
+
+class Tier(NamedTuple):
+    users: int
+    vacations: int
+    likes: int
+
+
+TIERS: Dict[str, Tier] = {
+    "1k": Tier(users=100, vacations=500, likes=1_000),
+    "100k": Tier(users=2_000, vacations=5_000, likes=100_000),
+    "1m": Tier(users=10_000, vacations=20_000, likes=1_000_000),
+}
+
+Fixture = Dict[str, Any]
+
+
+@dataclass(frozen=True)
+class Probe:
+    """One request shape for a route."""
+
+    method: str = "get"
+    query: str = ""
+    data: Optional[Callable[[Fixture], Dict[str, Any]]] = None
+    as_json: bool = False
+    user: Optional[str] = "admin"
+    writes: bool = False
+    heavy: bool = False
+
+
+def _future(days: int) -> str:
+    return (date.today() + timedelta(days=days)).isoformat()
+
+
+def _vacation_form(fx: Fixture) -> Dict[str, Any]:
+    # Accepted by both the DRF view (``country``) and the HTML form (``country_id``).
+    return {
+        "country": fx["country_id"], "country_id": fx["country_id"], "description": "Benchmark",
+        "start_date": _future(30), "end_date": _future(37), "price": "1234",
+        "image_filename": "bench.jpg",
+    }
+
+
+_REGISTER: Dict[str, str] = {
+    "first_name": "Bench", "last_name": "Register", "email": "register@bench.local", "password": "benchpass",
+}
+
+# Routes whose response never completes, so there is no latency to sample.
+UNTIMED: Dict[str, str] = {
+    "stats_stream": "server-sent events stream",
+}
+
+# Route name -> probes. Names shared by several URLconfs get the same probes.
+PROBES: Dict[str, List[Probe]] = {
+    # stats_api
+    "stats_login": [Probe("post", as_json=True, user=None, writes=True,
+                          data=lambda fx: {"email": fx["admin_email"], "password": fx["admin_password"]})],
+    "stats_logout": [Probe("post", writes=True)],
+    "vacations_stats": [Probe()],
+    "vacation_occupancy": [Probe(), Probe(query=f"from={_future(-1826)}&to={_future(1826)}")],
+    "total_users": [Probe()],
+    "total_likes": [Probe()],
+    "likes_distribution": [Probe(), Probe(query="min_likes=5&order=-likes&top=10")],
+    "likes_trend": [Probe(), Probe(query=f"granularity=month&from={_future(-365)}")],
+    "dashboard": [Probe()],
+    "stats_history": [Probe(), Probe(query=f"from={_future(-364)}")],
+    "stats_cache": [Probe()],
+    "export_likes_csv": [Probe(heavy=True)],
+    "export_vacations_ndjson": [Probe(heavy=True)],
+    "session": [Probe()],
+    # vacation HTML pages
+    "home": [Probe(user=None)],
+    "register-form": [Probe(user=None)],
+    "login-form": [Probe(user=None)],
+    "user-login": [Probe("post", user=None, writes=True,
+                         data=lambda fx: {"email": fx["user_email"], "password": fx["user_password"]})],
+    "logout": [Probe("post", user="user", writes=True)],
+    "vacation-list": [Probe(user="user"), Probe(user="user", query="all=true", heavy=True)],
+    "admin-vacation-list": [Probe()],
+    "vacation-add-form": [Probe()],
+    "edit-vacation-page": [Probe()],
+    "vacation-detail": [Probe(user="user")],
+    # vacation / user / like API
+    "user-register": [Probe("post", as_json=True, user=None, writes=True, data=lambda fx: _REGISTER)],
+    "api-user-register": [Probe("post", as_json=True, user=None, writes=True, data=lambda fx: _REGISTER)],
+    "api-user-login": [Probe("post", as_json=True, user=None, writes=True,
+                             data=lambda fx: {"email": fx["user_email"], "password": fx["user_password"]})],
+    "api-vacation-list": [
+        Probe(user="user"),
+        Probe(user="user", query="all=true", heavy=True),
+        Probe(user="user", query="min_price=500&max_price=2000&date_from=" + _future(0)),
+        Probe(user="user", query="q=sunset"),
+    ],
+    "vacation-add": [Probe("post", writes=True, data=_vacation_form)],
+    "vacation-edit-api": [Probe()],
+    "vacation-delete": [Probe("delete", writes=True)],
+    "vacation-like": [Probe("post", user="user", writes=True)],
+    "vacation-unlike": [Probe("post", user="user", writes=True)],
+    "like-batch": [Probe("post", as_json=True, user="user", writes=True,
+                         data=lambda fx: {"like": [fx["unliked_id"]], "unlike": [fx["liked_id"]]})],
+}
+
+# Which vacation a route's ``<vacation_id>`` points at.
+_VACATION_FOR_ROUTE: Dict[str, str] = {"vacation-like": "unliked_id", "vacation-unlike": "liked_id"}
+
+
+@dataclass
+class Route:
+    backend: str
+    template: str
+    name: str
+
+
+@dataclass
+class Result:
+    status: int
+    samples: List[float] = field(default_factory=list)
+    queries: int = 0
+
+    def summary(self) -> Dict[str, Any]:
+        cuts = statistics.quantiles(self.samples, n=100, method="inclusive")
+        return {
+            "status": self.status, "queries": self.queries, "samples": len(self.samples),
+            "p50": round(cuts[49], 3), "p95": round(cuts[94], 3), "p99": round(cuts[98], 3),
+        }
+
+
+def iter_routes(backend: str, urlconf: str) -> Iterator[Route]:
+    """Flatten a URLconf into (path template, route name) pairs."""
+    from django.urls import URLPattern, URLResolver, get_resolver
+
+    def walk(patterns: list, prefix: str) -> Iterator[Route]:
+        for entry in patterns:
+            if isinstance(entry, URLResolver):
+                yield from walk(entry.url_patterns, prefix + str(entry.pattern))
+            elif isinstance(entry, URLPattern):
+                yield Route(backend, "/" + prefix + str(entry.pattern), entry.name or "")
+
+    yield from walk(get_resolver(urlconf).url_patterns, "")
+
+
+def seed_tier(tier: Tier) -> Fixture:
+    """
+    Replace all vacation data with a tier-sized synthetic dataset.
+
+    :return: IDs and credentials the probes need
+    """
+    from django.core.management import call_command
+    from django.db import connection
+    from django.db.models import Count
+    from vacations.models import Like, Role, User, Vacation
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "TRUNCATE vacations_like, vacations_vacation, vacations_country, vacations_user, "
+            "vacations_role, django_session RESTART IDENTITY CASCADE"
+        )
+    admin = User.objects.create(
+        first_name="Admin", last_name="Bench", email="admin@bench.local", password="adminadmin",
+        role=Role.objects.create(name="admin"), is_staff=True,
+    )
+    call_command("generate_load_data", users=tier.users, vacations=tier.vacations,
+                 likes=tier.likes, seed=0, stdout=StringIO())
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+    # The heaviest liker (who has not liked everything) is the worst case
+    # for per-user like lookups.
+    top = (Like.objects.values("user_id").annotate(n=Count("id")).filter(n__lt=tier.vacations)
+           .order_by("-n", "user_id").first()
+           or {"user_id": User.objects.exclude(id=admin.id).order_by("id").values_list("id", flat=True)[0]})
+    user = User.objects.get(id=top["user_id"])
+    liked = Like.objects.filter(user_id=user.id).values_list("vacation_id", flat=True)
+    vacation = Vacation.objects.order_by("-like_count", "id").first()
+    return {
+        "admin_id": admin.id, "admin_email": admin.email, "admin_password": admin.password,
+        "user_id": user.id, "user_email": user.email, "user_password": user.password,
+        "vacation_id": vacation.id, "country_id": vacation.country_id,
+        "liked_id": liked.order_by("vacation_id").first() or vacation.id,
+        "unliked_id": Vacation.objects.exclude(id__in=liked).order_by("id").values_list("id", flat=True)[0],
+    }
+
+
+def run_probe(route: Route, probe: Probe, fixture: Fixture, repeat: int) -> Result:
+    """Time ``repeat`` requests of one probe after a warm-up request."""
+    from django.db import connection, transaction
+    from django.test import Client
+
+    vacation_id = fixture[_VACATION_FOR_ROUTE.get(route.name, "vacation_id")]
+    url = route.template.replace("<int:vacation_id>", str(vacation_id))
+    if probe.query:
+        url += "?" + probe.query
+    kwargs: Dict[str, Any] = {}
+    if probe.data is not None:
+        kwargs["data"] = json.dumps(probe.data(fixture)) if probe.as_json else probe.data(fixture)
+        if probe.as_json:
+            kwargs["content_type"] = "application/json"
+
+    client = Client(raise_request_exception=False)
+    if probe.user:
+        login(client, fixture[f"{probe.user}_id"])
+
+    def request() -> int:
+        if probe.writes and probe.user:
+            login(client, fixture[f"{probe.user}_id"])  # logouts drop the session
+        executed = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal executed
+            executed += 1
+            return execute(sql, params, many, context)
+
+        # execute_wrapper rather than CaptureQueriesContext: the latter's log
+        # is capped at 9000 statements, which the N+1 pages exceed.
+        with connection.execute_wrapper(count), transaction.atomic():
+            started = time.perf_counter()
+            response = getattr(client, probe.method)(url, **kwargs)
+            if response.streaming:
+                for _ in response.streaming_content:
+                    pass
+            elapsed = (time.perf_counter() - started) * 1000
+            if probe.writes:
+                transaction.set_rollback(True)
+        result.samples.append(elapsed)
+        result.queries = max(result.queries, executed)
+        return response.status_code
+
+    result = Result(status=0)
+    request()
+    result.samples.clear()
+    for _ in range(repeat):
+        result.status = request()
+    return result
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Seed every requested tier and probe every route."""
+    setup_django()
+    import django
+    from django.conf import settings
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test.utils import override_settings
+
+    # Broken routes are recorded as 500s; their tracebacks would drown the table.
+    logging.getLogger("django.request").setLevel(logging.CRITICAL)
+    cache_settings: Dict[str, Any] = {} if args.cached else {
+        "STATS_CACHE_TIMEOUTS": {name: 0 for name in settings.STATS_CACHE_TIMEOUTS},
+    }
+    results: Dict[str, Any] = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(), "django": django.get_version(),
+            "repeat": args.repeat, "heavy_repeat": args.heavy_repeat, "cached": args.cached,
+        },
+        "tiers": {},
+        "unprobed": [],
+        "untimed": [],
+        "shadowed": [],
+    }
+    with test_database():
+        results["meta"]["database"] = f"{connection.vendor} {connection.pg_version}"
+        for name in args.tiers.split(","):
+            tier = TIERS[name]
+            started = time.perf_counter()
+            fixture = seed_tier(tier)
+            print(f"tier {name}: {tier.likes} likes seeded in {time.perf_counter() - started:.1f}s")
+            endpoints: Dict[str, Any] = {}
+            for backend, urlconf in URLCONFS.items():
+                with override_settings(ROOT_URLCONF=urlconf, **cache_settings):
+                    seen: set = set()
+                    for route in iter_routes(backend, urlconf):
+                        if route.template in seen:
+                            # An earlier pattern with the same path always wins.
+                            if name == args.tiers.split(",")[0]:
+                                results["shadowed"].append(f"{backend}:{route.template} ({route.name})")
+                            continue
+                        seen.add(route.template)
+                        if route.name not in PROBES:
+                            if name == args.tiers.split(",")[0]:
+                                kind = "untimed" if route.name in UNTIMED else "unprobed"
+                                results[kind].append(f"{backend}:{route.template}")
+                            continue
+                        for probe in PROBES[route.name]:
+                            cache.clear()
+                            key = probe_key(route, probe)
+                            repeat = args.heavy_repeat if probe.heavy else args.repeat
+                            endpoints[key] = run_probe(route, probe, fixture, repeat).summary()
+                            r = endpoints[key]
+                            print(f"  {key:<72} {r['status']:>4} {r['queries']:>4}q "
+                                  f"p50 {r['p50']:>8.2f} p95 {r['p95']:>8.2f} p99 {r['p99']:>8.2f}")
+            results["tiers"][name] = {"dataset": tier._asdict(), "endpoints": endpoints}
+    return results
+
+
+def probe_key(route: Route, probe: Probe) -> str:
+    """Stable result key, e.g. ``stats:GET /api/dashboard/``."""
+    key = f"{route.backend}:{probe.method.upper()} {route.template}"
+    return f"{key}?{probe.query}" if probe.query else key
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float,
+            min_ms: float) -> List[str]:
+    """
+    List regressions of ``current`` against ``baseline``.
+
+    :param baseline: Stored results
+    :param current: New results
+    :param threshold: Allowed relative p95 growth (0.2 = +20%)
+    :param min_ms: Ignore p95 growth smaller than this many ms (timer noise)
+    :return: One line per regression
+    """
+    problems: List[str] = [f"no probe for route {r}" for r in current.get("unprobed", [])]
+    for tier, data in current["tiers"].items():
+        old_endpoints = baseline["tiers"].get(tier, {}).get("endpoints", {})
+        for key, new in data["endpoints"].items():
+            old = old_endpoints.get(key)
+            if old is None:
+                continue
+            where = f"[{tier}] {key}"
+            if new["status"] != old["status"]:
+                problems.append(f"{where}: status {old['status']} -> {new['status']}")
+            if new["queries"] > old["queries"]:
+                problems.append(f"{where}: queries {old['queries']} -> {new['queries']}")
+            if new["p95"] > old["p95"] * (1 + threshold) and new["p95"] - old["p95"] >= min_ms:
+                problems.append(f"{where}: p95 {old['p95']:.2f}ms -> {new['p95']:.2f}ms "
+                                f"(+{(new['p95'] / old['p95'] - 1) * 100:.0f}%)")
+    return problems
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def _report(problems: List[str]) -> None:
+    for line in problems:
+        print(f"REGRESSION {line}")
+    print(f"{len(problems)} regression(s)." if problems else "No regressions.")
+    if problems:
+        sys.exit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="Seed the tiers and benchmark every endpoint.")
+    run_parser.add_argument("--tiers", default="1k,100k,1m", help=f"Comma-separated, from {', '.join(TIERS)}.")
+    run_parser.add_argument("--repeat", type=int, default=20, help="Timed requests per probe.")
+    run_parser.add_argument("--heavy-repeat", type=int, default=3, help="Timed requests per export/full list.")
+    run_parser.add_argument("--cached", action="store_true", help="Keep the configured stats cache TTLs.")
+    run_parser.add_argument("--output", default="bench_endpoints.json")
+    run_parser.add_argument("--baseline", help="Compare against this results file afterwards.")
+
+    compare_parser = sub.add_parser("compare", help="Compare two results files.")
+    for p in (run_parser, compare_parser):
+        p.add_argument("--threshold", type=float, default=0.2, help="Allowed p95 growth (default: 0.2).")
+        p.add_argument("--min-ms", type=float, default=1.0, help="Ignore p95 growth below this (default: 1).")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        _report(compare(_load(args.baseline), _load(args.current), args.threshold, args.min_ms))
+        return
+
+    unknown = set(args.tiers.split(",")) - set(TIERS)
+    if unknown or args.repeat < 2 or args.heavy_repeat < 2:
+        parser.error(f"unknown tiers {sorted(unknown)}" if unknown else "repeats must be at least 2")
+    results = run(args)
+    with open(args.output, "w", encoding="utf-8") as handle:
+        json.dump(results, handle, indent=2)
+    print(f"Results written to {args.output}")
+    problems = compare(_load(args.baseline), results, args.threshold, args.min_ms) if args.baseline else [
+        f"no probe for route {r}" for r in results["unprobed"]
+    ]
+    _report(problems)
+
+
+if __name__ == "__main__":
+    main()
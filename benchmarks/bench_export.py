@@ -0,0 +1,67 @@
+"""Peak-memory benchmark for the streaming export endpoints.
+
+Usage::
+
+    python -m benchmarks.bench_export [--likes 1000000]
+
+Seeds ``--likes`` likes (users x 1000 vacations, inserted in SQL), then
+streams ``/api/export/likes.csv`` and ``/api/export/vacations.ndjson``
+through the test client, printing rows, MB written, throughput and the
+growth of the process's peak RSS. Peak RSS must stay flat as ``--likes``
+grows.
+"""
+from __future__ import annotations
+
+import argparse
+import resource
+import time
+
+from benchmarks.common import clear_data, login, seed, setup_django, test_database
+
+VACATIONS = 1000
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MB (Linux reports KB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--likes", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from django.test import Client
+    from django.urls import reverse
+
+    with test_database():
+        clear_data()
+        users = max(1, -(-args.likes // VACATIONS))
+        ids = seed(vacations=VACATIONS, users=users)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO vacations_like (user_id, vacation_id) "
+                "SELECT u.id, v.id FROM vacations_user u CROSS JOIN vacations_vacation v "
+                "WHERE u.email LIKE 'user%%@bench.local' LIMIT %s",
+                [args.likes],
+            )
+        client = Client()
+        login(client, ids["admin_id"])
+
+        print(f"{'export':>24} {'rows':>9} {'MB':>7} {'rows/s':>9} {'peak RSS +MB':>13}")
+        for name in ("export_likes_csv", "export_vacations_ndjson"):
+            baseline = peak_rss_mb()
+            started = time.perf_counter()
+            rows = size = 0
+            for chunk in client.get(reverse(name)).streaming_content:
+                rows += 1
+                size += len(chunk)
+            elapsed = time.perf_counter() - started
+            print(f"{name:>24} {rows:>9} {size / 1e6:>7.1f} {rows / elapsed:>9.0f} "
+                  f"{peak_rss_mb() - baseline:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Per-request latency of the session backends.
+
+Usage::
+
+    python -m benchmarks.bench_sessions [--requests 200]
+
+Logs an admin in under each ``SESSION_ENGINE`` and times repeated calls to
+``/api/session/``, printing the median and p95 latency and the number of SQL
+statements per request. ``signed_cookies`` and a warm ``cached_db`` should
+not touch ``django_session`` at all.
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+
+from benchmarks.common import clear_data, login, median, seed, setup_django, test_database, time_ms
+
+MODES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.cache import cache
+    from django.db import connection, reset_queries
+    from django.test import Client, override_settings
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+
+    with test_database():
+        clear_data()
+        ids = seed(vacations=10)
+        url = reverse("session")
+        print(f"{'mode':>15} {'queries':>8} {'median ms':>10} {'p95 ms':>8}")
+        for mode, engine in MODES.items():
+            with override_settings(SESSION_ENGINE=engine):
+                cache.clear()
+                client = Client()
+                login(client, ids["admin_id"])
+                client.get(url)
+
+                reset_queries()
+                with CaptureQueriesContext(connection) as ctx:
+                    client.get(url)
+                samples = time_ms(lambda: client.get(url), args.requests)
+                p95 = statistics.quantiles(samples, n=20)[-1]
+                print(f"{mode:>15} {len(ctx.captured_queries):>8} {median(samples):>10.2f} {p95:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
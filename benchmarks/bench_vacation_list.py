@@ -0,0 +1,58 @@
+"""Render-time benchmark for the HTML vacation list page.
+
+Usage::
+
+    python -m benchmarks.bench_vacation_list [--tiers 10,100,1000,10000]
+
+Prints, per catalogue size, the SQL statement count and the median render
+time of the full list (``?all=true``). The query count must stay flat;
+render time should grow only with template work (per-row cost roughly
+constant). The last two columns time the first keyset page and a page near
+the end of the catalogue, which should cost the same.
+"""
+from __future__ import annotations
+
+import argparse
+
+from benchmarks.common import clear_data, login, median, seed, setup_django, test_database, time_ms
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tiers", default="10,100,1000,10000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection, reset_queries
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+    from vacations.models import Vacation
+    from vacations.services import encode_vacation_cursor
+
+    with test_database():
+        print(f"{'rows':>8} {'queries':>8} {'median ms':>10} {'us/row':>8} {'page 1 ms':>10} {'last ms':>8}")
+        for rows in (int(t) for t in args.tiers.split(",")):
+            clear_data()
+            ids = seed(vacations=rows, users=10, likes=min(rows * 3, rows * 10))
+            client = Client()
+            login(client, ids["user_id"])
+            url = reverse("vacation-list")
+            full_url = f"{url}?all=true"
+
+            reset_queries()
+            with CaptureQueriesContext(connection) as ctx:
+                client.get(full_url)
+            ms = median(time_ms(lambda: client.get(full_url), args.repeat))
+
+            tail = Vacation.objects.order_by("-start_date", "-id")[min(rows - 1, 20)]
+            deep_url = f"{url}?cursor={encode_vacation_cursor(tail)}"
+            first_ms = median(time_ms(lambda: client.get(url), args.repeat))
+            deep_ms = median(time_ms(lambda: client.get(deep_url), args.repeat))
+            print(f"{rows:>8} {len(ctx.captured_queries):>8} {ms:>10.1f} {ms * 1000 / rows:>8.1f}"
+                  f" {first_ms:>10.1f} {deep_ms:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks run against a throw-away test database created from the
+configured ``DATABASES`` settings, so they never touch real data.
+"""
+from __future__ import annotations
+
+import os
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterator, List
+
+import django
+
+
+def setup_django(settings_module: str = "stats_backend.settings") -> None:
+    """Configure Django for a standalone benchmark script."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    django.setup()
+
+
+@contextmanager
+def test_database() -> Iterator[None]:
+    """Create a fresh test database for the duration of the block."""
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name: str = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def clear_data() -> None:
+    """Delete all vacation data between benchmark tiers."""
+    from vacations.models import Country, Like, Role, User, Vacation
+
+    for model in (Like, Vacation, Country, User, Role):
+        model.objects.all().delete()
+
+
+def seed(vacations: int, users: int = 10, likes: int = 0) -> Dict[str, int]:
+    """
+    Bulk-insert a synthetic dataset.
+
+    Likes are spread as (user, vacation) pairs in row-major order, so
+    ``likes`` must not exceed ``users * vacations``. A year of daily stats
+    snapshots is added, copied from today's dashboard.
+
+    :return: Dict with the admin and regular user IDs
+    """
+    from stats_api.services import take_snapshot
+    from vacations.models import Country, Like, Role, StatsSnapshot, User, Vacation
+    from vacations.services import recount_likes, rollup_likes
+
+    admin_role = Role.objects.create(name="admin")
+    user_role = Role.objects.create(name="user")
+    admin = User.objects.create(
+        first_name="Admin", last_name="Bench", email="admin@bench.local",
+        password="adminadmin", role=admin_role, is_staff=True,
+    )
+    user_objs: List[User] = User.objects.bulk_create([
+        User(first_name="User", last_name=str(i), email=f"user{i}@bench.local",
+             password="12345678", role=user_role)
+        for i in range(users)
+    ])
+    countries: List[Country] = Country.objects.bulk_create(
+        [Country(name=f"Country {i}") for i in range(10)]
+    )
+    start = date.today()
+    vacation_objs: List[Vacation] = Vacation.objects.bulk_create([
+        Vacation(
+            country=countries[i % len(countries)], description=f"Vacation {i}",
+            start_date=start + timedelta(days=i % 365), end_date=start + timedelta(days=i % 365 + 7),
+            price=1000 + i % 9000, image_filename="bench.jpg",
+        )
+        for i in range(vacations)
+    ], batch_size=5000)
+    Like.objects.bulk_create([
+        Like(user=user_objs[i % users], vacation=vacation_objs[i // users])
+        for i in range(likes)
+    ], batch_size=5000)
+    recount_likes(batch_size=10000)
+    rollup_likes(batch_size=10000)
+    take_snapshot(start)
+    today: Dict[str, object] = StatsSnapshot.objects.filter(day=start).values().get()
+    StatsSnapshot.objects.bulk_create([
+        StatsSnapshot(**{**today, "day": start - timedelta(days=i)}) for i in range(1, 365)
+    ])
+    return {"admin_id": admin.id, "user_id": user_objs[0].id}
+
+
+def login(client, user_id: int) -> None:
+    """Store ``user_id`` in the test client's session."""
+    session = client.session
+    session["user_id"] = user_id
+    session.save()
+
+
+def time_ms(fn: Callable[[], object], repeat: int = 5) -> List[float]:
+    """Call ``fn`` ``repeat`` times and return the wall-clock durations in ms."""
+    samples: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def median(samples: List[float]) -> float:
+    """Median of a list of samples."""
+    return statistics.median(samples)
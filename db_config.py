@@ -6,3 +6,14 @@ DB_USER: str = "postgres"
 DB_PASSWORD: str = "123456"
 DB_HOST: str = "localhost"
 DB_PORT: str = "5432"
+
+# Connection reuse. DB_POOL enables the psycopg3 pool (Django 5.1+);
+# otherwise connections persist for DB_CONN_MAX_AGE seconds per worker.
+# Keep it 0 under ASGI (uvicorn): each request's sync code runs on a new
+# thread, so persistent connections would pile up on finished threads.
+DB_POOL: bool = False
+DB_POOL_MIN_SIZE: int = 2
+DB_POOL_MAX_SIZE: int = 10
+DB_POOL_TIMEOUT: float = 10.0
+DB_CONN_MAX_AGE: int = 0
+DB_CONN_HEALTH_CHECKS: bool = True
@@ -18,6 +18,42 @@ SET xmloption = content;
 SET client_min_messages = warning;
 SET row_security = off;
 
+--
+-- Name: vacations_bump_data_version(); Type: FUNCTION; Schema: public; Owner: postgres
+--
+
+CREATE FUNCTION public.vacations_bump_data_version() RETURNS trigger
+    LANGUAGE plpgsql
+    AS $_$
+DECLARE
+    changed boolean := TG_OP = 'TRUNCATE';
+    column_changed boolean := false;
+    bump constant text := 'INSERT INTO vacations_dataversion AS v (id) VALUES (1) '
+                          'ON CONFLICT (id) DO UPDATE SET %1$I = v.%1$I + 1';
+BEGIN
+    IF TG_OP = 'UPDATE' AND TG_NARGS = 3 THEN
+        EXECUTE format(
+            'SELECT coalesce(bool_or(to_jsonb(n) - %1$L IS DISTINCT FROM to_jsonb(o) - %1$L), false), '
+            'coalesce(bool_or(n.%1$I IS DISTINCT FROM o.%1$I), false) '
+            'FROM changed_rows n JOIN old_rows o USING (id)',
+            TG_ARGV[1]
+        ) INTO changed, column_changed;
+        IF column_changed THEN
+            EXECUTE format(bump, TG_ARGV[2]);
+        END IF;
+    ELSIF NOT changed THEN
+        EXECUTE 'SELECT EXISTS (SELECT FROM changed_rows)' INTO changed;
+    END IF;
+    IF changed THEN
+        EXECUTE format(bump, TG_ARGV[0]);
+    END IF;
+    RETURN NULL;
+END
+$_$;
+
+
+ALTER FUNCTION public.vacations_bump_data_version() OWNER TO postgres;
+
 SET default_tablespace = '';
 
 SET default_table_access_method = heap;
@@ -340,6 +376,23 @@ ALTER TABLE public.vacations_country ALTER COLUMN id ADD GENERATED BY DEFAULT AS
 );
 
 
+--
+-- Name: vacations_dataversion; Type: TABLE; Schema: public; Owner: postgres
+--
+
+CREATE TABLE public.vacations_dataversion (
+    id smallint NOT NULL,
+    vacation bigint DEFAULT ((EXTRACT(epoch FROM clock_timestamp()) * (1000)::numeric))::bigint NOT NULL,
+    "like" bigint DEFAULT ((EXTRACT(epoch FROM clock_timestamp()) * (1000)::numeric))::bigint NOT NULL,
+    "user" bigint DEFAULT ((EXTRACT(epoch FROM clock_timestamp()) * (1000)::numeric))::bigint NOT NULL,
+    country bigint DEFAULT ((EXTRACT(epoch FROM clock_timestamp()) * (1000)::numeric))::bigint NOT NULL,
+    snapshot bigint DEFAULT ((EXTRACT(epoch FROM clock_timestamp()) * (1000)::numeric))::bigint NOT NULL,
+    CONSTRAINT vacations_dataversion_id_check CHECK ((id = 1))
+);
+
+
+ALTER TABLE public.vacations_dataversion OWNER TO postgres;
+
 --
 -- TOC entry 245 (class 1259 OID 95377)
 -- Name: vacations_like; Type: TABLE; Schema: public; Owner: postgres
@@ -348,12 +401,44 @@ ALTER TABLE public.vacations_country ALTER COLUMN id ADD GENERATED BY DEFAULT AS
 CREATE TABLE public.vacations_like (
     id bigint NOT NULL,
     user_id bigint NOT NULL,
-    vacation_id bigint NOT NULL
+    vacation_id bigint NOT NULL,
+    created_at timestamp with time zone DEFAULT statement_timestamp() NOT NULL
 );
 
 
 ALTER TABLE public.vacations_like OWNER TO postgres;
 
+--
+-- Name: vacations_likerollup; Type: TABLE; Schema: public; Owner: postgres
+--
+
+CREATE TABLE public.vacations_likerollup (
+    bucket date NOT NULL,
+    likes integer NOT NULL,
+    vacation_id bigint NOT NULL
+);
+
+
+ALTER TABLE public.vacations_likerollup OWNER TO postgres;
+
+--
+-- Name: vacations_statssnapshot; Type: TABLE; Schema: public; Owner: postgres
+--
+
+CREATE TABLE public.vacations_statssnapshot (
+    day date NOT NULL,
+    past_vacations integer NOT NULL,
+    ongoing_vacations integer NOT NULL,
+    future_vacations integer NOT NULL,
+    total_users integer NOT NULL,
+    total_likes integer NOT NULL,
+    likes_distribution jsonb NOT NULL,
+    taken_at timestamp with time zone NOT NULL
+);
+
+
+ALTER TABLE public.vacations_statssnapshot OWNER TO postgres;
+
 --
 -- TOC entry 244 (class 1259 OID 95376)
 -- Name: vacations_like_id_seq; Type: SEQUENCE; Schema: public; Owner: postgres
@@ -442,7 +527,9 @@ CREATE TABLE public.vacations_vacation (
     end_date date NOT NULL,
     price numeric(8,2) NOT NULL,
     image_filename character varying(255) NOT NULL,
-    country_id bigint NOT NULL
+    country_id bigint NOT NULL,
+    like_count integer NOT NULL,
+    CONSTRAINT vacations_vacation_like_count_check CHECK ((like_count >= 0))
 );
 
 
@@ -633,6 +720,12 @@ COPY public.django_migrations (id, app, name, applied) FROM stdin;
 18	sessions	0001_initial	2025-06-21 15:09:50.518404+03
 19	vacations	0001_initial	2025-06-21 15:09:50.569174+03
 20	vacations	0002_user_is_staff	2025-06-30 00:22:26.818154+03
+21	vacations	0003_vacation_like_count	2026-10-18 12:00:00+03
+22	vacations	0004_vacation_date_indexes	2026-10-18 12:00:00+03
+23	vacations	0005_vacation_search_indexes	2026-10-18 12:00:00+03
+24	vacations	0006_like_created_at_rollup	2026-10-18 12:00:00+03
+25	vacations	0007_stats_snapshot	2026-10-18 12:00:00+03
+26	vacations	0008_data_version	2026-10-18 12:00:00+03
 \.
 
 
@@ -675,46 +768,76 @@ COPY public.vacations_country (id, name) FROM stdin;
 \.
 
 
+--
+-- Data for Name: vacations_dataversion; Type: TABLE DATA; Schema: public; Owner: postgres
+--
+
+COPY public.vacations_dataversion (id, vacation, "like", "user", country, snapshot) FROM stdin;
+1	1792314000000	1792314000000	1792314000000	1792314000000	1792314000000
+\.
+
+
 --
 -- TOC entry 4969 (class 0 OID 95377)
 -- Dependencies: 245
 -- Data for Name: vacations_like; Type: TABLE DATA; Schema: public; Owner: postgres
 --
 
-COPY public.vacations_like (id, user_id, vacation_id) FROM stdin;
-1	3	2
-3	3	5
-4	3	8
-5	3	10
-6	3	11
-7	4	2
-8	4	1
-9	4	5
-10	4	4
-11	4	11
-12	5	2
-13	5	8
-14	6	2
-15	6	1
-16	6	5
-17	6	9
-18	6	8
-19	6	12
-20	6	11
-21	6	10
-23	7	2
-24	7	1
-25	10	1
-26	10	2
-27	10	3
-28	3	9
-29	3	12
-30	3	7
-31	3	6
-32	3	13
-33	12	13
-34	3	1
-36	3	3
+COPY public.vacations_like (id, user_id, vacation_id, created_at) FROM stdin;
+1	3	2	2026-10-18 12:00:00+03
+3	3	5	2026-10-18 12:00:00+03
+4	3	8	2026-10-18 12:00:00+03
+5	3	10	2026-10-18 12:00:00+03
+6	3	11	2026-10-18 12:00:00+03
+7	4	2	2026-10-18 12:00:00+03
+8	4	1	2026-10-18 12:00:00+03
+9	4	5	2026-10-18 12:00:00+03
+10	4	4	2026-10-18 12:00:00+03
+11	4	11	2026-10-18 12:00:00+03
+12	5	2	2026-10-18 12:00:00+03
+13	5	8	2026-10-18 12:00:00+03
+14	6	2	2026-10-18 12:00:00+03
+15	6	1	2026-10-18 12:00:00+03
+16	6	5	2026-10-18 12:00:00+03
+17	6	9	2026-10-18 12:00:00+03
+18	6	8	2026-10-18 12:00:00+03
+19	6	12	2026-10-18 12:00:00+03
+20	6	11	2026-10-18 12:00:00+03
+21	6	10	2026-10-18 12:00:00+03
+23	7	2	2026-10-18 12:00:00+03
+24	7	1	2026-10-18 12:00:00+03
+25	10	1	2026-10-18 12:00:00+03
+26	10	2	2026-10-18 12:00:00+03
+27	10	3	2026-10-18 12:00:00+03
+28	3	9	2026-10-18 12:00:00+03
+29	3	12	2026-10-18 12:00:00+03
+30	3	7	2026-10-18 12:00:00+03
+31	3	6	2026-10-18 12:00:00+03
+32	3	13	2026-10-18 12:00:00+03
+33	12	13	2026-10-18 12:00:00+03
+34	3	1	2026-10-18 12:00:00+03
+36	3	3	2026-10-18 12:00:00+03
+\.
+
+
+--
+-- Data for Name: vacations_likerollup; Type: TABLE DATA; Schema: public; Owner: postgres
+--
+
+COPY public.vacations_likerollup (bucket, likes, vacation_id) FROM stdin;
+2026-10-18	5	1
+2026-10-18	6	2
+2026-10-18	2	3
+2026-10-18	1	4
+2026-10-18	3	5
+2026-10-18	1	6
+2026-10-18	1	7
+2026-10-18	3	8
+2026-10-18	2	9
+2026-10-18	2	10
+2026-10-18	3	11
+2026-10-18	2	12
+2026-10-18	2	13
 \.
 
 
@@ -757,20 +880,20 @@ COPY public.vacations_user (id, first_name, last_name, email, password, role_id,
 -- Data for Name: vacations_vacation; Type: TABLE DATA; Schema: public; Owner: postgres
 --
 
-COPY public.vacations_vacation (id, description, start_date, end_date, price, image_filename, country_id) FROM stdin;
-1	Beach in Tel Aviv	2025-07-10	2025-07-20	2500.00	tel_aviv.jpg	1
-3	Paris Adventure	2025-09-05	2025-09-15	3000.00	paris.jpg	3
-4	Berlin History Tour	2025-10-10	2025-10-20	2700.00	berlin.jpg	4
-5	Rome Exploration	2025-11-01	2025-11-10	3200.00	rome.jpg	5
-6	Barcelona Highlights	2025-12-15	2025-12-25	2800.00	barcelona.jpg	6
-7	Canadian Rockies	2026-01-10	2026-01-20	4000.00	rockies.jpg	7
-8	Brazil Carnival	2026-02-15	2026-02-25	4500.00	brazil.jpg	8
-9	Tokyo Cherry Blossoms	2026-03-20	2026-03-30	5000.00	tokyo.jpg	9
-10	Mexico City Culture	2026-04-05	2026-04-15	3300.00	mexico.jpg	10
-11	Dead Sea Relaxation	2026-05-01	2026-05-10	2200.00	deadsea.jpg	1
-12	Miami Beach	2026-06-10	2026-06-20	3600.00	miami.jpg	2
-13	israel	2025-07-16	2025-08-08	2134.00	africa_tour.jpg	5
-2	USA Vacation	2025-08-24	2025-09-05	100.00	nyc.jpg	2
+COPY public.vacations_vacation (id, description, start_date, end_date, price, image_filename, country_id, like_count) FROM stdin;
+1	Beach in Tel Aviv	2025-07-10	2025-07-20	2500.00	tel_aviv.jpg	1	5
+3	Paris Adventure	2025-09-05	2025-09-15	3000.00	paris.jpg	3	2
+4	Berlin History Tour	2025-10-10	2025-10-20	2700.00	berlin.jpg	4	1
+5	Rome Exploration	2025-11-01	2025-11-10	3200.00	rome.jpg	5	3
+6	Barcelona Highlights	2025-12-15	2025-12-25	2800.00	barcelona.jpg	6	1
+7	Canadian Rockies	2026-01-10	2026-01-20	4000.00	rockies.jpg	7	1
+8	Brazil Carnival	2026-02-15	2026-02-25	4500.00	brazil.jpg	8	3
+9	Tokyo Cherry Blossoms	2026-03-20	2026-03-30	5000.00	tokyo.jpg	9	2
+10	Mexico City Culture	2026-04-05	2026-04-15	3300.00	mexico.jpg	10	2
+11	Dead Sea Relaxation	2026-05-01	2026-05-10	2200.00	deadsea.jpg	1	3
+12	Miami Beach	2026-06-10	2026-06-20	3600.00	miami.jpg	2	2
+13	israel	2025-07-16	2025-08-08	2134.00	africa_tour.jpg	5	2
+2	USA Vacation	2025-08-24	2025-09-05	100.00	nyc.jpg	2	6
 \.
 
 
@@ -852,7 +975,7 @@ SELECT pg_catalog.setval('public.django_content_type_id_seq', 11, true);
 -- Name: django_migrations_id_seq; Type: SEQUENCE SET; Schema: public; Owner: postgres
 --
 
-SELECT pg_catalog.setval('public.django_migrations_id_seq', 20, true);
+SELECT pg_catalog.setval('public.django_migrations_id_seq', 26, true);
 
 
 --
@@ -1071,6 +1194,13 @@ ALTER TABLE ONLY public.vacations_country
     ADD CONSTRAINT vacations_country_pkey PRIMARY KEY (id);
 
 
+--
+-- Name: vacations_dataversion vacations_dataversion_pkey; Type: CONSTRAINT; Schema: public; Owner: postgres
+--
+
+ALTER TABLE ONLY public.vacations_dataversion
+    ADD CONSTRAINT vacations_dataversion_pkey PRIMARY KEY (id);
+
 --
 -- TOC entry 4778 (class 2606 OID 95381)
 -- Name: vacations_like vacations_like_pkey; Type: CONSTRAINT; Schema: public; Owner: postgres
@@ -1089,6 +1219,22 @@ ALTER TABLE ONLY public.vacations_like
     ADD CONSTRAINT vacations_like_user_id_vacation_id_7c75a984_uniq UNIQUE (user_id, vacation_id);
 
 
+--
+-- Name: vacations_likerollup vacations_likerollup_pkey; Type: CONSTRAINT; Schema: public; Owner: postgres
+--
+
+ALTER TABLE ONLY public.vacations_likerollup
+    ADD CONSTRAINT vacations_likerollup_pkey PRIMARY KEY (bucket, vacation_id);
+
+
+--
+-- Name: vacations_statssnapshot vacations_statssnapshot_pkey; Type: CONSTRAINT; Schema: public; Owner: postgres
+--
+
+ALTER TABLE ONLY public.vacations_statssnapshot
+    ADD CONSTRAINT vacations_statssnapshot_pkey PRIMARY KEY (day);
+
+
 --
 -- TOC entry 4765 (class 2606 OID 95359)
 -- Name: vacations_role vacations_role_name_key; Type: CONSTRAINT; Schema: public; Owner: postgres
@@ -1262,6 +1408,13 @@ CREATE INDEX vacations_like_user_id_0d938fb2 ON public.vacations_like USING btre
 CREATE INDEX vacations_like_vacation_id_0ea63ac8 ON public.vacations_like USING btree (vacation_id);
 
 
+--
+-- Name: vacations_likerollup_vacation_id_c1d10843; Type: INDEX; Schema: public; Owner: postgres
+--
+
+CREATE INDEX vacations_likerollup_vacation_id_c1d10843 ON public.vacations_likerollup USING btree (vacation_id);
+
+
 --
 -- TOC entry 4763 (class 1259 OID 95383)
 -- Name: vacations_role_name_b4c311ab_like; Type: INDEX; Schema: public; Owner: postgres
@@ -1294,6 +1447,254 @@ CREATE INDEX vacations_user_role_id_006f76ab ON public.vacations_user USING btre
 CREATE INDEX vacations_vacation_country_id_c6b1383e ON public.vacations_vacation USING btree (country_id);
 
 
+--
+-- Name: vacation_start_date_id_idx; Type: INDEX; Schema: public; Owner: postgres
+--
+
+CREATE INDEX vacation_start_date_id_idx ON public.vacations_vacation USING btree (start_date, id);
+
+
+--
+-- Name: vacation_end_date_idx; Type: INDEX; Schema: public; Owner: postgres
+--
+
+CREATE INDEX vacation_end_date_idx ON public.vacations_vacation USING btree (end_date);
+
+
+--
+-- Name: vacation_price_idx; Type: INDEX; Schema: public; Owner: postgres
+--
+
+CREATE INDEX vacation_price_idx ON public.vacations_vacation USING btree (price);
+
+
+--
+-- Name: vacation_description_fts_idx; Type: INDEX; Schema: public; Owner: postgres
+--
+
+CREATE INDEX vacation_description_fts_idx ON public.vacations_vacation USING gin (to_tsvector('english'::regconfig, COALESCE(description, ''::text)));
+
+
+--
+-- Name: vacations_country vacations_country_del_version; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER vacations_country_del_version AFTER DELETE ON public.vacations_country REFERENCING OLD TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION public.vacations_bump_data_version('country');
+
+
+
+--
+-- Name: vacations_country vacations_country_ins_version; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER vacations_country_ins_version AFTER INSERT ON public.vacations_country REFERENCING NEW TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION public.vacations_bump_data_version('country');
+
+
+
+--
+-- Name: vacations_country vacations_country_trunc_version; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER vacations_country_trunc_version AFTER TRUNCATE ON public.vacations_country FOR EACH STATEMENT EXECUTE FUNCTION public.vacations_bump_data_version('country');
+
+
+
+--
+-- Name: vacations_country vacations_country_upd_version; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER vacations_country_upd_version AFTER UPDATE ON public.vacations_country REFERENCING NEW TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION public.vacations_bump_data_version('country');
+
+
+
+--
+-- Name: vacations_like vacations_like_del_version; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER vacations_like_del_version AFTER DELETE ON public.vacations_like REFERENCING OLD TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION public.vacations_bump_data_version('like');
+
+
+
+--
+-- Name: vacations_like vacations_like_ins_version; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER vacations_like_ins_version AFTER INSERT ON public.vacations_like REFERENCING NEW TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION public.vacations_bump_data_version('like');
+
+
+
+--
+-- Name: vacations_like vacations_like_trunc_version; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER vacations_like_trunc_version AFTER TRUNCATE ON public.vacations_like FOR EACH STATEMENT EXECUTE FUNCTION public.vacations_bump_data_version('like');
+
+
+
+--
+-- Name: vacations_like vacations_like_upd_version; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER vacations_like_upd_version AFTER UPDATE ON public.vacations_like REFERENCING NEW TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION public.vacations_bump_data_version('like');
+
+
+
+--
+-- Name: vacations_likerollup vacations_likerollup_del_version; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER vacations_likerollup_del_version AFTER DELETE ON public.vacations_likerollup REFERENCING OLD TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION public.vacations_bump_data_version('like');
+
+
+
+--
+-- Name: vacations_likerollup vacations_likerollup_ins_version; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER vacations_likerollup_ins_version AFTER INSERT ON public.vacations_likerollup REFERENCING NEW TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION public.vacations_bump_data_version('like');
+
+
+
+--
+-- Name: vacations_likerollup vacations_likerollup_trunc_version; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER vacations_likerollup_trunc_version AFTER TRUNCATE ON public.vacations_likerollup FOR EACH STATEMENT EXECUTE FUNCTION public.vacations_bump_data_version('like');
+
+
+
+--
+-- Name: vacations_likerollup vacations_likerollup_upd_version; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER vacations_likerollup_upd_version AFTER UPDATE ON public.vacations_likerollup REFERENCING NEW TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION public.vacations_bump_data_version('like');
+
+
+
+--
+-- Name: vacations_role vacations_role_del_version; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER vacations_role_del_version AFTER DELETE ON public.vacations_role REFERENCING OLD TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION public.vacations_bump_data_version('user');
+
+
+--
+-- Name: vacations_role vacations_role_ins_version; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER vacations_role_ins_version AFTER INSERT ON public.vacations_role REFERENCING NEW TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION public.vacations_bump_data_version('user');
+
+
+--
+-- Name: vacations_role vacations_role_trunc_version; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER vacations_role_trunc_version AFTER TRUNCATE ON public.vacations_role FOR EACH STATEMENT EXECUTE FUNCTION public.vacations_bump_data_version('user');
+
+
+--
+-- Name: vacations_role vacations_role_upd_version; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER vacations_role_upd_version AFTER UPDATE ON public.vacations_role REFERENCING NEW TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION public.vacations_bump_data_version('user');
+
+
+--
+-- Name: vacations_statssnapshot vacations_statssnapshot_del_version; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER vacations_statssnapshot_del_version AFTER DELETE ON public.vacations_statssnapshot REFERENCING OLD TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION public.vacations_bump_data_version('snapshot');
+
+
+
+--
+-- Name: vacations_statssnapshot vacations_statssnapshot_ins_version; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER vacations_statssnapshot_ins_version AFTER INSERT ON public.vacations_statssnapshot REFERENCING NEW TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION public.vacations_bump_data_version('snapshot');
+
+
+
+--
+-- Name: vacations_statssnapshot vacations_statssnapshot_trunc_version; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER vacations_statssnapshot_trunc_version AFTER TRUNCATE ON public.vacations_statssnapshot FOR EACH STATEMENT EXECUTE FUNCTION public.vacations_bump_data_version('snapshot');
+
+
+
+--
+-- Name: vacations_statssnapshot vacations_statssnapshot_upd_version; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER vacations_statssnapshot_upd_version AFTER UPDATE ON public.vacations_statssnapshot REFERENCING NEW TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION public.vacations_bump_data_version('snapshot');
+
+
+
+--
+-- Name: vacations_user vacations_user_del_version; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER vacations_user_del_version AFTER DELETE ON public.vacations_user REFERENCING OLD TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION public.vacations_bump_data_version('user');
+
+
+
+--
+-- Name: vacations_user vacations_user_ins_version; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER vacations_user_ins_version AFTER INSERT ON public.vacations_user REFERENCING NEW TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION public.vacations_bump_data_version('user');
+
+
+
+--
+-- Name: vacations_user vacations_user_trunc_version; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER vacations_user_trunc_version AFTER TRUNCATE ON public.vacations_user FOR EACH STATEMENT EXECUTE FUNCTION public.vacations_bump_data_version('user');
+
+
+
+--
+-- Name: vacations_user vacations_user_upd_version; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER vacations_user_upd_version AFTER UPDATE ON public.vacations_user REFERENCING NEW TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION public.vacations_bump_data_version('user');
+
+
+
+--
+-- Name: vacations_vacation vacations_vacation_del_version; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER vacations_vacation_del_version AFTER DELETE ON public.vacations_vacation REFERENCING OLD TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION public.vacations_bump_data_version('vacation');
+
+
+
+--
+-- Name: vacations_vacation vacations_vacation_ins_version; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER vacations_vacation_ins_version AFTER INSERT ON public.vacations_vacation REFERENCING NEW TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION public.vacations_bump_data_version('vacation');
+
+
+
+--
+-- Name: vacations_vacation vacations_vacation_trunc_version; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER vacations_vacation_trunc_version AFTER TRUNCATE ON public.vacations_vacation FOR EACH STATEMENT EXECUTE FUNCTION public.vacations_bump_data_version('vacation');
+
+
+
+--
+-- Name: vacations_vacation vacations_vacation_upd_version; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER vacations_vacation_upd_version AFTER UPDATE ON public.vacations_vacation REFERENCING OLD TABLE AS old_rows NEW TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION public.vacations_bump_data_version('vacation', 'like_count', 'like');
+
+
+
 --
 -- TOC entry 4784 (class 2606 OID 95270)
 -- Name: auth_group_permissions auth_group_permissio_permission_id_84c5c92e_fk_auth_perm; Type: FK CONSTRAINT; Schema: public; Owner: postgres
@@ -1393,6 +1794,14 @@ ALTER TABLE ONLY public.vacations_like
     ADD CONSTRAINT vacations_like_vacation_id_0ea63ac8_fk_vacations_vacation_id FOREIGN KEY (vacation_id) REFERENCES public.vacations_vacation(id) DEFERRABLE INITIALLY DEFERRED;
 
 
+--
+-- Name: vacations_likerollup vacations_likerollup_vacation_id_c1d10843_fk_vacations; Type: FK CONSTRAINT; Schema: public; Owner: postgres
+--
+
+ALTER TABLE ONLY public.vacations_likerollup
+    ADD CONSTRAINT vacations_likerollup_vacation_id_c1d10843_fk_vacations FOREIGN KEY (vacation_id) REFERENCES public.vacations_vacation(id) DEFERRABLE INITIALLY DEFERRED;
+
+
 --
 -- TOC entry 4792 (class 2606 OID 95384)
 -- Name: vacations_user vacations_user_role_id_006f76ab_fk_vacations_role_id; Type: FK CONSTRAINT; Schema: public; Owner: postgres
@@ -10,6 +10,9 @@ export type VacationsStats = {
 export type TotalUsers = { totalUsers: number };
 export type TotalLikes = { totalLikes: number };
 export type LikesDistributionItem = { destination: string; likes: number };
+export type Dashboard = VacationsStats &
+  TotalUsers &
+  TotalLikes & { likesDistribution: LikesDistributionItem[] };
 
 export type SessionInfo = {
   authenticated: boolean;
@@ -75,6 +78,52 @@ export function getTotalLikes(): Promise<TotalLikes> {
   return apiGet<TotalLikes>("/likes/total/");
 }
 
-export function getLikesDistribution(): Promise<LikesDistributionItem[]> {
-  return apiGet<LikesDistributionItem[]>("/likes/distribution/");
+export type DistributionFilters = {
+  minLikes?: number;
+  q?: string;
+  top?: number;
+  order?: "destination" | "-destination" | "likes" | "-likes";
+};
+
+// Filters are applied server-side; omitted values are not sent.
+export function getLikesDistribution(
+  filters: DistributionFilters = {}
+): Promise<LikesDistributionItem[]> {
+  const params = new URLSearchParams();
+  if (filters.minLikes) params.set("min_likes", String(filters.minLikes));
+  if (filters.q) params.set("q", filters.q);
+  if (filters.top) params.set("top", String(filters.top));
+  if (filters.order) params.set("order", filters.order);
+  const qs = params.toString();
+  return apiGet<LikesDistributionItem[]>(`/likes/distribution/${qs ? `?${qs}` : ""}`);
+}
+
+export function getDashboard(): Promise<Dashboard> {
+  return apiGet<Dashboard>("/dashboard/");
+}
+
+export type DashboardDelta = Partial<VacationsStats & TotalUsers & TotalLikes> & {
+  // Destinations whose like count changed; likes === 0 means removed.
+  likesChanged?: LikesDistributionItem[];
+};
+
+export type DashboardStreamHandlers = {
+  onSnapshot: (dashboard: Dashboard) => void;
+  onDelta: (delta: DashboardDelta) => void;
+  onError?: () => void;
+};
+
+// Live dashboard over Server-Sent Events: one "snapshot", then "delta" events.
+// Returns a function closing the stream, or null where EventSource is missing.
+export function subscribeDashboard(handlers: DashboardStreamHandlers): (() => void) | null {
+  if (typeof EventSource === "undefined") return null;
+  const source = new EventSource("/api/stats/stream/", { withCredentials: true });
+  source.addEventListener("snapshot", (e) =>
+    handlers.onSnapshot(JSON.parse((e as MessageEvent).data) as Dashboard)
+  );
+  source.addEventListener("delta", (e) =>
+    handlers.onDelta(JSON.parse((e as MessageEvent).data) as DashboardDelta)
+  );
+  source.onerror = () => handlers.onError?.();
+  return () => source.close();
 }
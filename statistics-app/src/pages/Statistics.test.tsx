@@ -6,25 +6,23 @@
  *
  * Extra Positive: while data is loading, KPI placeholders ("-") are shown immediately.
  * Extra Negative: when likes distribution is an empty array (authorized), the "No data" message appears.
+ * Filters: typing a destination asks the server for the filtered distribution.
+ * Stream: KPIs come from the SSE snapshot and are updated by deltas; a stream
+ * that fails before its first snapshot falls back to one dashboard fetch.
  */
 
-import { render, screen, waitFor } from "@testing-library/react";
+import { act, fireEvent, render, screen, waitFor } from "@testing-library/react";
 import { MemoryRouter } from "react-router-dom";
-import Statistics from "./Statistics";
+import Statistics, { applyLikesChanges } from "./Statistics";
 
-// Mock all API calls used by the page
+// Mock the dashboard call, the server-side distribution filter and the stream
+// (subscribeDashboard returns undefined, i.e. no EventSource, unless overridden)
 jest.mock("../api/auth", () => ({
-  getVacationsStats: jest.fn(),
-  getTotalUsers: jest.fn(),
-  getTotalLikes: jest.fn(),
+  getDashboard: jest.fn(),
   getLikesDistribution: jest.fn(),
+  subscribeDashboard: jest.fn(),
 }));
-import {
-  getVacationsStats,
-  getTotalUsers,
-  getTotalLikes,
-  getLikesDistribution,
-} from "../api/auth";
+import { DashboardStreamHandlers, getDashboard, getLikesDistribution, subscribeDashboard } from "../api/auth";
 
 // ✅ Correct relative path from src/pages/* to src/auth/*
 jest.mock("../auth/AuthContext", () => ({
@@ -38,18 +36,18 @@ beforeEach(() => {
 });
 
 test("renders KPI cards and chart (positive)", async () => {
-  (getVacationsStats as jest.Mock).mockResolvedValue({
+  (getDashboard as jest.Mock).mockResolvedValue({
     pastVacations: 2,
     ongoingVacations: 1,
     futureVacations: 3,
+    totalUsers: 12,
+    totalLikes: 7,
+    likesDistribution: [
+      { destination: "Rome", likes: 4 },
+      { destination: "Paris", likes: 2 },
+      { destination: "Berlin", likes: 1 },
+    ],
   });
-  (getTotalUsers as jest.Mock).mockResolvedValue({ totalUsers: 12 });
-  (getTotalLikes as jest.Mock).mockResolvedValue({ totalLikes: 7 });
-  (getLikesDistribution as jest.Mock).mockResolvedValue([
-    { destination: "Rome", likes: 4 },
-    { destination: "Paris", likes: 2 },
-    { destination: "Berlin", likes: 1 },
-  ]);
 
   render(
     <MemoryRouter initialEntries={["/stats"]}>
@@ -81,10 +79,7 @@ test("shows unauthorized banner on 401 (negative)", async () => {
   const e: Error & { status?: number } = new Error("Unauthorized");
   e.status = 401;
 
-  (getVacationsStats as jest.Mock).mockRejectedValue(e);
-  (getTotalUsers as jest.Mock).mockResolvedValue({ totalUsers: 0 });
-  (getTotalLikes as jest.Mock).mockResolvedValue({ totalLikes: 0 });
-  (getLikesDistribution as jest.Mock).mockResolvedValue([]);
+  (getDashboard as jest.Mock).mockRejectedValue(e);
 
   render(
     <MemoryRouter initialEntries={["/stats"]}>
@@ -96,11 +91,8 @@ test("shows unauthorized banner on 401 (negative)", async () => {
 });
 
 test("shows KPI placeholders while loading (extra positive)", () => {
-  // Pending promises to keep the page in loading state
-  (getVacationsStats as jest.Mock).mockReturnValue(new Promise(() => {}));
-  (getTotalUsers as jest.Mock).mockReturnValue(new Promise(() => {}));
-  (getTotalLikes as jest.Mock).mockReturnValue(new Promise(() => {}));
-  (getLikesDistribution as jest.Mock).mockReturnValue(new Promise(() => {}));
+  // Pending promise to keep the page in loading state
+  (getDashboard as jest.Mock).mockReturnValue(new Promise(() => {}));
 
   render(
     <MemoryRouter initialEntries={["/stats"]}>
@@ -114,14 +106,14 @@ test("shows KPI placeholders while loading (extra positive)", () => {
 });
 
 test('"No data" is shown when likes distribution is empty (extra negative)', async () => {
-  (getVacationsStats as jest.Mock).mockResolvedValue({
+  (getDashboard as jest.Mock).mockResolvedValue({
     pastVacations: 0,
     ongoingVacations: 0,
     futureVacations: 0,
+    totalUsers: 0,
+    totalLikes: 0,
+    likesDistribution: [],
   });
-  (getTotalUsers as jest.Mock).mockResolvedValue({ totalUsers: 0 });
-  (getTotalLikes as jest.Mock).mockResolvedValue({ totalLikes: 0 });
-  (getLikesDistribution as jest.Mock).mockResolvedValue([]);
 
   render(
     <MemoryRouter initialEntries={["/stats"]}>
@@ -132,3 +124,109 @@ test('"No data" is shown when likes distribution is empty (extra negative)', asy
   // The pie card should show "No data" when the distribution is empty
   expect(await screen.findByText(/no data/i)).toBeInTheDocument();
 });
+
+test("destination filter is sent to the server (filters)", async () => {
+  (getDashboard as jest.Mock).mockResolvedValue({
+    pastVacations: 0,
+    ongoingVacations: 0,
+    futureVacations: 0,
+    totalUsers: 0,
+    totalLikes: 5,
+    likesDistribution: [
+      { destination: "Rome", likes: 4 },
+      { destination: "Paris", likes: 1 },
+    ],
+  });
+  (getLikesDistribution as jest.Mock).mockResolvedValue([{ destination: "Rome", likes: 4 }]);
+
+  render(
+    <MemoryRouter initialEntries={["/stats"]}>
+      <Statistics />
+    </MemoryRouter>
+  );
+
+  fireEvent.change(await screen.findByPlaceholderText("e.g. Rome"), { target: { value: "Rom" } });
+
+  await waitFor(() => {
+    expect(getLikesDistribution).toHaveBeenCalledWith({ minLikes: 0, q: "Rom" });
+  });
+});
+
+/** Handlers the page passed to the (mocked) stream subscription. */
+const streamHandlers = (): DashboardStreamHandlers =>
+  (subscribeDashboard as jest.Mock).mock.calls[0][0] as DashboardStreamHandlers;
+
+test("KPIs follow the live stream (stream)", async () => {
+  const close = jest.fn();
+  (subscribeDashboard as jest.Mock).mockReturnValueOnce(close);
+
+  const { unmount } = render(
+    <MemoryRouter initialEntries={["/stats"]}>
+      <Statistics />
+    </MemoryRouter>
+  );
+
+  act(() => {
+    streamHandlers().onSnapshot({
+      pastVacations: 2,
+      ongoingVacations: 1,
+      futureVacations: 3,
+      totalUsers: 12,
+      totalLikes: 7,
+      likesDistribution: [{ destination: "Rome", likes: 7 }],
+    });
+  });
+  expect(await screen.findByText("7")).toBeInTheDocument();
+
+  act(() => {
+    streamHandlers().onDelta({ totalLikes: 9, likesChanged: [{ destination: "Paris", likes: 2 }] });
+  });
+  expect(await screen.findByText("9")).toBeInTheDocument();
+  expect(screen.getByText("12")).toBeInTheDocument();
+  expect(getDashboard).not.toHaveBeenCalled();
+
+  unmount();
+  expect(close).toHaveBeenCalled();
+});
+
+test("a stream failing before its snapshot falls back to one fetch (stream)", async () => {
+  (subscribeDashboard as jest.Mock).mockReturnValueOnce(jest.fn());
+  (getDashboard as jest.Mock).mockResolvedValue({
+    pastVacations: 0,
+    ongoingVacations: 0,
+    futureVacations: 0,
+    totalUsers: 12,
+    totalLikes: 0,
+    likesDistribution: [],
+  });
+
+  render(
+    <MemoryRouter initialEntries={["/stats"]}>
+      <Statistics />
+    </MemoryRouter>
+  );
+
+  act(() => {
+    streamHandlers().onError?.();
+    streamHandlers().onError?.(); // EventSource retries: still a single fetch
+  });
+  expect(await screen.findByText("12")).toBeInTheDocument();
+  expect(getDashboard).toHaveBeenCalledTimes(1);
+});
+
+test("likes deltas update, add and remove destinations (stream)", () => {
+  const rows = [
+    { destination: "Rome", likes: 4 },
+    { destination: "Paris", likes: 2 },
+  ];
+  expect(
+    applyLikesChanges(rows, [
+      { destination: "Rome", likes: 5 },
+      { destination: "Paris", likes: 0 },
+      { destination: "Berlin", likes: 1 },
+    ])
+  ).toEqual([
+    { destination: "Berlin", likes: 1 },
+    { destination: "Rome", likes: 5 },
+  ]);
+});
@@ -1,10 +1,10 @@
-import React, { useEffect, useMemo, useState } from "react";
+import React, { useEffect, useState } from "react";
 import {
-  getVacationsStats,
-  getTotalLikes,
-  getTotalUsers,
+  Dashboard,
+  getDashboard,
   getLikesDistribution,
   LikesDistributionItem,
+  subscribeDashboard,
 } from "../api/auth";
 import {
   ResponsiveContainer,
@@ -62,6 +62,24 @@ const StatCard: React.FC<StatCardProps> = ({ title, value }) => (
 type Filters = { minLikes: number; destinationQuery: string };
 const defaultFilters: Filters = { minLikes: 0, destinationQuery: "" };
 
+/** Delay before a filter change is sent to the server. */
+const FILTER_DEBOUNCE_MS = 300;
+
+/** Apply per-destination changes from a stream delta (likes 0 = removed). */
+export function applyLikesChanges(
+  rows: LikesDistributionItem[],
+  changes: LikesDistributionItem[]
+): LikesDistributionItem[] {
+  const byDestination = new Map(rows.map((r) => [r.destination, r.likes]));
+  for (const { destination, likes } of changes) {
+    if (likes > 0) byDestination.set(destination, likes);
+    else byDestination.delete(destination);
+  }
+  return Array.from(byDestination, ([destination, likes]) => ({ destination, likes })).sort((a, b) =>
+    a.destination.localeCompare(b.destination)
+  );
+}
+
 /** Admin-only statistics page with KPIs and charts. */
 const Statistics: React.FC = () => {
   const [past, setPast] = useState<number | undefined>();
@@ -70,25 +88,27 @@ const Statistics: React.FC = () => {
   const [totalUsers, setTotalUsers] = useState<number | undefined>();
   const [totalLikes, setTotalLikes] = useState<number | undefined>();
   const [distribution, setDistribution] = useState<LikesDistributionItem[]>([]);
+  const [filtered, setFiltered] = useState<LikesDistributionItem[]>([]);
   const [filters, setFilters] = useState<Filters>(defaultFilters);
   const [bannerError, setBannerError] = useState<string | null>(null);
 
+  // Live KPIs: a snapshot, then deltas pushed by the server when data changes.
   useEffect(() => {
-    (async () => {
+    const apply = (d: Dashboard) => {
+      setPast(d.pastVacations);
+      setOngoing(d.ongoingVacations);
+      setFuture(d.futureVacations);
+      setTotalUsers(d.totalUsers);
+      setTotalLikes(d.totalLikes);
+      setDistribution(d.likesDistribution);
+      setBannerError(null);
+    };
+
+    // One plain request: used where EventSource is unavailable, and to learn
+    // why the stream failed to open (EventSource hides the status code).
+    const loadOnce = async () => {
       try {
-        const [v, u, l, d] = await Promise.all([
-          getVacationsStats(),
-          getTotalUsers(),
-          getTotalLikes(),
-          getLikesDistribution(),
-        ]);
-        setPast(v.pastVacations);
-        setOngoing(v.ongoingVacations);
-        setFuture(v.futureVacations);
-        setTotalUsers(u.totalUsers);
-        setTotalLikes(l.totalLikes);
-        setDistribution(d);
-        setBannerError(null);
+        apply(await getDashboard());
       } catch (err) {
         const e = err as Error & { status?: number };
         if (e.status === 401) {
@@ -103,14 +123,56 @@ const Statistics: React.FC = () => {
         setTotalLikes(undefined);
         setDistribution([]);
       }
-    })();
+    };
+
+    let opened = false;
+    let fellBack = false;
+    const close = subscribeDashboard({
+      onSnapshot: (d) => {
+        opened = true;
+        apply(d);
+      },
+      onDelta: (d) => {
+        if (d.pastVacations !== undefined) setPast(d.pastVacations);
+        if (d.ongoingVacations !== undefined) setOngoing(d.ongoingVacations);
+        if (d.futureVacations !== undefined) setFuture(d.futureVacations);
+        if (d.totalUsers !== undefined) setTotalUsers(d.totalUsers);
+        if (d.totalLikes !== undefined) setTotalLikes(d.totalLikes);
+        const changes = d.likesChanged;
+        if (changes) setDistribution((rows) => applyLikesChanges(rows, changes));
+      },
+      // After the first snapshot EventSource reconnects by itself.
+      onError: () => {
+        if (!opened && !fellBack) {
+          fellBack = true;
+          loadOnce();
+        }
+      },
+    });
+    if (!close) loadOnce();
+    return () => close?.();
   }, []);
 
-  const filtered = useMemo<LikesDistributionItem[]>(() => {
-    const q = filters.destinationQuery.trim().toLowerCase();
-    return distribution
-      .filter((x) => x.likes >= filters.minLikes)
-      .filter((x) => (q ? x.destination.toLowerCase().includes(q) : true));
+  // Unfiltered view comes from the dashboard; filtered views are computed by the server.
+  useEffect(() => {
+    const q = filters.destinationQuery.trim();
+    if (filters.minLikes <= 0 && !q) {
+      setFiltered(distribution);
+      return;
+    }
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const rows = await getLikesDistribution({ minLikes: filters.minLikes, q });
+        if (!cancelled) setFiltered(rows);
+      } catch {
+        if (!cancelled) setFiltered([]);
+      }
+    }, FILTER_DEBOUNCE_MS);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
   }, [distribution, filters]);
 
   return (
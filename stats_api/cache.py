@@ -0,0 +1,120 @@
+"""Invalidation-aware cache for the statistics endpoints.
+
+Callers key entries on the response's ETag (vacations.conditional.make_etag),
+a hash of the database change counters of the tables it reads, so a write
+to any of them, from whichever service, makes the cached result
+unreachable. TTLs come from settings.STATS_CACHE_TIMEOUTS; hits and misses
+are counted in the cache itself so the ratio is shared across worker
+processes.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+T = TypeVar("T")
+
+HITS_KEY = "stats:cache:hits"
+MISSES_KEY = "stats:cache:misses"
+DEFAULT_TIMEOUT = 60
+
+
+def _timeout_for(name: str) -> int:
+    timeouts: Dict[str, int] = getattr(settings, "STATS_CACHE_TIMEOUTS", {})
+    return int(timeouts.get(name, DEFAULT_TIMEOUT))
+
+
+def seconds_until_utc_midnight(now: Optional[datetime] = None) -> int:
+    """Seconds left until the next 00:00 UTC (at least 1)."""
+    now = now or datetime.now(dt_timezone.utc)
+    midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return max(1, int((midnight - now).total_seconds()))
+
+
+def _count(key: str) -> None:
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, 1, timeout=None)
+
+
+def _lookup(name: str, key_parts: Tuple[Any, ...]) -> Tuple[str, Any]:
+    key = ":".join(["stats", name, *map(str, key_parts)])
+    value = cache.get(key)
+    _count(MISSES_KEY if value is None else HITS_KEY)
+    return key, value
+
+
+def _store(name: str, key: str, value: Any, until_midnight: bool) -> None:
+    timeout = _timeout_for(name)
+    if until_midnight:
+        timeout = min(timeout, seconds_until_utc_midnight())
+    cache.set(key, value, timeout)
+
+
+def cached(name: str, builder: Callable[[], T], *key_parts: Any, until_midnight: bool = False) -> T:
+    """
+    Return the cached result of ``builder`` or compute and store it.
+
+    :param name: Endpoint name, also the STATS_CACHE_TIMEOUTS key
+    :param builder: Zero-argument function computing the value
+    :param key_parts: Values distinguishing cache entries; include the data
+        version, e.g. the response's ETag
+    :param until_midnight: Cap the TTL at the next UTC midnight (date-relative data)
+    :return: Cached or freshly computed value
+    """
+    if _timeout_for(name) <= 0:
+        return builder()
+
+    key, value = _lookup(name, key_parts)
+    if value is None:
+        value = builder()
+        _store(name, key, value, until_midnight)
+    return value
+
+
+async def acached(name: str, builder: Callable[[], Awaitable[T]], *key_parts: Any,
+                  until_midnight: bool = False) -> T:
+    """Async ``cached``: ``builder`` returns an awaitable."""
+    if _timeout_for(name) <= 0:
+        return await builder()
+
+    key, value = await sync_to_async(_lookup)(name, key_parts)
+    if value is None:
+        value = await builder()
+        await sync_to_async(_store)(name, key, value, until_midnight)
+    return value
+
+
+def cache_info() -> Dict[str, Any]:
+    """Return hit/miss counters and the hit ratio."""
+    hits = int(cache.get(HITS_KEY) or 0)
+    misses = int(cache.get(MISSES_KEY) or 0)
+    total = hits + misses
+    return {"hits": hits, "misses": misses, "hitRatio": round(hits / total, 4) if total else 0.0}
+
+
+ADMIN_KEY = "stats:admin:{version}:{user_id}"
+
+
+def get_cached_admin(user_id: int, user_version: int) -> Optional[bool]:
+    """
+    Return the cached admin flag for a user, or None if unknown.
+
+    :param user_id: User id from the session
+    :param user_version: Current "user" change counter (bumped by any
+        write to users or roles, so a role change makes the entry unreachable)
+    :return: Cached flag or None
+    """
+    return cache.get(ADMIN_KEY.format(version=user_version, user_id=user_id))
+
+
+def cache_admin(user_id: int, user_version: int, is_admin: bool) -> None:
+    """Remember whether a user is an admin, for STATS_ADMIN_CACHE_TTL seconds or until users or roles change."""
+    timeout: int = int(getattr(settings, "STATS_ADMIN_CACHE_TTL", 300))
+    cache.set(ADMIN_KEY.format(version=user_version, user_id=user_id), is_admin, timeout)
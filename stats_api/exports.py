@@ -0,0 +1,94 @@
+"""Row generators for the streaming export endpoints.
+
+Rows are read with ``QuerySet.iterator(chunk_size=...)``, which on Postgres
+uses a server-side cursor: only one chunk is held in memory at a time, so
+memory use does not depend on table size. Each generator yields encoded
+lines ready to be handed to a ``StreamingHttpResponse``; under ASGI wrap it
+in ``aiter_chunks`` first.
+"""
+from __future__ import annotations
+
+import csv
+import json
+from itertools import islice
+from typing import Any, AsyncIterator, Generator, Iterator, List
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from vacations.models import Like, Vacation
+
+EXPORT_CHUNK_SIZE = 2000
+
+LIKE_COLUMNS: List[str] = [
+    "like_id", "user_id", "user_email", "user_first_name", "user_last_name",
+    "vacation_id", "country", "start_date", "end_date", "price",
+]
+_LIKE_FIELDS: List[str] = [
+    "id", "user_id", "user__email", "user__first_name", "user__last_name",
+    "vacation_id", "vacation__country__name", "vacation__start_date", "vacation__end_date",
+    "vacation__price",
+]
+
+_VACATION_FIELDS: List[str] = [
+    "id", "country__name", "description", "start_date", "end_date", "price",
+    "image_filename", "like_count",
+]
+
+
+class _Echo:
+    """File-like object whose write() returns the line instead of buffering it."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def likes_csv(chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Yield every like joined with its user, vacation and country as CSV lines.
+
+    :param chunk_size: Rows fetched per server-side cursor round trip
+    :return: Iterator of CSV lines, header first
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow(LIKE_COLUMNS)
+    rows = Like.objects.order_by("id").values_list(*_LIKE_FIELDS)
+    for row in rows.iterator(chunk_size=chunk_size):
+        yield writer.writerow(row)
+
+
+def vacations_ndjson(chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Yield every vacation as one JSON object per line.
+
+    :param chunk_size: Rows fetched per server-side cursor round trip
+    :return: Iterator of newline-terminated JSON documents
+    """
+    rows = Vacation.objects.order_by("id").values(*_VACATION_FIELDS)
+    for row in rows.iterator(chunk_size=chunk_size):
+        item: dict[str, Any] = dict(row)
+        item["country"] = item.pop("country__name")
+        yield json.dumps(item, cls=DjangoJSONEncoder) + "\n"
+
+
+async def aiter_chunks(
+    lines: Generator[str, None, None], chunk_size: int = EXPORT_CHUNK_SIZE
+) -> AsyncIterator[str]:
+    """
+    Serve one of the generators above to an ASGI server.
+
+    Under ASGI a ``StreamingHttpResponse`` consumes a sync iterator by
+    buffering the whole body. This pulls ``chunk_size`` lines at a time on
+    the request's sync thread, which owns the server-side cursor and its
+    connection, and yields them joined.
+
+    :param lines: Line generator, e.g. ``likes_csv()``
+    :param chunk_size: Lines per chunk (one thread hop each)
+    :return: Async iterator of text chunks
+    """
+    take = sync_to_async(lambda: "".join(islice(lines, chunk_size)))
+    try:
+        while chunk := await take():
+            yield chunk
+    finally:
+        # Client gone or body done: release the cursor on its own thread
+        await sync_to_async(lines.close)()
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from stats_api.services import take_snapshot
+
+
+class Command(BaseCommand):
+    """
+    Custom Django management command to record the daily statistics snapshot.
+    """
+
+    help = (
+        "Store today's dashboard KPIs and likes distribution in vacations_statssnapshot "
+        "(rerunning the same UTC day replaces its row)."
+    )
+
+    def handle(self, *args, **options) -> None:
+        """
+        Upsert the snapshot of the current UTC day.
+        """
+        day = timezone.now().date()
+        payload = take_snapshot(day)
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Stored the {day} snapshot ({payload['totalLikes']} likes, "
+            f"{len(payload['likesDistribution'])} destinations)."
+        ))
@@ -0,0 +1,453 @@
+"""Aggregate queries shared by the statistics endpoints.
+
+Each query has an async twin (``a``-prefixed) for the async views. Single
+aggregates use Django's async ORM; the dashboard runs its independent
+aggregates concurrently with ``gather_queries``.
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import Count, DateField, ExpressionWrapper, F, Q, QuerySet, Sum, Value
+from django.db.models.functions import Greatest, Trunc
+from django.utils import timezone
+from vacations.models import LikeRollup, StatsSnapshot, User, Vacation
+
+_query_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _bucket_aggregates(as_of: date) -> Dict[str, Count]:
+    return {
+        "past": Count("id", filter=Q(end_date__lt=as_of)),
+        "ongoing": Count("id", filter=Q(start_date__lte=as_of, end_date__gte=as_of)),
+        "future": Count("id", filter=Q(start_date__gt=as_of)),
+    }
+
+
+def _buckets(counts: Dict[str, int]) -> Dict[str, int]:
+    return {
+        "pastVacations": int(counts["past"]),
+        "ongoingVacations": int(counts["ongoing"]),
+        "futureVacations": int(counts["future"]),
+    }
+
+
+def get_vacation_buckets(as_of: date) -> Dict[str, int]:
+    """
+    Count past, ongoing and future vacations relative to a given day.
+
+    All three buckets are computed by a single conditional aggregate, so the
+    table is scanned once whatever the reference date.
+
+    :param as_of: Reference date for the split
+    :return: Dict with pastVacations, ongoingVacations and futureVacations
+    """
+    return _buckets(Vacation.objects.aggregate(**_bucket_aggregates(as_of)))
+
+
+async def aget_vacation_buckets(as_of: date) -> Dict[str, int]:
+    """Async ``get_vacation_buckets``."""
+    return _buckets(await Vacation.objects.aaggregate(**_bucket_aggregates(as_of)))
+
+
+def get_total_users() -> int:
+    """
+    Return the total number of registered users.
+
+    :return: User count
+    """
+    return User.objects.count()
+
+
+async def aget_total_users() -> int:
+    """Async ``get_total_users``."""
+    return await User.objects.acount()
+
+
+def get_total_likes() -> int:
+    """
+    Return the total number of likes, summed from the per-vacation counters.
+
+    :return: Like count
+    """
+    total = Vacation.objects.aggregate(total=Sum("like_count"))["total"]
+    return int(total or 0)
+
+
+async def aget_total_likes() -> int:
+    """Async ``get_total_likes``."""
+    total = (await Vacation.objects.aaggregate(total=Sum("like_count")))["total"]
+    return int(total or 0)
+
+
+DISTRIBUTION_ORDERS: Dict[str, tuple] = {
+    "destination": ("country__name",),
+    "-destination": ("-country__name",),
+    "likes": ("likes", "country__name"),
+    "-likes": ("-likes", "country__name"),
+}
+
+
+def _distribution_rows(min_likes: int, q: str, top: Optional[int], order: str) -> QuerySet:
+    rows = Vacation.objects.all()
+    if q:
+        rows = rows.filter(country__name__icontains=q)
+    rows = (
+        rows
+        .values("country__name")
+        .annotate(likes=Sum("like_count"))
+        .filter(likes__gte=max(min_likes, 1))
+        .order_by(*DISTRIBUTION_ORDERS[order])
+    )
+    if top is not None:
+        rows = rows[:top]
+    return rows
+
+
+def _distribution_item(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {"destination": str(row.get("country__name") or ""), "likes": int(row["likes"])}
+
+
+def get_likes_distribution(
+    min_likes: int = 0, q: str = "", top: Optional[int] = None, order: str = "destination",
+) -> List[Dict[str, Any]]:
+    """
+    Return likes grouped per destination.
+
+    Reads the per-vacation counters, so the likes table is not scanned.
+    Destinations without likes are always omitted. Filtering, ordering and
+    the top-N cut run in SQL, so only the rows shown are returned.
+
+    :param min_likes: Minimum likes per destination (HAVING)
+    :param q: Case-insensitive substring of the destination name (WHERE)
+    :param top: Keep only the first N rows after ordering (LIMIT)
+    :param order: One of DISTRIBUTION_ORDERS
+    :return: List of {"destination": str, "likes": int} items
+    """
+    return [_distribution_item(r) for r in _distribution_rows(min_likes, q, top, order)]
+
+
+async def aget_likes_distribution(
+    min_likes: int = 0, q: str = "", top: Optional[int] = None, order: str = "destination",
+) -> List[Dict[str, Any]]:
+    """Async ``get_likes_distribution``."""
+    return [_distribution_item(r) async for r in _distribution_rows(min_likes, q, top, order)]
+
+
+TREND_GRANULARITIES = ("day", "week", "month")
+
+
+def period_start(day: date, granularity: str) -> date:
+    """
+    First day of the trend period containing ``day`` (weeks start on Monday).
+
+    :param day: Any day
+    :param granularity: One of TREND_GRANULARITIES
+    :return: Start of the day, ISO week or month
+    """
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def count_trend_periods(start: date, end: date, granularity: str) -> int:
+    """
+    Number of periods overlapping ``start``..``end``, without listing them.
+
+    :param start: First day (inclusive)
+    :param end: Last day (inclusive)
+    :param granularity: One of TREND_GRANULARITIES
+    :return: Period count
+    """
+    if granularity == "month":
+        return (end.year - start.year) * 12 + end.month - start.month + 1
+    step = 7 if granularity == "week" else 1
+    return (period_start(end, granularity) - period_start(start, granularity)).days // step + 1
+
+
+def trend_periods(start: date, end: date, granularity: str) -> List[date]:
+    """
+    Start dates of every period overlapping ``start``..``end``.
+
+    :param start: First day (inclusive)
+    :param end: Last day (inclusive)
+    :param granularity: One of TREND_GRANULARITIES
+    :return: Period starts in ascending order
+    """
+    first = period_start(start, granularity)
+    count = count_trend_periods(start, end, granularity)
+    if granularity == "month":
+        return [
+            date(first.year + (first.month - 1 + i) // 12, (first.month - 1 + i) % 12 + 1, 1)
+            for i in range(count)
+        ]
+    step = timedelta(days=7 if granularity == "week" else 1)
+    return [first + step * i for i in range(count)]
+
+
+def _trend_rows(start: date, end: date, granularity: str, country: Optional[int]) -> QuerySet:
+    rows = LikeRollup.objects.filter(bucket__gte=start, bucket__lte=end)
+    if country is not None:
+        rows = rows.filter(vacation__country_id=country)
+    return (
+        rows
+        .annotate(period=Trunc("bucket", granularity, output_field=DateField()))
+        .values("period")
+        .annotate(likes=Sum("likes"))
+        .order_by()
+    )
+
+
+def _trend(periods: List[date], counts: Dict[date, int]) -> List[Dict[str, Any]]:
+    return [{"period": period, "likes": counts.get(period, 0)} for period in periods]
+
+
+def get_likes_trend(
+    start: date, end: date, granularity: str = "day", country: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Return the likes created per day, week or month.
+
+    Reads the daily rollups (vacations_likerollup), never the likes table,
+    so the cost follows the number of days in range, not the number of
+    likes. Likes later removed are not counted. Periods without likes are
+    included with 0; the first and last periods only count days in range.
+
+    :param start: First day (inclusive)
+    :param end: Last day (inclusive)
+    :param granularity: One of TREND_GRANULARITIES
+    :param country: Only count vacations of this country ID
+    :return: List of {"period": date, "likes": int} items, oldest first
+    """
+    rows = _trend_rows(start, end, granularity, country)
+    counts = {row["period"]: int(row["likes"]) for row in rows}
+    return _trend(trend_periods(start, end, granularity), counts)
+
+
+async def aget_likes_trend(
+    start: date, end: date, granularity: str = "day", country: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Async ``get_likes_trend``."""
+    rows = _trend_rows(start, end, granularity, country)
+    counts = {row["period"]: int(row["likes"]) async for row in rows}
+    return _trend(trend_periods(start, end, granularity), counts)
+
+
+def _occupancy_rows(start: date, end: date) -> QuerySet:
+    overlapping = Vacation.objects.filter(start_date__lte=end, end_date__gte=start).order_by()
+    # +n on the first day in range, -n the day after the last one
+    starts = (
+        overlapping.annotate(day=Greatest("start_date", Value(start, output_field=DateField())))
+        .values("day").annotate(delta=Count("id"))
+    )
+    ends = (
+        overlapping.filter(end_date__lt=end)
+        .annotate(day=ExpressionWrapper(F("end_date") + 1, output_field=DateField()))
+        .values("day").annotate(delta=-Count("id"))
+    )
+    return starts.union(ends, all=True)
+
+
+def _occupancy(start: date, end: date, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    deltas = [0] * ((end - start).days + 1)
+    for row in rows:
+        deltas[(row["day"] - start).days] += row["delta"]
+    return [
+        {"day": start + timedelta(days=i), "ongoingVacations": count}
+        for i, count in enumerate(itertools.accumulate(deltas))
+    ]
+
+
+def get_occupancy(start: date, end: date) -> List[Dict[str, Any]]:
+    """
+    Count the vacations running on each day between two days.
+
+    A difference array: one grouped statement returns how many vacations
+    start and end on each day of the range, and a running sum turns those
+    into daily counts. The work is one scan of the overlapping vacations
+    plus one step per day, instead of one count per day.
+
+    :param start: First day (inclusive)
+    :param end: Last day (inclusive)
+    :return: List of {"day": date, "ongoingVacations": int} items, one per day
+    """
+    return _occupancy(start, end, list(_occupancy_rows(start, end)))
+
+
+async def aget_occupancy(start: date, end: date) -> List[Dict[str, Any]]:
+    """Async ``get_occupancy``."""
+    return _occupancy(start, end, [row async for row in _occupancy_rows(start, end)])
+
+
+def _dashboard(buckets: Dict[str, int], total_users: int,
+               distribution: List[Dict[str, Any]]) -> Dict[str, Any]:
+    payload: Dict[str, Any] = dict(buckets)
+    payload["totalUsers"] = total_users
+    payload["totalLikes"] = sum(item["likes"] for item in distribution)
+    payload["likesDistribution"] = distribution
+    return payload
+
+
+def get_dashboard(as_of: date) -> Dict[str, Any]:
+    """
+    Return every dashboard KPI in one payload.
+
+    Every like belongs to a vacation and every vacation to a country, so the
+    like total is the sum of the distribution and needs no extra query.
+
+    :param as_of: Reference date for the vacation buckets
+    :return: Dict with the vacation buckets, totalUsers, totalLikes and likesDistribution
+    """
+    distribution: List[Dict[str, Any]] = get_likes_distribution()
+    return _dashboard(get_vacation_buckets(as_of), get_total_users(), distribution)
+
+
+async def aget_dashboard(as_of: date) -> Dict[str, Any]:
+    """
+    Async ``get_dashboard``: the three aggregates run concurrently.
+
+    :param as_of: Reference date for the vacation buckets
+    :return: Same payload as get_dashboard
+    """
+    buckets, total_users, distribution = await gather_queries(
+        (get_vacation_buckets, as_of), (get_total_users,), (get_likes_distribution,),
+    )
+    return _dashboard(buckets, total_users, distribution)
+
+
+# Snapshot column -> dashboard KPI
+SNAPSHOT_KPIS: Dict[str, str] = {
+    "past_vacations": "pastVacations",
+    "ongoing_vacations": "ongoingVacations",
+    "future_vacations": "futureVacations",
+    "total_users": "totalUsers",
+    "total_likes": "totalLikes",
+}
+WEEK = timedelta(days=7)
+
+
+def take_snapshot(day: date) -> Dict[str, Any]:
+    """
+    Store the current dashboard KPIs as the snapshot of ``day``.
+
+    A single upsert, so reruns on the same day (or concurrent ones)
+    replace that day's row with the latest figures.
+
+    :param day: Snapshot day, also the reference date for the vacation buckets
+    :return: The dashboard payload that was stored
+    """
+    payload = get_dashboard(day)
+    StatsSnapshot.objects.bulk_create(
+        [StatsSnapshot(
+            day=day, likes_distribution=payload["likesDistribution"], taken_at=timezone.now(),
+            **{column: payload[kpi] for column, kpi in SNAPSHOT_KPIS.items()},
+        )],
+        update_conflicts=True, unique_fields=["day"],
+        update_fields=[*SNAPSHOT_KPIS, "likes_distribution", "taken_at"],
+    )
+    return payload
+
+
+def _history_rows(start: date, end: date) -> QuerySet:
+    # Also the week before ``start``, for the first deltas
+    since = start - WEEK if start > date.min + WEEK else date.min
+    return (
+        StatsSnapshot.objects.filter(day__gte=since, day__lte=end)
+        .order_by("day")
+        .values("day", "likes_distribution", *SNAPSHOT_KPIS)
+    )
+
+
+def _history(rows: List[Dict[str, Any]], start: date) -> List[Dict[str, Any]]:
+    by_day = {row["day"]: row for row in rows}
+    history: List[Dict[str, Any]] = []
+    for row in rows:
+        if row["day"] < start:
+            continue
+        week_ago = by_day.get(row["day"] - WEEK)
+        item: Dict[str, Any] = {"day": row["day"]}
+        item.update((kpi, row[column]) for column, kpi in SNAPSHOT_KPIS.items())
+        item["likesDistribution"] = row["likes_distribution"]
+        item["weekOverWeek"] = {
+            kpi: row[column] - week_ago[column] if week_ago else None
+            for column, kpi in SNAPSHOT_KPIS.items()
+        }
+        history.append(item)
+    return history
+
+
+def get_stats_history(start: date, end: date) -> List[Dict[str, Any]]:
+    """
+    Return the daily snapshots between two days with week-over-week deltas.
+
+    Days without a snapshot are skipped. ``weekOverWeek`` holds each KPI
+    minus its value seven days earlier, or None where that snapshot is
+    missing.
+
+    :param start: First day (inclusive)
+    :param end: Last day (inclusive)
+    :return: List of {"day", <KPIs>, "likesDistribution", "weekOverWeek"} items, oldest first
+    """
+    return _history(list(_history_rows(start, end)), start)
+
+
+async def aget_stats_history(start: date, end: date) -> List[Dict[str, Any]]:
+    """Async ``get_stats_history``."""
+    return _history([row async for row in _history_rows(start, end)], start)
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _query_executor
+    if _query_executor is None:
+        _query_executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, "STATS_QUERY_WORKERS", 8), thread_name_prefix="stats-query",
+        )
+    return _query_executor
+
+
+def _run_on_worker(func: Callable[..., Any], *args: Any) -> Any:
+    try:
+        return func(*args)
+    finally:
+        # Like the end of a request: hand a pooled connection back, or keep a
+        # persistent one open until CONN_MAX_AGE.
+        close_old_connections()
+
+
+def _in_transaction() -> bool:
+    if connection.in_atomic_block:
+        return True
+    # Hand a pooled request connection back rather than hold it while the
+    # workers wait for theirs (the pool could run dry under load).
+    close_old_connections()
+    return False
+
+
+async def gather_queries(*calls: Tuple[Any, ...]) -> List[Any]:
+    """
+    Run independent sync query functions concurrently.
+
+    Django's async ORM runs every query of a request on the request's one
+    sync thread and connection, so awaiting several of them together does
+    not overlap them. Here each call runs on a ``STATS_QUERY_WORKERS``
+    thread, and each worker thread holds its own (pooled or persistent)
+    connection. Inside a transaction (tests, ``ATOMIC_REQUESTS``) the calls
+    run one after another on the request's connection, the only one that
+    sees its uncommitted writes.
+
+    :param calls: ``(function, *args)`` tuples
+    :return: Results, in call order
+    """
+    if await sync_to_async(_in_transaction)():
+        return [await sync_to_async(func)(*args) for func, *args in calls]
+    run = sync_to_async(_run_on_worker, thread_sensitive=False, executor=_executor())
+    return list(await asyncio.gather(*(run(func, *args) for func, *args in calls)))
@@ -0,0 +1,207 @@
+"""Server-Sent Events feed of the dashboard KPIs.
+
+One ``DashboardFeed`` per event loop polls the per-table change counters (one
+primary-key read of ``vacations_dataversion``, bumped by database triggers, so
+writes from any process count) every ``STATS_STREAM_POLL_SECONDS`` while at
+least one client is connected. When a counter moves, only the KPIs computed from that
+table are recomputed, concurrently and once for all clients; each client is
+then sent the fields that differ from what it last received. An idle
+connection costs a keep-alive comment every ``STATS_STREAM_KEEPALIVE_SECONDS``
+and no thread.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import weakref
+from datetime import date
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from vacations.versions import get_table_versions
+from . import services
+
+logger = logging.getLogger(__name__)
+
+RETRY_MS = 5000
+
+
+def _likes_part(as_of: date) -> Dict[str, Any]:
+    distribution: List[Dict[str, Any]] = services.get_likes_distribution()
+    return {"totalLikes": sum(item["likes"] for item in distribution), "likesDistribution": distribution}
+
+
+# Dashboard part -> (what it is computed from, builder). "day" moves at midnight UTC.
+PARTS: Dict[str, Tuple[Tuple[str, ...], Callable[[date], Dict[str, Any]]]] = {
+    "buckets": (("vacation", "day"), services.get_vacation_buckets),
+    "users": (("user",), lambda as_of: {"totalUsers": services.get_total_users()}),
+    "likes": (("vacation", "like", "country"), _likes_part),
+}
+
+
+def _versions() -> Dict[str, Any]:
+    versions: Dict[str, Any] = get_table_versions("vacation", "like", "user", "country")
+    versions["day"] = timezone.now().date()
+    return versions
+
+
+async def _build(parts: List[str], as_of: date) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {}
+    for result in await services.gather_queries(*((PARTS[part][1], as_of) for part in parts)):
+        payload.update(result)
+    return payload
+
+
+def diff(sent: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Return the KPIs of ``current`` that differ from ``sent``.
+
+    The distribution is diffed per destination: ``likesChanged`` lists the
+    destinations whose count changed, with ``likes`` 0 for removed ones.
+
+    :param sent: State the client already has
+    :param current: New state
+    :return: Delta payload (empty if nothing changed)
+    """
+    delta = {
+        key: value for key, value in current.items()
+        if key != "likesDistribution" and sent.get(key) != value
+    }
+    old = {item["destination"]: item["likes"] for item in sent.get("likesDistribution", [])}
+    new = {item["destination"]: item["likes"] for item in current.get("likesDistribution", [])}
+    changed = [
+        {"destination": name, "likes": new.get(name, 0)}
+        for name in sorted(old.keys() | new.keys()) if old.get(name) != new.get(name)
+    ]
+    if changed:
+        delta["likesChanged"] = changed
+    return delta
+
+
+def _event(name: str, data: Dict[str, Any]) -> str:
+    return f"event: {name}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
+
+
+class DashboardFeed:
+    """Shared dashboard state for the streams of one event loop."""
+
+    def __init__(self) -> None:
+        self.state: Dict[str, Any] = {}
+        self.generation = 0
+        self._versions: Dict[str, Any] = {}
+        self._changed = asyncio.Event()
+        self._clients = 0
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    async def refresh(self) -> bool:
+        """
+        Recompute the parts whose inputs changed since the last refresh.
+
+        :return: True if the state was updated
+        """
+        versions = await sync_to_async(_versions)()
+        stale = [
+            part for part, (inputs, _) in PARTS.items()
+            if any(versions[name] != self._versions.get(name) for name in inputs)
+        ]
+        if not stale:
+            return False
+        # Versions are read first, so a change landing mid-build is seen next poll.
+        updates = await _build(stale, versions["day"])
+        self._versions = versions
+        self.state = {**self.state, **updates}
+        self.generation += 1
+        self._changed.set()
+        self._changed = asyncio.Event()
+        return True
+
+    async def connect(self) -> Dict[str, Any]:
+        """
+        Register a client, starting the poller for the first one.
+
+        :return: Current dashboard state
+        """
+        async with self._lock:
+            self._clients += 1
+            if self._task is None:
+                self._versions = {}  # nobody polled meanwhile: rebuild everything
+                try:
+                    await self.refresh()
+                except BaseException:
+                    self._clients -= 1
+                    raise
+                self._task = asyncio.create_task(self._poll())
+        return self.state
+
+    def disconnect(self) -> None:
+        """Unregister a client, stopping the poller after the last one."""
+        self._clients -= 1
+        if not self._clients and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def wait(self, since: int, timeout: float) -> bool:
+        """
+        Wait until the state is newer than generation ``since``.
+
+        :param since: Generation the caller last saw
+        :param timeout: Seconds to wait at most
+        :return: False if the timeout expired first
+        """
+        if self.generation != since:
+            return True
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(getattr(settings, "STATS_STREAM_POLL_SECONDS", 2))
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Dashboard stream refresh failed")
+
+
+_feeds: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, DashboardFeed]" = weakref.WeakKeyDictionary()
+
+
+def get_feed() -> DashboardFeed:
+    """Return the feed of the running event loop."""
+    loop = asyncio.get_running_loop()
+    if loop not in _feeds:
+        _feeds[loop] = DashboardFeed()
+    return _feeds[loop]
+
+
+async def dashboard_events(feed: DashboardFeed) -> AsyncIterator[str]:
+    """
+    Yield a ``snapshot`` event with every KPI, then ``delta`` events with the
+    changed ones (see ``diff``).
+
+    :param feed: Feed of the running event loop
+    :return: Async iterator of SSE frames
+    """
+    sent = await feed.connect()
+    seen = feed.generation
+    try:
+        yield f"retry: {RETRY_MS}\n" + _event("snapshot", sent)
+        keepalive = getattr(settings, "STATS_STREAM_KEEPALIVE_SECONDS", 15)
+        while True:
+            if not await feed.wait(seen, keepalive):
+                yield ": keep-alive\n\n"
+                continue
+            current, seen = feed.state, feed.generation
+            delta = diff(sent, current)
+            if delta:
+                yield _event("delta", delta)
+            sent = current
+    finally:
+        feed.disconnect()
@@ -1,3 +1,778 @@
-from django.test import TestCase
+"""Tests for the statistics API endpoints."""
+from __future__ import annotations
 
-# Create your tests here.
+import csv
+import json
+import threading
+import tracemalloc
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from typing import Any, Dict, List
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from stats_api.cache import seconds_until_utc_midnight
+from stats_api.services import aget_dashboard, gather_queries, get_dashboard, get_vacation_buckets
+from vacations.models import Country, Like, Role, StatsSnapshot, User, Vacation
+from vacations.services import add_like, remove_like, rollup_likes
+
+
+class StatsApiTestCase(TestCase):
+    """Seed a small catalogue and log in as admin."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        admin_role = Role.objects.create(name="admin")
+        user_role = Role.objects.create(name="user")
+        cls.admin = User.objects.create(
+            first_name="Admin", last_name="User", email="admin@admin.com",
+            password="adminadmin", role=admin_role, is_staff=True,
+        )
+        cls.user = User.objects.create(
+            first_name="Dan", last_name="Doe", email="dan@example.com",
+            password="12345678", role=user_role,
+        )
+        italy = Country.objects.create(name="Italy")
+        japan = Country.objects.create(name="Japan")
+
+        today = timezone.now().date()
+        cls.past = cls._vacation(italy, today - timedelta(days=20), today - timedelta(days=10))
+        cls.ongoing = cls._vacation(japan, today - timedelta(days=1), today + timedelta(days=1))
+        cls.future = cls._vacation(italy, today + timedelta(days=10), today + timedelta(days=20))
+
+        add_like(cls.admin.id, cls.past.id)
+        add_like(cls.user.id, cls.past.id)
+        add_like(cls.user.id, cls.ongoing.id)
+
+    @staticmethod
+    def _vacation(country: Country, start: date, end: date) -> Vacation:
+        return Vacation.objects.create(
+            country=country, description=f"{country.name} trip", start_date=start,
+            end_date=end, price=1000, image_filename="x.jpg",
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+        session = self.client.session
+        session["user_id"] = self.admin.id
+        session.save()
+
+    def get_json(self, name: str, **params: Any) -> Any:
+        response = self.client.get(reverse(name), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+
+class DashboardTests(StatsApiTestCase):
+    def test_payload_matches_single_endpoints(self) -> None:
+        data: Dict[str, Any] = self.get_json("dashboard")
+
+        self.assertEqual(data["pastVacations"], 1)
+        self.assertEqual(data["ongoingVacations"], 1)
+        self.assertEqual(data["futureVacations"], 1)
+        self.assertEqual(data["totalUsers"], self.get_json("total_users")["totalUsers"])
+        self.assertEqual(data["totalLikes"], self.get_json("total_likes")["totalLikes"])
+        self.assertEqual(data["likesDistribution"], self.get_json("likes_distribution"))
+        self.assertEqual(
+            data["likesDistribution"],
+            [{"destination": "Italy", "likes": 2}, {"destination": "Japan", "likes": 1}],
+        )
+
+    def test_single_auth_query_and_three_aggregates(self) -> None:
+        # session + auth + change counters + buckets + users + distribution
+        with self.assertNumQueries(6):
+            self.get_json("dashboard")
+
+    def test_requires_admin(self) -> None:
+        session = self.client.session
+        session["user_id"] = self.user.id
+        session.save()
+        self.assertEqual(self.client.get(reverse("dashboard")).status_code, 403)
+
+        self.client.session.flush()
+        self.client.cookies.clear()
+        self.assertEqual(self.client.get(reverse("dashboard")).status_code, 401)
+
+
+class LikesDistributionFilterTests(StatsApiTestCase):
+    def test_filters_run_in_sql(self) -> None:
+        self.assertEqual(
+            self.get_json("likes_distribution", min_likes=2),
+            [{"destination": "Italy", "likes": 2}],
+        )
+        self.assertEqual(
+            self.get_json("likes_distribution", q="jap"),
+            [{"destination": "Japan", "likes": 1}],
+        )
+        self.assertEqual(
+            self.get_json("likes_distribution", order="likes"),
+            [{"destination": "Japan", "likes": 1}, {"destination": "Italy", "likes": 2}],
+        )
+        self.assertEqual(
+            self.get_json("likes_distribution", order="-likes", top=1),
+            [{"destination": "Italy", "likes": 2}],
+        )
+        # session + one grouped query with LIMIT
+        with CaptureQueriesContext(connection) as ctx:
+            self.get_json("likes_distribution", order="-likes", top=1, min_likes=1, q="i")
+        self.assertIn("LIMIT 1", ctx.captured_queries[-1]["sql"])
+
+    def test_filtered_results_are_cached_separately(self) -> None:
+        self.get_json("likes_distribution")
+        self.assertEqual(len(self.get_json("likes_distribution", top=1)), 1)
+        self.assertEqual(len(self.get_json("likes_distribution")), 2)
+
+    def test_invalid_filters(self) -> None:
+        for params in ({"min_likes": "x"}, {"min_likes": -1}, {"top": 0}, {"order": "price"}):
+            response = self.client.get(reverse("likes_distribution"), params)
+            self.assertEqual(response.status_code, 400, params)
+
+
+class VacationsStatsTests(StatsApiTestCase):
+    def test_buckets_use_one_statement(self) -> None:
+        with self.assertNumQueries(1):
+            get_vacation_buckets(timezone.now().date())
+
+    def test_as_of_moves_the_split(self) -> None:
+        today = timezone.now().date()
+        self.assertEqual(
+            self.get_json("vacations_stats"),
+            {"pastVacations": 1, "ongoingVacations": 1, "futureVacations": 1},
+        )
+        as_of = (today + timedelta(days=15)).isoformat()
+        self.assertEqual(
+            self.get_json("vacations_stats", asOf=as_of),
+            {"pastVacations": 2, "ongoingVacations": 1, "futureVacations": 0},
+        )
+
+    def test_view_query_count_is_constant(self) -> None:
+        # session + auth + change counters + one aggregate
+        with self.assertNumQueries(4):
+            self.get_json("vacations_stats", asOf="2020-01-01")
+
+    def test_invalid_as_of(self) -> None:
+        response = self.client.get(reverse("vacations_stats"), {"asOf": "01/02/2020"})
+        self.assertEqual(response.status_code, 400)
+
+
+class StatsCacheTests(StatsApiTestCase):
+    def test_repeat_requests_skip_aggregates(self) -> None:
+        self.get_json("likes_distribution")
+        # session + change counters: admin flag and result come from the cache
+        with self.assertNumQueries(2):
+            self.get_json("likes_distribution")
+        self.assertEqual(self.get_json("stats_cache")["hits"], 1)
+
+    def test_raw_like_path_invalidates(self) -> None:
+        self.assertEqual(self.get_json("total_likes"), {"totalLikes": 3})
+        add_like(self.admin.id, self.future.id)
+        self.assertEqual(self.get_json("total_likes"), {"totalLikes": 4})
+        remove_like(self.admin.id, self.future.id)
+        self.assertEqual(self.get_json("total_likes"), {"totalLikes": 3})
+
+    def test_model_writes_invalidate(self) -> None:
+        self.assertEqual(self.get_json("total_users"), {"totalUsers": 2})
+        User.objects.create(
+            first_name="New", last_name="User", email="new@example.com",
+            password="12345678", role=self.user.role,
+        )
+        self.assertEqual(self.get_json("total_users"), {"totalUsers": 3})
+
+        self.get_json("vacations_stats")
+        Vacation.objects.filter(id=self.future.id).delete()
+        self.assertEqual(self.get_json("vacations_stats")["futureVacations"], 0)
+
+    def test_writes_from_other_processes_invalidate(self) -> None:
+        # The vacations service and psql sessions share only the database
+        # with this process: raw SQL bumps no Python-side counter.
+        self.assertEqual(self.get_json("total_users"), {"totalUsers": 2})
+        self.assertEqual(self.get_json("total_likes"), {"totalLikes": 3})
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO vacations_user (first_name, last_name, email, password, role_id, is_staff)"
+                " VALUES ('Raw', 'Writer', 'raw@example.com', '12345678', %s, false)",
+                [self.user.role_id],
+            )
+            cursor.execute("UPDATE vacations_vacation SET like_count = like_count + 1 WHERE id = %s", [self.future.id])
+        self.assertEqual(self.get_json("total_users"), {"totalUsers": 3})
+        self.assertEqual(self.get_json("total_likes"), {"totalLikes": 4})
+
+    def test_hit_ratio(self) -> None:
+        for _ in range(3):
+            self.get_json("total_users")
+        info = self.get_json("stats_cache")
+        self.assertEqual((info["hits"], info["misses"]), (2, 1))
+        self.assertAlmostEqual(info["hitRatio"], 2 / 3, places=3)
+
+    @override_settings(STATS_CACHE_TIMEOUTS={"total_users": 0})
+    def test_zero_ttl_disables_cache(self) -> None:
+        self.get_json("total_users")
+        with self.assertNumQueries(3):
+            self.get_json("total_users")
+
+    def test_midnight_expiry(self) -> None:
+        now = datetime(2025, 1, 1, 23, 59, 30, tzinfo=dt_timezone.utc)
+        self.assertEqual(seconds_until_utc_midnight(now), 30)
+
+
+class ConditionalGetTests(StatsApiTestCase):
+    ENDPOINTS = ("vacations_stats", "total_users", "total_likes", "likes_distribution", "dashboard")
+
+    def test_304_touches_no_data_tables(self) -> None:
+        self.get_json("vacations_stats")  # warm the admin identity cache
+        for name in self.ENDPOINTS:
+            etag = self.client.get(reverse(name))["ETag"]
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(reverse(name), HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304, name)
+            self.assertEqual(response["ETag"], etag)
+            self.assertEqual(
+                [q["sql"] for q in ctx.captured_queries
+                 if '"vacations_' in q["sql"] and "dataversion" not in q["sql"]],
+                [], name,
+            )
+
+    def test_writes_change_only_dependent_etags(self) -> None:
+        before = {name: self.client.get(reverse(name))["ETag"] for name in self.ENDPOINTS}
+        add_like(self.admin.id, self.future.id)
+        after = {name: self.client.get(reverse(name))["ETag"] for name in self.ENDPOINTS}
+
+        # A like moves vacations.like_count, which date-based stats don't read
+        self.assertEqual(after["total_users"], before["total_users"])
+        self.assertEqual(after["vacations_stats"], before["vacations_stats"])
+        for name in ("total_likes", "likes_distribution", "dashboard"):
+            self.assertNotEqual(after[name], before[name], name)
+
+        response = self.client.get(reverse("total_likes"), HTTP_IF_NONE_MATCH=before["total_likes"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"totalLikes": 4})
+
+    def test_like_count_fixes_count_as_like_changes(self) -> None:
+        before = {name: self.client.get(reverse(name))["ETag"] for name in ("vacations_stats", "total_likes")}
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE vacations_vacation SET like_count = like_count + 1 WHERE id = %s", [self.past.id])
+        self.assertEqual(self.client.get(reverse("vacations_stats"))["ETag"], before["vacations_stats"])
+        response = self.client.get(reverse("total_likes"), HTTP_IF_NONE_MATCH=before["total_likes"])
+        self.assertEqual(response.json(), {"totalLikes": 4})
+
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE vacations_vacation SET end_date = end_date + 1 WHERE id = %s", [self.past.id])
+        self.assertNotEqual(self.client.get(reverse("vacations_stats"))["ETag"], before["vacations_stats"])
+
+    def test_parameters_are_part_of_the_etag(self) -> None:
+        etag = self.client.get(reverse("likes_distribution"))["ETag"]
+        response = self.client.get(reverse("likes_distribution"), {"top": 1}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_unauthenticated_never_gets_304(self) -> None:
+        etag = self.client.get(reverse("total_users"))["ETag"]
+        self.client.cookies.clear()
+        response = self.client.get(reverse("total_users"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 401)
+
+
+class ExportTests(StatsApiTestCase):
+    def stream(self, name: str) -> List[str]:
+        response = self.client.get(reverse(name))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode().splitlines()
+
+    def seed_likes(self, users: int, vacations: int) -> None:
+        """Insert users x vacations likes in SQL (fast enough for tens of thousands)."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO vacations_user (first_name, last_name, email, password, role_id, is_staff) "
+                "SELECT 'Bulk', g::text, 'bulk' || g || '-' || %s || '@example.com', 'x', %s, false "
+                "FROM generate_series(1, %s) AS g",
+                [vacations, self.user.role_id, users],
+            )
+            cursor.execute(
+                "INSERT INTO vacations_vacation "
+                "(country_id, description, start_date, end_date, price, image_filename, like_count) "
+                "SELECT %s, 'Bulk', CURRENT_DATE, CURRENT_DATE + 1, 100, 'x.jpg', 0 "
+                "FROM generate_series(1, %s)",
+                [self.past.country_id, vacations],
+            )
+            cursor.execute(
+                "INSERT INTO vacations_like (user_id, vacation_id) "
+                "SELECT u.id, v.id FROM vacations_user u, vacations_vacation v "
+                "WHERE u.email LIKE %s AND v.description = 'Bulk' "
+                "AND NOT EXISTS (SELECT 1 FROM vacations_like l WHERE l.user_id = u.id AND l.vacation_id = v.id)",
+                [f"bulk%-{vacations}@example.com"],
+            )
+
+    def peak_export_memory(self) -> int:
+        tracemalloc.start()
+        try:
+            response = self.client.get(reverse("export_likes_csv"))
+            for _ in response.streaming_content:
+                pass
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def test_likes_csv(self) -> None:
+        rows = list(csv.reader(self.stream("export_likes_csv")))
+        self.assertEqual(rows[0][:3], ["like_id", "user_id", "user_email"])
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[1][2], "admin@admin.com")
+        self.assertEqual(rows[1][6], "Italy")
+
+    def test_vacations_ndjson(self) -> None:
+        items = [json.loads(line) for line in self.stream("export_vacations_ndjson")]
+        self.assertEqual([i["id"] for i in items], [self.past.id, self.ongoing.id, self.future.id])
+        self.assertEqual(items[0]["country"], "Italy")
+        self.assertEqual(items[0]["like_count"], 2)
+        self.assertEqual(items[0]["price"], "1000.00")
+
+    async def test_asgi_streams_async_iterators(self) -> None:
+        # A sync iterator would make the ASGI handler buffer the whole body
+        self.async_client.cookies = self.client.cookies
+        for name, lines in (("export_likes_csv", 4), ("export_vacations_ndjson", 3)):
+            response = await self.async_client.get(reverse(name))
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.is_async, name)
+            body = b"".join([chunk async for chunk in response.streaming_content])
+            self.assertEqual(len(body.decode().splitlines()), lines, name)
+
+    def test_requires_admin(self) -> None:
+        self.client.cookies.clear()
+        self.assertEqual(self.client.get(reverse("export_likes_csv")).status_code, 401)
+        self.assertEqual(self.client.get(reverse("export_vacations_ndjson")).status_code, 401)
+
+    def test_memory_does_not_grow_with_rows(self) -> None:
+        self.seed_likes(users=50, vacations=100)
+        small = self.peak_export_memory()
+        self.seed_likes(users=100, vacations=200)
+        self.assertEqual(len(self.stream("export_likes_csv")), 1 + 3 + 5000 + 100 * 300)
+        large = self.peak_export_memory()
+        # 7x more rows; a materialized export would need ~7x the memory.
+        self.assertLess(large, small * 2)
+
+
+class AdminIdentityCacheTests(StatsApiTestCase):
+    def login_via_api(self) -> None:
+        self.client.cookies.clear()
+        response = self.client.post(
+            reverse("stats_login"), {"email": "admin@admin.com", "password": "adminadmin"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def user_queries(self, name: str) -> List[str]:
+        with CaptureQueriesContext(connection) as ctx:
+            self.get_json(name)
+        return [q["sql"] for q in ctx.captured_queries if '"vacations_user"' in q["sql"]]
+
+    def test_login_resolves_admin_once(self) -> None:
+        self.login_via_api()
+        for name in ("vacations_stats", "likes_distribution", "total_likes"):
+            self.assertEqual(self.user_queries(name), [], name)
+
+    def test_role_change_invalidates(self) -> None:
+        self.login_via_api()
+        self.get_json("vacations_stats")
+
+        self.admin.role = self.user.role
+        self.admin.save()
+        self.assertEqual(self.client.get(reverse("vacations_stats")).status_code, 403)
+
+    def test_role_rename_invalidates(self) -> None:
+        self.login_via_api()
+        self.get_json("vacations_stats")
+
+        role = self.admin.role
+        role.name = "editor"
+        role.save()
+        self.assertEqual(self.client.get(reverse("vacations_stats")).status_code, 403)
+
+    def test_raw_sql_role_change_invalidates(self) -> None:
+        # No signal fires for raw SQL, as for writes from another process
+        self.login_via_api()
+        self.get_json("vacations_stats")
+
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE vacations_user SET role_id = %s WHERE id = %s", [self.user.role_id, self.admin.id])
+        self.assertEqual(self.client.get(reverse("vacations_stats")).status_code, 403)
+
+    def test_queryset_role_rename_invalidates(self) -> None:
+        self.login_via_api()
+        self.get_json("vacations_stats")
+
+        Role.objects.filter(pk=self.admin.role_id).update(name="editor")
+        self.assertEqual(self.client.get(reverse("vacations_stats")).status_code, 403)
+
+
+class LikesTrendTests(StatsApiTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        dated = [
+            (self.admin, self.past, datetime(2026, 1, 5, 12, tzinfo=dt_timezone.utc)),
+            (self.user, self.past, datetime(2026, 1, 7, 23, 30, tzinfo=dt_timezone(-timedelta(hours=5)))),
+            (self.user, self.ongoing, datetime(2026, 2, 10, 9, tzinfo=dt_timezone.utc)),
+        ]
+        for user, vacation, created_at in dated:
+            Like.objects.filter(user=user, vacation=vacation).update(created_at=created_at)
+        rollup_likes()
+
+    def trend(self, **params: Any) -> List[tuple]:
+        return [(item["period"], item["likes"]) for item in self.get_json("likes_trend", **params)]
+
+    def test_granularities_fill_empty_periods(self) -> None:
+        # The second like is bucketed on its UTC day (Jan 8)
+        self.assertEqual(
+            self.trend(**{"from": "2026-01-05", "to": "2026-01-09"}),
+            [("2026-01-05", 1), ("2026-01-06", 0), ("2026-01-07", 0), ("2026-01-08", 1), ("2026-01-09", 0)],
+        )
+        self.assertEqual(
+            self.trend(**{"from": "2026-01-01", "to": "2026-01-20", "granularity": "week"}),
+            [("2025-12-29", 0), ("2026-01-05", 2), ("2026-01-12", 0), ("2026-01-19", 0)],
+        )
+        self.assertEqual(
+            self.trend(**{"from": "2025-12-15", "to": "2026-02-10", "granularity": "month"}),
+            [("2025-12-01", 0), ("2026-01-01", 2), ("2026-02-01", 1)],
+        )
+        # Partial periods only count days in range
+        self.assertEqual(self.trend(**{"from": "2026-01-06", "to": "2026-02-09", "granularity": "month"}),
+                         [("2026-01-01", 1), ("2026-02-01", 0)])
+
+    def test_country_filter_and_defaults(self) -> None:
+        japan = self.ongoing.country_id
+        self.assertEqual(
+            self.trend(**{"from": "2026-01-01", "to": "2026-02-28", "granularity": "month", "country": japan}),
+            [("2026-01-01", 0), ("2026-02-01", 1)],
+        )
+        default = self.trend()
+        self.assertEqual(len(default), 30)
+        self.assertEqual(default[-1][0], timezone.now().date().isoformat())
+
+    def test_new_likes_show_up(self) -> None:
+        today = timezone.now().date().isoformat()
+        self.assertEqual(self.trend(**{"from": today})[-1], (today, 0))
+        add_like(self.admin.id, self.future.id)
+        self.assertEqual(self.trend(**{"from": today})[-1], (today, 1))
+
+    def test_reads_rollups_only(self) -> None:
+        for params in ({}, {"from": "2020-01-01", "to": "2026-12-31", "granularity": "week"}):
+            cache.clear()
+            with CaptureQueriesContext(connection) as ctx:
+                self.get_json("likes_trend", **params)
+            self.assertEqual(len(ctx.captured_queries), 4)  # session, admin, counters, rollup aggregate
+            self.assertNotIn('"vacations_like"', ctx.captured_queries[-1]["sql"])
+
+    def test_invalid_params(self) -> None:
+        for params in ({"from": "01/02/2026"}, {"from": "2026-02-01", "to": "2026-01-01"},
+                       {"granularity": "year"}, {"country": "Italy"},
+                       {"from": "0001-01-01", "to": "9999-12-31"}):
+            response = self.client.get(reverse("likes_trend"), params)
+            self.assertEqual(response.status_code, 400, params)
+        # MAX_TREND_PERIODS is inclusive
+        self.assertEqual(len(self.get_json("likes_trend", **{"from": "2024-01-01", "to": "2026-09-26"})), 1000)
+        response = self.client.get(reverse("likes_trend"), {"from": "2024-01-01", "to": "2026-09-27"})
+        self.assertEqual(response.status_code, 400)
+
+
+class VacationOccupancyTests(StatsApiTestCase):
+    def occupancy(self, start: date, end: date) -> List[int]:
+        items = self.get_json("vacation_occupancy", **{"from": start.isoformat(), "to": end.isoformat()})
+        self.assertEqual([item["day"] for item in items],
+                         [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)])
+        return [item["ongoingVacations"] for item in items]
+
+    def test_matches_per_day_counts(self) -> None:
+        today = timezone.now().date()
+        # A one-day vacation, and one running past the end of a range
+        self._vacation(self.past.country, today + timedelta(days=3), today + timedelta(days=3))
+        self._vacation(self.past.country, today + timedelta(days=15), today + timedelta(days=25))
+        for start, end in ((today - timedelta(days=30), today + timedelta(days=30)),
+                           (today - timedelta(days=15), today + timedelta(days=15)),
+                           (today, today)):
+            expected = [
+                Vacation.objects.filter(start_date__lte=day, end_date__gte=day).count()
+                for day in (start + timedelta(days=i) for i in range((end - start).days + 1))
+            ]
+            cache.clear()
+            self.assertEqual(self.occupancy(start, end), expected, (start, end))
+
+    def test_one_query_whatever_the_range(self) -> None:
+        today = timezone.now().date()
+        for days in (1, 3653):
+            cache.clear()
+            with CaptureQueriesContext(connection) as ctx:
+                self.occupancy(today, today + timedelta(days=days - 1))
+            self.assertEqual(len(ctx.captured_queries), 4)  # session, admin, counters, grouped deltas
+
+    def test_vacation_changes_invalidate(self) -> None:
+        today = timezone.now().date()
+        self.assertEqual(self.occupancy(today, today), [1])
+        self.ongoing.delete()
+        self.assertEqual(self.occupancy(today, today), [0])
+
+    def test_invalid_params(self) -> None:
+        for params in ({"from": "2026-13-01"}, {"from": "2026-02-01", "to": "2026-01-01"},
+                       {"from": "2020-01-01", "to": "2030-01-01"}):
+            response = self.client.get(reverse("vacation_occupancy"), params)
+            self.assertEqual(response.status_code, 400, params)
+
+
+class StatsHistoryTests(StatsApiTestCase):
+    DAY = date(2026, 3, 20)
+
+    def snapshot(self, day: date, likes: int, users: int = 2) -> None:
+        StatsSnapshot.objects.create(
+            day=day, past_vacations=1, ongoing_vacations=1, future_vacations=1,
+            total_users=users, total_likes=likes,
+            likes_distribution=[{"destination": "Italy", "likes": likes}], taken_at=timezone.now(),
+        )
+
+    def history(self, **params: Any) -> List[Dict[str, Any]]:
+        return self.get_json("stats_history", **params)
+
+    def test_snapshot_command_upserts_today(self) -> None:
+        call_command("snapshot_stats", stdout=StringIO())
+        add_like(self.admin.id, self.future.id)
+        out = StringIO()
+        call_command("snapshot_stats", stdout=out)
+        self.assertIn("4 likes", out.getvalue())
+
+        today = timezone.now().date()
+        [item] = self.history()
+        expected = {"day": today.isoformat(), **get_dashboard(today)}
+        self.assertEqual({key: item[key] for key in expected}, expected)
+        self.assertEqual(StatsSnapshot.objects.count(), 1)
+
+    def test_week_over_week_deltas(self) -> None:
+        for offset, likes in ((-14, 1), (-9, 2), (-7, 3), (-1, 4), (0, 9)):
+            self.snapshot(self.DAY + timedelta(days=offset), likes)
+
+        items = self.history(**{"from": (self.DAY - timedelta(days=7)).isoformat(), "to": self.DAY.isoformat()})
+        self.assertEqual([item["day"] for item in items], ["2026-03-13", "2026-03-19", "2026-03-20"])
+        # The snapshot before ``from`` still serves as the first baseline
+        self.assertEqual(items[0]["weekOverWeek"]["totalLikes"], 2)
+        self.assertEqual(items[0]["weekOverWeek"]["totalUsers"], 0)
+        self.assertIsNone(items[1]["weekOverWeek"]["totalLikes"])  # no 2026-03-12 snapshot
+        self.assertEqual(items[2]["weekOverWeek"]["totalLikes"], 6)
+        self.assertEqual(items[2]["likesDistribution"], [{"destination": "Italy", "likes": 9}])
+
+    def test_one_query_whatever_the_range(self) -> None:
+        for offset in range(0, 400, 3):
+            self.snapshot(self.DAY - timedelta(days=offset), offset)
+        for params in ({"to": self.DAY.isoformat()}, {"from": "2025-01-01", "to": self.DAY.isoformat()}):
+            cache.clear()
+            with CaptureQueriesContext(connection) as ctx:
+                self.history(**params)
+            self.assertEqual(len(ctx.captured_queries), 4)  # session, admin, counters, snapshots
+
+    def test_new_snapshot_changes_etag(self) -> None:
+        etag = self.client.get(reverse("stats_history"))["ETag"]
+        self.assertEqual(self.client.get(reverse("stats_history"), HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        call_command("snapshot_stats", stdout=StringIO())
+        response = self.client.get(reverse("stats_history"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 1)
+
+    def test_invalid_params(self) -> None:
+        for params in ({"from": "yesterday"}, {"from": "2026-02-01", "to": "2026-01-01"},
+                       {"to": "0001-01-01"}, {"from": "2020-01-01", "to": "2026-01-01"}):
+            response = self.client.get(reverse("stats_history"), params)
+            self.assertEqual(response.status_code, 400, params)
+
+
+@override_settings(QUERY_BUDGET_ACTION="raise")
+class QueryBudgetTests(StatsApiTestCase):
+    """Every stats view stays within its declared statement budget (cache cold)."""
+
+    def test_every_view_declares_a_budget(self) -> None:
+        import inspect
+        from stats_api import views
+        from vacations.query_budget import QUERY_BUDGETS
+
+        for name, view in inspect.getmembers(views, inspect.isfunction):
+            if not name.startswith("_") and view.__module__ == views.__name__:
+                self.assertIn(f"{views.__name__}.{name}", QUERY_BUDGETS)
+
+    def test_requests_within_budget(self) -> None:
+        for name in ("vacations_stats", "vacation_occupancy", "total_users", "total_likes",
+                     "likes_distribution", "dashboard", "likes_trend", "stats_history", "stats_cache",
+                     "session"):
+            cache.clear()
+            self.get_json(name)
+        cache.clear()
+        self.get_json("likes_distribution", min_likes=1, q="ita", order="-likes", top=5)
+        for name in ("export_likes_csv", "export_vacations_ndjson"):
+            response = self.client.get(reverse(name))
+            self.assertEqual(response.status_code, 200)
+            b"".join(response.streaming_content)
+
+        self.assertEqual(self.client.post(reverse("stats_logout")).status_code, 200)
+        response = self.client.post(
+            reverse("stats_login"), {"email": self.admin.email, "password": self.admin.password},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+
+    async def test_async_over_budget_raises(self) -> None:
+        # The statements run in sync_to_async threads reach the async middleware
+        from django.urls import resolve
+        from vacations.query_budget import QueryBudgetExceeded
+
+        self.async_client.cookies = self.client.cookies
+        view = resolve(reverse("vacations_stats")).func
+        with mock.patch.object(view, "query_budget", 1):
+            with self.assertRaisesMessage(QueryBudgetExceeded, "vacations_stats ran 4 SQL statements"):
+                await self.async_client.get(reverse("vacations_stats"))
+
+    async def test_async_stack_within_budget(self) -> None:
+        # ASGI handler: the middleware and the views stay async
+        self.async_client.cookies = self.client.cookies
+        for name in ("vacations_stats", "total_users", "total_likes", "likes_distribution", "dashboard",
+                     "likes_trend", "stats_history", "vacation_occupancy"):
+            await sync_to_async(cache.clear)()
+            response = await self.async_client.get(reverse(name))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json(), await sync_to_async(self.get_json)(name))
+
+
+@override_settings(STATS_STREAM_POLL_SECONDS=0.01, STATS_STREAM_KEEPALIVE_SECONDS=0.05)
+class StatsStreamTests(StatsApiTestCase):
+    @staticmethod
+    def parse(frame: str) -> tuple:
+        fields = dict(line.split(": ", 1) for line in frame.strip().splitlines() if not line.startswith("retry"))
+        return fields.get("event"), json.loads(fields["data"]) if "data" in fields else None
+
+    async def test_snapshot_then_deltas(self) -> None:
+        from stats_api.stream import DashboardFeed, dashboard_events
+
+        feed = DashboardFeed()
+        events = dashboard_events(feed)
+        try:
+            name, data = self.parse(await anext(events))
+            self.assertEqual(name, "snapshot")
+            self.assertEqual(data["totalLikes"], 3)
+            self.assertEqual(data["totalUsers"], 2)
+
+            await sync_to_async(add_like)(self.admin.id, self.future.id)
+            name, data = self.parse(await anext(events))
+            self.assertEqual(name, "delta")
+            self.assertEqual(data, {"totalLikes": 4, "likesChanged": [{"destination": "Italy", "likes": 3}]})
+
+            # Nothing changed: only keep-alive comments
+            self.assertEqual(await anext(events), ": keep-alive\n\n")
+        finally:
+            await events.aclose()
+        self.assertIsNone(feed._task)
+
+    async def test_writes_from_other_processes_send_deltas(self) -> None:
+        from stats_api.stream import DashboardFeed, dashboard_events
+
+        def insert_user() -> None:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "INSERT INTO vacations_user (first_name, last_name, email, password, role_id, is_staff)"
+                    " VALUES ('Raw', 'Writer', 'raw@example.com', '12345678', %s, false)",
+                    [self.user.role_id],
+                )
+
+        events = dashboard_events(DashboardFeed())
+        try:
+            self.assertEqual(self.parse(await anext(events))[0], "snapshot")
+            await sync_to_async(insert_user)()
+            self.assertEqual(self.parse(await anext(events)), ("delta", {"totalUsers": 3}))
+        finally:
+            await events.aclose()
+
+    def test_diff_reports_changed_and_removed_destinations(self) -> None:
+        from stats_api.stream import diff
+
+        sent = {"totalUsers": 2, "likesDistribution": [{"destination": "Italy", "likes": 2},
+                                                       {"destination": "Japan", "likes": 1}]}
+        current = {"totalUsers": 2, "likesDistribution": [{"destination": "Italy", "likes": 2},
+                                                          {"destination": "Peru", "likes": 1}]}
+        self.assertEqual(diff(sent, current), {"likesChanged": [
+            {"destination": "Japan", "likes": 0}, {"destination": "Peru", "likes": 1},
+        ]})
+        self.assertEqual(diff(current, current), {})
+
+    async def test_streams_share_one_poller(self) -> None:
+        from stats_api.stream import DashboardFeed, dashboard_events
+
+        feed = DashboardFeed()
+        streams = [dashboard_events(feed) for _ in range(3)]
+        for events in streams:
+            self.assertEqual(self.parse(await anext(events))[0], "snapshot")
+        task = feed._task
+        self.assertIsNotNone(task)
+        for events in streams:
+            await events.aclose()
+        self.assertIsNone(feed._task)
+        self.assertTrue(task.cancelled() or task.cancelling())
+
+    async def test_endpoint_requires_admin_and_streams(self) -> None:
+        anonymous = await self.async_client.get(reverse("stats_stream"))
+        self.assertEqual(anonymous.status_code, 401)
+
+        self.async_client.cookies = self.client.cookies
+        response = await self.async_client.get(reverse("stats_stream"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        content = aiter(response.streaming_content)
+        try:
+            self.assertEqual(self.parse((await anext(content)).decode())[0], "snapshot")
+        finally:
+            await content.aclose()
+
+    def test_endpoint_refuses_wsgi(self) -> None:
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("stats_stream"))
+        self.assertEqual(response.status_code, 501)
+        self.assertIn("ASGI", response.json()["error"])
+
+
+class ConcurrentAggregateTests(TransactionTestCase):
+    """Outside a transaction the dashboard aggregates run on worker connections."""
+
+    def setUp(self) -> None:
+        italy = Country.objects.create(name="Italy")
+        today = timezone.now().date()
+        for offset in (-10, 0, 10):
+            Vacation.objects.create(
+                country=italy, description="Trip", start_date=today + timedelta(days=offset),
+                end_date=today + timedelta(days=offset + 1), price=100, image_filename="x.jpg",
+                like_count=offset + 10,
+            )
+        # Worker threads keep persistent connections, which would block
+        # dropping the test database.
+        patcher = mock.patch.dict(connection.settings_dict, CONN_MAX_AGE=0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self) -> None:
+        for model in (Vacation, Country):
+            model.objects.all().delete()
+
+    async def test_calls_overlap_on_separate_connections(self) -> None:
+        barrier = threading.Barrier(3, timeout=5)
+
+        def backend_pid() -> int:
+            barrier.wait()  # times out unless all three run at once
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_backend_pid()")
+                return cursor.fetchone()[0]
+
+        pids = await gather_queries((backend_pid,), (backend_pid,), (backend_pid,))
+        self.assertEqual(len(set(pids)), 3)
+
+    async def test_dashboard_matches_sync_version(self) -> None:
+        today = timezone.now().date()
+        data = await aget_dashboard(today)
+        self.assertEqual(data, await sync_to_async(get_dashboard)(today))
+        self.assertEqual(data["totalLikes"], 30)
+        self.assertEqual(data["ongoingVacations"], 1)
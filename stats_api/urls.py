@@ -8,9 +8,17 @@ urlpatterns = [
     path("api/login/", views.login_view, name="stats_login"),
     path("api/logout/", views.logout_view, name="stats_logout"),
     path("api/vacations/stats/", views.vacations_stats, name="vacations_stats"),
+    path("api/vacations/occupancy/", views.vacation_occupancy, name="vacation_occupancy"),
     path("api/users/total/", views.total_users, name="total_users"),
     path("api/likes/total/", views.total_likes, name="total_likes"),
     path("api/likes/distribution/", views.likes_distribution, name="likes_distribution"),
+    path("api/likes/trend/", views.likes_trend, name="likes_trend"),
+    path("api/dashboard/", views.dashboard, name="dashboard"),
+    path("api/stats/history/", views.stats_history, name="stats_history"),
+    path("api/stats/cache/", views.cache_stats, name="stats_cache"),
+    path("api/stats/stream/", views.stats_stream, name="stats_stream"),
+    path("api/export/likes.csv", views.export_likes_csv, name="export_likes_csv"),
+    path("api/export/vacations.ndjson", views.export_vacations_ndjson, name="export_vacations_ndjson"),
 
      # hydrate auth on page load / refresh:
     path("api/session/", views.session_view, name="session"),
@@ -1,11 +1,21 @@
 
 from __future__ import annotations
 import json
-from typing import Any, Dict, Iterable, List, Tuple
-from django.http import HttpRequest, JsonResponse
+from datetime import date, timedelta
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urlencode
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpRequest, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_GET, require_POST
-from vacations.models import User, Vacation, Like
+from vacations.conditional import aconditional_response, amake_etag
+from vacations.models import User
+from vacations.query_budget import query_budget
+from vacations.versions import TABLES, get_table_versions
+from . import exports, services, stream
+from .cache import acached, cache_admin, cache_info, get_cached_admin
 
 
 
@@ -37,24 +47,146 @@ def _is_admin_user(user: User) -> bool:
 
 
 def _require_admin_session(request: HttpRequest) -> Tuple[bool, JsonResponse | None]:
-    """Validate that the request has an authenticated admin session."""
+    """Validate that the request has an authenticated admin session.
+
+    The admin flag is cached per user id and "user" change counter (set at
+    login), so the common path issues no User/Role query, and any write to
+    users or roles, from whichever process or raw SQL, invalidates it. All
+    counters are read in that one query and kept on ``request.data_versions``
+    for the response's ETag.
+    """
     user_id: int | None = request.session.get("user_id")
     if not user_id:
         return False, _json_error("Unauthorized", status=401)
 
-    try:
-        user: User = User.objects.select_related("role").get(pk=user_id)
-    except User.DoesNotExist:
+    versions: Dict[str, int] = get_table_versions(*TABLES)
+    request.data_versions = versions
+    is_admin: bool | None = get_cached_admin(user_id, versions["user"])
+    if is_admin is None:
+        try:
+            user: User = User.objects.select_related("role").get(pk=user_id)
+        except User.DoesNotExist:
+            return False, _json_error("Unauthorized", status=401)
+        is_admin = _is_admin_user(user)
+        cache_admin(user_id, versions["user"], is_admin)
+
+    if not is_admin:
+        return False, _json_error("Forbidden: admin only", status=403)
+
+    return True, None
+
+
+async def _arequire_admin_session(request: HttpRequest) -> Tuple[bool, JsonResponse | None]:
+    """Async ``_require_admin_session`` (session and user read with the async API)."""
+    user_id: int | None = await request.session.aget("user_id")
+    if not user_id:
         return False, _json_error("Unauthorized", status=401)
 
-    if not _is_admin_user(user):
+    versions: Dict[str, int] = await sync_to_async(get_table_versions)(*TABLES)
+    request.data_versions = versions
+    is_admin: bool | None = await sync_to_async(get_cached_admin)(user_id, versions["user"])
+    if is_admin is None:
+        try:
+            user: User = await User.objects.select_related("role").aget(pk=user_id)
+        except User.DoesNotExist:
+            return False, _json_error("Unauthorized", status=401)
+        is_admin = _is_admin_user(user)
+        await sync_to_async(cache_admin)(user_id, versions["user"], is_admin)
+
+    if not is_admin:
         return False, _json_error("Forbidden: admin only", status=403)
 
     return True, None
 
 
+def _parse_as_of(request: HttpRequest) -> Tuple[date | None, JsonResponse | None]:
+    """Read the optional ?asOf=YYYY-MM-DD reference date (defaults to today)."""
+    raw: str = request.GET.get("asOf", "").strip()
+    if not raw:
+        return timezone.now().date(), None
+    try:
+        return date.fromisoformat(raw), None
+    except ValueError:
+        return None, _json_error("Invalid asOf date, expected YYYY-MM-DD")
+
+
+def _parse_distribution_filters(request: HttpRequest) -> Tuple[Dict[str, Any] | None, JsonResponse | None]:
+    """Read the optional min_likes / q / top / order distribution filters.
+
+    Only the parameters actually given are returned, so the unfiltered
+    request keeps its cache key.
+    """
+    filters: Dict[str, Any] = {}
+    try:
+        if request.GET.get("min_likes", "").strip():
+            filters["min_likes"] = int(request.GET["min_likes"])
+        if request.GET.get("top", "").strip():
+            filters["top"] = int(request.GET["top"])
+    except ValueError:
+        return None, _json_error("min_likes and top must be integers")
+    if filters.get("min_likes", 0) < 0 or filters.get("top", 1) < 1:
+        return None, _json_error("min_likes must be >= 0 and top >= 1")
+
+    q: str = request.GET.get("q", "").strip()
+    if len(q) > 100:
+        return None, _json_error("q is limited to 100 characters")
+    if q:
+        filters["q"] = q
+
+    order: str = request.GET.get("order", "").strip()
+    if order and order not in services.DISTRIBUTION_ORDERS:
+        return None, _json_error(f"order must be one of: {', '.join(services.DISTRIBUTION_ORDERS)}")
+    if order:
+        filters["order"] = order
+    return filters, None
+
+
+MAX_TREND_PERIODS = 1000
+MAX_HISTORY_DAYS = 1000
+MAX_OCCUPANCY_DAYS = 3653  # any ten calendar years
+DEFAULT_RANGE_DAYS = 30
+
+
+def _parse_date_range(request: HttpRequest) -> Tuple[Dict[str, date] | None, JsonResponse | None]:
+    """Read ?from=YYYY-MM-DD&to=YYYY-MM-DD as {"start", "end"}.
+
+    ``to`` defaults to today and ``from`` to DEFAULT_RANGE_DAYS days before it.
+    """
+    try:
+        raw_to: str = request.GET.get("to", "").strip()
+        end: date = date.fromisoformat(raw_to) if raw_to else timezone.now().date()
+        raw_from: str = request.GET.get("from", "").strip()
+        start: date = date.fromisoformat(raw_from) if raw_from else end - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+    except (ValueError, OverflowError):
+        return None, _json_error("Invalid from/to date, expected YYYY-MM-DD")
+    if start > end:
+        return None, _json_error("from must not be after to")
+    return {"start": start, "end": end}, None
+
+
+def _parse_trend_params(request: HttpRequest) -> Tuple[Dict[str, Any] | None, JsonResponse | None]:
+    """Read ?from=&to=&granularity=&country= for the likes trend (see _parse_date_range)."""
+    params, err = _parse_date_range(request)
+    if err:
+        return None, err
+
+    params["granularity"] = request.GET.get("granularity", "").strip() or "day"
+    if params["granularity"] not in services.TREND_GRANULARITIES:
+        return None, _json_error(f"granularity must be one of: {', '.join(services.TREND_GRANULARITIES)}")
+    if services.count_trend_periods(params["start"], params["end"], params["granularity"]) > MAX_TREND_PERIODS:
+        return None, _json_error(f"Range too long: at most {MAX_TREND_PERIODS} periods")
+
+    if request.GET.get("country", "").strip():
+        try:
+            params["country"] = int(request.GET["country"])
+        except ValueError:
+            return None, _json_error("country must be an integer")
+    return params, None
+
+
 @csrf_exempt
 @require_POST
+@query_budget(4)
 def login_view(request: HttpRequest) -> JsonResponse:
     """Login endpoint for the stats area (admin only, session-based)."""
     try:
@@ -83,11 +215,13 @@ def login_view(request: HttpRequest) -> JsonResponse:
         return _json_error("Forbidden: admin only", status=403)
 
     request.session["user_id"] = user.id
+    cache_admin(user.id, get_table_versions("user")["user"], True)
     return JsonResponse({"success": True})
 
 
 @csrf_exempt
 @require_POST
+@query_budget(2)
 def logout_view(request: HttpRequest) -> JsonResponse:
     """
     Logout endpoint that clears the current session.
@@ -98,68 +232,262 @@ def logout_view(request: HttpRequest) -> JsonResponse:
     return response
 
 @require_GET
-def vacations_stats(request: HttpRequest) -> JsonResponse:
+@query_budget(4)
+async def vacations_stats(request: HttpRequest) -> HttpResponse:
     """Return counts of past/ongoing/future vacations (admin session required)."""
-    ok, err = _require_admin_session(request)
+    ok, err = await _arequire_admin_session(request)
     if not ok:
         return err  # type: ignore[return-value]
 
-    from django.utils import timezone
-    now = timezone.now().date()
+    as_of, err = _parse_as_of(request)
+    if err:
+        return err
 
-    past: int = Vacation.objects.filter(end_date__lt=now).count()
-    ongoing: int = Vacation.objects.filter(start_date__lte=now, end_date__gte=now).count()
-    future: int = Vacation.objects.filter(start_date__gt=now).count()
-    return JsonResponse(
-        {"pastVacations": past, "ongoingVacations": ongoing, "futureVacations": future}
-    )
+    etag = await amake_etag("vacations_stats", ("vacation",), as_of, versions=request.data_versions)
+
+    async def build() -> JsonResponse:
+        return JsonResponse(await acached(
+            "vacations_stats", lambda: services.aget_vacation_buckets(as_of), etag, until_midnight=True
+        ))
+
+    return await aconditional_response(request, etag, build)
 
 
 @require_GET
-def total_users(request: HttpRequest) -> JsonResponse:
+@query_budget(4)
+async def total_users(request: HttpRequest) -> HttpResponse:
     """Return total number of users (admin session required)."""
-    ok, err = _require_admin_session(request)
+    ok, err = await _arequire_admin_session(request)
     if not ok:
         return err  # type: ignore[return-value]
 
-    total: int = User.objects.count()
-    return JsonResponse({"totalUsers": total})
+    etag = await amake_etag("total_users", ("user",), versions=request.data_versions)
+
+    async def build() -> JsonResponse:
+        return JsonResponse({"totalUsers": await acached("total_users", services.aget_total_users, etag)})
+
+    return await aconditional_response(request, etag, build)
 
 
 @require_GET
-def total_likes(request: HttpRequest) -> JsonResponse:
+@query_budget(4)
+async def total_likes(request: HttpRequest) -> HttpResponse:
     """Return total number of likes (admin session required)."""
+    ok, err = await _arequire_admin_session(request)
+    if not ok:
+        return err  # type: ignore[return-value]
+
+    etag = await amake_etag("total_likes", ("vacation", "like"), versions=request.data_versions)
+
+    async def build() -> JsonResponse:
+        return JsonResponse({"totalLikes": await acached("total_likes", services.aget_total_likes, etag)})
+
+    return await aconditional_response(request, etag, build)
+
+
+@require_GET
+@query_budget(4)
+async def likes_distribution(request: HttpRequest) -> HttpResponse:
+    """Return likes distribution per destination (admin session required).
+
+    Optional filters: ?min_likes=N&q=text&top=N&order=destination|-destination|likes|-likes
+    """
+    ok, err = await _arequire_admin_session(request)
+    if not ok:
+        return err  # type: ignore[return-value]
+
+    filters, err = _parse_distribution_filters(request)
+    if err:
+        return err
+
+    key: List[str] = [urlencode(sorted(filters.items()))] if filters else []
+    etag = await amake_etag("likes_distribution", ("vacation", "like", "country"), *key,
+                            versions=request.data_versions)
+
+    async def build() -> JsonResponse:
+        data = await acached("likes_distribution", lambda: services.aget_likes_distribution(**filters), etag)
+        return JsonResponse(data, safe=False)
+
+    return await aconditional_response(request, etag, build)
+
+
+@require_GET
+@query_budget(4)
+async def likes_trend(request: HttpRequest) -> HttpResponse:
+    """Return likes created per day/week/month, from the rollups (admin session required).
+
+    Optional: ?from=YYYY-MM-DD&to=YYYY-MM-DD&granularity=day|week|month&country=<id>
+    """
+    ok, err = await _arequire_admin_session(request)
+    if not ok:
+        return err  # type: ignore[return-value]
+
+    params, err = _parse_trend_params(request)
+    if err:
+        return err
+
+    key: str = urlencode(sorted(params.items()))
+    etag = await amake_etag("likes_trend", ("like", "vacation"), key, versions=request.data_versions)
+
+    async def build() -> JsonResponse:
+        data = await acached("likes_trend", lambda: services.aget_likes_trend(**params), etag)
+        return JsonResponse(data, safe=False)
+
+    return await aconditional_response(request, etag, build)
+
+
+@require_GET
+@query_budget(4)
+async def vacation_occupancy(request: HttpRequest) -> HttpResponse:
+    """Return how many vacations are ongoing on each day (admin session required).
+
+    Optional: ?from=YYYY-MM-DD&to=YYYY-MM-DD (at most MAX_OCCUPANCY_DAYS days)
+    """
+    ok, err = await _arequire_admin_session(request)
+    if not ok:
+        return err  # type: ignore[return-value]
+
+    params, err = _parse_date_range(request)
+    if err:
+        return err
+    if (params["end"] - params["start"]).days >= MAX_OCCUPANCY_DAYS:
+        return _json_error(f"Range too long: at most {MAX_OCCUPANCY_DAYS} days")
+
+    key: str = urlencode(sorted(params.items()))
+    etag = await amake_etag("vacation_occupancy", ("vacation",), key, versions=request.data_versions)
+
+    async def build() -> JsonResponse:
+        data = await acached("vacation_occupancy", lambda: services.aget_occupancy(**params), etag)
+        return JsonResponse(data, safe=False)
+
+    return await aconditional_response(request, etag, build)
+
+
+@require_GET
+@query_budget(4)
+async def stats_history(request: HttpRequest) -> HttpResponse:
+    """Return the daily KPI snapshots with week-over-week deltas (admin session required).
+
+    Optional: ?from=YYYY-MM-DD&to=YYYY-MM-DD (at most MAX_HISTORY_DAYS days)
+    """
+    ok, err = await _arequire_admin_session(request)
+    if not ok:
+        return err  # type: ignore[return-value]
+
+    params, err = _parse_date_range(request)
+    if err:
+        return err
+    if (params["end"] - params["start"]).days >= MAX_HISTORY_DAYS:
+        return _json_error(f"Range too long: at most {MAX_HISTORY_DAYS} days")
+
+    key: str = urlencode(sorted(params.items()))
+    etag = await amake_etag("stats_history", ("snapshot",), key, versions=request.data_versions)
+
+    async def build() -> JsonResponse:
+        data = await acached("stats_history", lambda: services.aget_stats_history(**params), etag)
+        return JsonResponse(data, safe=False)
+
+    return await aconditional_response(request, etag, build)
+
+
+@require_GET
+@query_budget(6)
+async def dashboard(request: HttpRequest) -> HttpResponse:
+    """Return all dashboard KPIs in a single response (admin session required).
+
+    The aggregates run concurrently (see services.gather_queries).
+    """
+    ok, err = await _arequire_admin_session(request)
+    if not ok:
+        return err  # type: ignore[return-value]
+
+    as_of, err = _parse_as_of(request)
+    if err:
+        return err
+
+    etag = await amake_etag("dashboard", ("vacation", "like", "user", "country"), as_of,
+                            versions=request.data_versions)
+
+    async def build() -> JsonResponse:
+        return JsonResponse(
+            await acached("dashboard", lambda: services.aget_dashboard(as_of), etag, until_midnight=True)
+        )
+
+    return await aconditional_response(request, etag, build)
+
+
+def _export_body(request: HttpRequest, lines: Any) -> Any:
+    """Return export lines as-is under WSGI, as an async iterator under ASGI (else buffered)."""
+    return exports.aiter_chunks(lines) if isinstance(request, ASGIRequest) else lines
+
+
+@require_GET
+@query_budget(4)
+def export_likes_csv(request: HttpRequest) -> HttpResponse:
+    """Stream all likes with user and vacation columns as CSV (admin session required)."""
     ok, err = _require_admin_session(request)
     if not ok:
         return err  # type: ignore[return-value]
 
-    total: int = Like.objects.count()
-    return JsonResponse({"totalLikes": total})
+    response = StreamingHttpResponse(
+        _export_body(request, exports.likes_csv()), content_type="text/csv; charset=utf-8"
+    )
+    response["Content-Disposition"] = 'attachment; filename="likes.csv"'
+    return response
 
 
 @require_GET
-def likes_distribution(request: HttpRequest) -> JsonResponse:
-    """Return likes distribution per destination (admin session required)."""
+@query_budget(4)
+def export_vacations_ndjson(request: HttpRequest) -> HttpResponse:
+    """Stream all vacations as newline-delimited JSON (admin session required)."""
     ok, err = _require_admin_session(request)
     if not ok:
         return err  # type: ignore[return-value]
 
-    from django.db.models import Count
+    response = StreamingHttpResponse(
+        _export_body(request, exports.vacations_ndjson()), content_type="application/x-ndjson"
+    )
+    response["Content-Disposition"] = 'attachment; filename="vacations.ndjson"'
+    return response
+
 
-    rows: Iterable[Dict[str, Any]] = (
-        Like.objects
-        .values("vacation__country__name")
-        .annotate(likes=Count("id"))
-        .order_by("vacation__country__name")
+@require_GET
+@query_budget(3)
+async def stats_stream(request: HttpRequest) -> HttpResponse:
+    """Stream the dashboard KPIs as Server-Sent Events (admin session required).
+
+    Sends a ``snapshot`` event, then ``delta`` events with the changed KPIs.
+    Answers 501 under WSGI (e.g. runserver), which would buffer the endless
+    response instead of sending it.
+    """
+    if not isinstance(request, ASGIRequest):
+        return _json_error("The stats stream needs an ASGI server (uvicorn stats_backend.asgi:application)",
+                           status=501)
+
+    ok, err = await _arequire_admin_session(request)
+    if not ok:
+        return err  # type: ignore[return-value]
+
+    response = StreamingHttpResponse(
+        stream.dashboard_events(stream.get_feed()), content_type="text/event-stream"
     )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # let nginx pass events through unbuffered
+    return response
+
+
+@require_GET
+@query_budget(3)
+def cache_stats(request: HttpRequest) -> JsonResponse:
+    """Return stats cache hit/miss counters (admin session required)."""
+    ok, err = _require_admin_session(request)
+    if not ok:
+        return err  # type: ignore[return-value]
 
-    data: List[Dict[str, Any]] = []
-    for r in rows:
-        country_name: str = str(r.get("vacation__country__name") or "")
-        data.append({"destination": country_name, "likes": int(r["likes"])})
-    return JsonResponse(data, safe=False)
+    return JsonResponse(cache_info())
 
 @require_GET
+@query_budget(2)
 def session_view(request: HttpRequest) -> JsonResponse:
     """Return session authentication status for frontend use."""
     user_id: int | None = request.session.get("user_id")
@@ -4,6 +4,7 @@ from __future__ import annotations
 import os
 import sys
 from pathlib import Path
+from typing import Any
 
 BASE_DIR: Path = Path(__file__).resolve().parent.parent
 
@@ -42,10 +43,12 @@ INSTALLED_APPS: list[str] = [
 MIDDLEWARE: list[str] = [
     "corsheaders.middleware.CorsMiddleware",     #  should be first or second
     "django.middleware.security.SecurityMiddleware",
+    "vacations.query_budget.QueryBudgetMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "vacations.middleware.CurrentUserMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -80,6 +83,32 @@ DB_PASSWORD = os.environ.get("DB_PASSWORD") or getattr(db_config, "DB_PASSWORD",
 DB_HOST = os.environ.get("DB_HOST") or getattr(db_config, "DB_HOST", "localhost")
 DB_PORT = os.environ.get("DB_PORT") or getattr(db_config, "DB_PORT", "5432")
 
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    return default if value is None else value.lower() in ("1", "true", "yes", "on")
+
+
+# Connection reuse: a psycopg3 pool (DB_POOL=1) or persistent per-worker
+# connections (DB_CONN_MAX_AGE seconds). Django rejects both at once.
+# Health checks validate a reused connection (or pooled one) before use.
+# This backend is served by uvicorn (ASGI), where sync ORM code runs on a
+# fresh thread per request: a persistent connection is left open on a
+# thread that never runs again, until Postgres runs out of slots. So
+# DB_CONN_MAX_AGE defaults to 0 here and the Docker image enables the pool,
+# which gets every connection back at the end of the request.
+DB_POOL: bool = _env_flag("DB_POOL", getattr(db_config, "DB_POOL", False))
+DB_CONN_HEALTH_CHECKS: bool = _env_flag(
+    "DB_CONN_HEALTH_CHECKS", getattr(db_config, "DB_CONN_HEALTH_CHECKS", True)
+)
+DB_OPTIONS: dict[str, Any] = {}
+if DB_POOL:
+    DB_OPTIONS["pool"] = {
+        "min_size": int(os.environ.get("DB_POOL_MIN_SIZE") or getattr(db_config, "DB_POOL_MIN_SIZE", 2)),
+        "max_size": int(os.environ.get("DB_POOL_MAX_SIZE") or getattr(db_config, "DB_POOL_MAX_SIZE", 10)),
+        "timeout": float(os.environ.get("DB_POOL_TIMEOUT") or getattr(db_config, "DB_POOL_TIMEOUT", 10.0)),
+    }
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -88,21 +117,79 @@ DATABASES = {
         "PASSWORD": DB_PASSWORD,
         "HOST": DB_HOST,
         "PORT": DB_PORT,
+        "CONN_MAX_AGE": 0 if DB_POOL else int(
+            os.environ.get("DB_CONN_MAX_AGE") or getattr(db_config, "DB_CONN_MAX_AGE", 0)
+        ),
+        "CONN_HEALTH_CHECKS": DB_CONN_HEALTH_CHECKS,
+        "OPTIONS": DB_OPTIONS,
+    }
+}
+
+# Cache (stats results, admin flags). Results are keyed on the change
+# counters in vacations_dataversion of the tables they read, admin flags on
+# the "user" counter (bumped by user and role writes), so invalidation works
+# with any backend; CACHE_BACKEND=db shares the entries between processes
+# (requires: python manage.py createcachetable).
+CACHE_BACKEND: str = os.environ.get("CACHE_BACKEND", "locmem")
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "django_cache",
+    } if CACHE_BACKEND == "db" else {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "stats",
     }
 }
 
+# Stats cache TTLs in seconds (0 disables caching for that endpoint)
+STATS_CACHE_TIMEOUTS: dict[str, int] = {
+    "vacations_stats": int(os.environ.get("STATS_CACHE_TTL_VACATIONS", "300")),
+    "total_users": int(os.environ.get("STATS_CACHE_TTL_USERS", "300")),
+    "total_likes": int(os.environ.get("STATS_CACHE_TTL_LIKES", "60")),
+    "likes_distribution": int(os.environ.get("STATS_CACHE_TTL_DISTRIBUTION", "60")),
+    "dashboard": int(os.environ.get("STATS_CACHE_TTL_DASHBOARD", "60")),
+    "likes_trend": int(os.environ.get("STATS_CACHE_TTL_TREND", "300")),
+    "stats_history": int(os.environ.get("STATS_CACHE_TTL_HISTORY", "3600")),
+    "vacation_occupancy": int(os.environ.get("STATS_CACHE_TTL_OCCUPANCY", "300")),
+}
+
+# Upper bound on how long a cached admin flag is kept (seconds); any user or
+# role write invalidates it sooner
+STATS_ADMIN_CACHE_TTL: int = int(os.environ.get("STATS_ADMIN_CACHE_TTL", "300"))
+
+# /api/stats/stream/: how often the change counters are polled (one poller per
+# process, shared by all open streams) and how often idle streams get a keep-alive.
+STATS_STREAM_POLL_SECONDS: float = float(os.environ.get("STATS_STREAM_POLL_SECONDS", "2"))
+STATS_STREAM_KEEPALIVE_SECONDS: float = float(os.environ.get("STATS_STREAM_KEEPALIVE_SECONDS", "15"))
+
+# Threads running the dashboard aggregates concurrently under ASGI; each holds
+# its own connection, so keep DB_POOL_MAX_SIZE above this plus request threads.
+STATS_QUERY_WORKERS: int = int(os.environ.get("STATS_QUERY_WORKERS", "8"))
+
 # Locale and timezone
 LANGUAGE_CODE: str = "en-us"
 TIME_ZONE: str = "UTC"
 USE_I18N: bool = True
 USE_TZ: bool = True
 
+# Query budgets (vacations.query_budget): "log" the SQL of requests that
+# exceed their view's statement budget, "raise" (tests) or "off".
+QUERY_BUDGET_ACTION: str = os.environ.get("QUERY_BUDGET_ACTION", "log" if DEBUG else "off")
+
 # Static files
 STATIC_URL: str = "static/"
 STATIC_ROOT: Path = BASE_DIR / "staticfiles"
 
 # Session & CSRF
-SESSION_ENGINE: str = "django.contrib.sessions.backends.db"
+# SESSION_MODE: "db" (default), "cached_db" (local cache in front of the
+# table) or "signed_cookies" (no table access; the session only holds the
+# user id). Expired rows are purged with: python manage.py purge_sessions
+SESSION_ENGINES: dict[str, str] = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+SESSION_ENGINE: str = SESSION_ENGINES[os.environ.get("SESSION_MODE", "db")]
 SESSION_COOKIE_SAMESITE = "Lax"
 
 CSRF_TRUSTED_ORIGINS: list[str] = [
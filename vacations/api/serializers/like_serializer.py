@@ -6,3 +6,23 @@ class LikeActionSerializer(serializers.Serializer):
     Accepts a vacation_id for the action.
     """
     vacation_id = serializers.IntegerField()
+
+
+class LikeBatchSerializer(serializers.Serializer):
+    """
+    Serializer for batched Like/Unlike actions.
+    Accepts lists of vacation IDs to like and to unlike.
+    """
+    MAX_ITEMS = 500
+
+    like = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, default=list, max_length=MAX_ITEMS
+    )
+    unlike = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, default=list, max_length=MAX_ITEMS
+    )
+
+    def validate(self, data: dict) -> dict:
+        if not data['like'] and not data['unlike']:
+            raise serializers.ValidationError("Provide at least one vacation ID to like or unlike.")
+        return data
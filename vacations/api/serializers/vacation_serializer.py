@@ -20,6 +20,42 @@ class VacationSerializer(serializers.ModelSerializer):
             'price',
             'image_filename',
         ]
+
+
+class VacationListSerializer(VacationSerializer):
+    """
+    Vacation serializer for the list endpoint.
+    Reads 'like_count' and 'liked_by_user' from queryset annotations.
+    """
+
+    like_count = serializers.IntegerField(read_only=True)
+    liked_by_user = serializers.BooleanField(read_only=True)
+
+    class Meta(VacationSerializer.Meta):
+        fields = VacationSerializer.Meta.fields + ['like_count', 'liked_by_user']
+
+
+class VacationFilterSerializer(serializers.Serializer):
+    """
+    Validates the optional filters of the vacation list endpoint.
+    Field names match vacations.services.filter_vacations.
+    """
+
+    country = serializers.IntegerField(required=False, min_value=1)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    min_price = serializers.DecimalField(max_digits=8, decimal_places=2, required=False, min_value=0)
+    max_price = serializers.DecimalField(max_digits=8, decimal_places=2, required=False, min_value=0)
+    q = serializers.CharField(required=False, allow_blank=True, max_length=100)
+
+    def validate(self, data: dict) -> dict:
+        if 'date_from' in data and 'date_to' in data and data['date_to'] < data['date_from']:
+            raise serializers.ValidationError("date_to cannot be before date_from.")
+        if 'min_price' in data and 'max_price' in data and data['max_price'] < data['min_price']:
+            raise serializers.ValidationError("max_price cannot be below min_price.")
+        return data
+
+
 class AddVacationSerializer(serializers.ModelSerializer):
     """
     Serializer for adding a new vacation.
@@ -1,9 +1,10 @@
 from django.urls import path
-from vacations.api.views.like_view import LikeVacationView, UnlikeVacationView
+from vacations.api.views.like_view import LikeVacationView, UnlikeVacationView, LikeBatchView
 
 urlpatterns = [
 
     path('vacations/like/', LikeVacationView.as_view(), name='vacation-like'),
     path('vacations/unlike/', UnlikeVacationView.as_view(), name='vacation-unlike'),
+    path('batch/', LikeBatchView.as_view(), name='like-batch'),
 
  ]
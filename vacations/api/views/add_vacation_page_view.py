@@ -6,9 +6,10 @@ from django.conf import settings
 import os
 import datetime
 from vacations.services import add_vacation, get_all_countries
-from vacations.models import User
+from vacations.query_budget import query_budget
 
 
+@query_budget(3)
 class AddVacationPageView(View):
     """
     View for rendering and handling the vacation creation form.
@@ -97,6 +98,5 @@ class AddVacationPageView(View):
         :param request: Django HTTP request object
         :return: True if user is admin, False otherwise
         """
-        user_id = request.session.get("user_id")
-        user = User.objects.filter(id=user_id).first()
+        user = request.current_user
         return bool(user and user.is_staff)
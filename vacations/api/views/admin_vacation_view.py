@@ -4,24 +4,21 @@ from django.http import HttpRequest, HttpResponse
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib import messages
 from django.shortcuts import render, redirect, get_object_or_404
-from vacations.models import User, Vacation
+from vacations.models import Vacation
 from vacations.api.serializers.vacation_serializer import EditVacationSerializer
+from vacations.query_budget import query_budget
 
 
+@query_budget(3)
 class AdminVacationListView(View):
     """
     View for displaying vacations to Admin users only.
     """
 
     def get(self, request: HttpRequest) -> HttpResponse:
-        user_id = request.session.get('user_id')
+        user = request.current_user  # loaded once, with role
 
-        if not user_id:
-            return redirect(reverse('login-form'))
-
-        try:
-            user = User.objects.get(id=user_id)
-        except User.DoesNotExist:
+        if not user:
             return redirect(reverse('login-form'))
 
         # check if user is admin
@@ -29,7 +26,7 @@ class AdminVacationListView(View):
             return HttpResponse("Unauthorized", status=403)
 
         # get all vacations
-        vacations = Vacation.objects.all().order_by('start_date')
+        vacations = Vacation.objects.select_related('country').order_by('start_date')
 
         context = {
             'vacations': vacations,
@@ -4,8 +4,10 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.core.exceptions import ValidationError
 from vacations.models import Vacation, Country, User
 from vacations.services import update_vacation
+from vacations.query_budget import query_budget
 
 
+@query_budget(6)
 class EditVacationPageView(View):
     """
     Handles the editing of an existing vacation by admin users.
@@ -20,13 +22,12 @@ class EditVacationPageView(View):
         :param vacation_id: ID of the vacation to edit
         :return: Rendered HTML page with edit form
         """
-        user_id: Optional[int] = request.session.get("user_id")
-        user: Optional[User] = User.objects.filter(id=user_id).first()
+        user: Optional[User] = request.current_user
 
         if not user or not user.is_staff:
             return redirect("login-form")
 
-        vacation = get_object_or_404(Vacation, id=vacation_id)
+        vacation = get_object_or_404(Vacation.objects.select_related("country"), id=vacation_id)
         countries = Country.objects.all()
 
         return render(request, "vacations/edit_vacation.html", {
@@ -43,13 +44,12 @@ class EditVacationPageView(View):
         :param vacation_id: ID of the vacation being edited
         :return: Redirect to admin list or render form with errors
         """
-        user_id: Optional[int] = request.session.get("user_id")
-        user: Optional[User] = User.objects.filter(id=user_id).first()
+        user: Optional[User] = request.current_user
 
         if not user or not user.is_staff:
             return redirect("login-form")
 
-        vacation = get_object_or_404(Vacation, id=vacation_id)
+        vacation = get_object_or_404(Vacation.objects.select_related("country"), id=vacation_id)
 
         # Extract fields from form
         country_id = request.POST.get("country_id")
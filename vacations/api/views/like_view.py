@@ -1,11 +1,18 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from vacations.models import Like, Vacation
+from vacations.services import apply_like_batch, set_like, clear_like
+from vacations.api.serializers.like_serializer import LikeBatchSerializer
+from vacations.query_budget import query_budget
 
+@query_budget(2)
 class LikeVacationView(APIView):
     """
     Add a like for a vacation by the authenticated user (via session).
+
+    POST keeps the original contract (400 if already liked).
+    PUT / DELETE are idempotent: they set or clear the like and always
+    return the resulting state.
     """
 
     def post(self, request, vacation_id: int) -> Response:
@@ -14,16 +21,44 @@ class LikeVacationView(APIView):
         if not user_id:
             return Response({"error": "User not authenticated"}, status=status.HTTP_403_FORBIDDEN)
 
-        if not Vacation.objects.filter(id=vacation_id).exists():
+        result = set_like(user_id, vacation_id)
+
+        if not result.found:
             return Response({"error": "Vacation not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        if Like.objects.filter(user_id=user_id, vacation_id=vacation_id).exists():
+        if not result.changed:
             return Response({"error": "Already liked"}, status=status.HTTP_400_BAD_REQUEST)
 
-        Like.objects.create(user_id=user_id, vacation_id=vacation_id)
         return Response({"message": "Like added successfully"}, status=status.HTTP_201_CREATED)
 
+    def put(self, request, vacation_id: int) -> Response:
+        return self._toggle(request, vacation_id, liked=True)
+
+    def delete(self, request, vacation_id: int) -> Response:
+        return self._toggle(request, vacation_id, liked=False)
+
+    def _toggle(self, request, vacation_id: int, liked: bool) -> Response:
+        """
+        Set the like state for the session user in a single statement.
+        """
+        user_id = request.session.get("user_id")
+
+        if not user_id:
+            return Response({"error": "User not authenticated"}, status=status.HTTP_403_FORBIDDEN)
+
+        result = set_like(user_id, vacation_id) if liked else clear_like(user_id, vacation_id)
+
+        if not result.found:
+            return Response({"error": "Vacation not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({
+            "vacation_id": vacation_id,
+            "liked_by_user": liked,
+            "like_count": result.like_count,
+        })
+
 
+@query_budget(2)
 class UnlikeVacationView(APIView):
     """
     Remove a like for a vacation by the authenticated user (via session).
@@ -35,9 +70,30 @@ class UnlikeVacationView(APIView):
         if not user_id:
             return Response({"error": "User not authenticated"}, status=status.HTTP_403_FORBIDDEN)
 
-        deleted, _ = Like.objects.filter(user_id=user_id, vacation_id=vacation_id).delete()
-
-        if deleted == 0:
+        if not clear_like(user_id, vacation_id).changed:
             return Response({"error": "Like not found"}, status=status.HTTP_404_NOT_FOUND)
 
         return Response({"message": "Like removed successfully"})
+
+
+@query_budget(4)
+class LikeBatchView(APIView):
+    """
+    Apply a batch of like/unlike actions for the authenticated user (via session).
+    Used by clients that replay queued actions after coming back online.
+    """
+
+    def post(self, request) -> Response:
+        user_id = request.session.get("user_id")
+
+        if not user_id:
+            return Response({"error": "User not authenticated"}, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = LikeBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        results = apply_like_batch(
+            user_id, serializer.validated_data['like'], serializer.validated_data['unlike']
+        )
+        return Response({"results": results})
@@ -6,8 +6,10 @@ from django.contrib import messages
 from django.core.validators import validate_email
 from django.core.exceptions import ValidationError
 from vacations.models import User
+from vacations.query_budget import query_budget
 
 
+@query_budget(2)
 class LoginPageView(View):
     """
     Display the login form page.
@@ -16,6 +18,7 @@ class LoginPageView(View):
         return render(request, 'auth/login.html')
 
 
+@query_budget(3)
 class LoginFormHandlerView(View):
     """
     Handle login form submission and manage session.
@@ -31,7 +34,7 @@ class LoginFormHandlerView(View):
             messages.error(request, "Invalid email format.")
             return render(request, 'auth/login.html')
 
-        user: User | None = User.objects.filter(email=email).first()
+        user: User | None = User.objects.select_related('role').filter(email=email).first()
 
         if not user:
             register_url = reverse('register-form')
@@ -55,6 +58,7 @@ class LoginFormHandlerView(View):
         return redirect(reverse('vacation-list'))
 
 
+@query_budget(2)
 class LogoutView(View):
     """
     Handle user logout and session cleanup.
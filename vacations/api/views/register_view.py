@@ -5,8 +5,10 @@ from django.views import View
 from django.http import HttpRequest, HttpResponse
 from vacations.models import User
 from vacations.api.serializers.user_serializer import RegisterSerializer
+from vacations.query_budget import query_budget
 
 
+@query_budget(6)
 class RegisterPageView(View):
     """
     Handle user registration via HTML form.
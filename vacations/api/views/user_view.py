@@ -4,9 +4,11 @@ from rest_framework import status
 from typing import Any
 from vacations.api.serializers.user_serializer import RegisterSerializer
 from vacations.api.serializers.login_serializer import LoginSerializer
+from vacations.query_budget import query_budget
 
 
 
+@query_budget(4)
 class RegisterView(APIView):
     """
     API endpoint for registering a new user.
@@ -23,6 +25,7 @@ class RegisterView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@query_budget(2)
 class LoginView(APIView):
     """
     API endpoint for user login.
@@ -2,40 +2,69 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from typing import Any
-from vacations.models import Vacation, Like, User
+from django.core.exceptions import ValidationError
+from vacations.conditional import conditional_response, make_etag
+from vacations.models import Vacation
+from vacations.services import (
+    filter_vacations, get_vacations_with_likes, paginate_vacations, parse_page_size
+)
 from vacations.api.serializers.vacation_serializer import (
-    VacationSerializer, EditVacationSerializer, AddVacationSerializer
+    VacationListSerializer, EditVacationSerializer, AddVacationSerializer, VacationFilterSerializer
 )
+from vacations.query_budget import query_budget
 
 
 
+@query_budget(3)
 class VacationListView(APIView):
     """
-    Returns a list of all vacations in the system,
+    Returns vacations ordered by start date, one keyset page at a time,
     including like count and whether the current user liked each vacation.
+
+    Query parameters: 'cursor' (from the previous page's 'next_cursor') and
+    'limit'. 'all=true' returns the whole catalogue as a bare list, as the
+    endpoint did before pagination. Optional filters: 'country', 'date_from',
+    'date_to', 'min_price', 'max_price' and 'q' (description search).
     """
 
     def get(self, request) -> Response:
         """
-        Handle GET requests to retrieve all vacations.
+        Handle GET requests to retrieve a page of vacations.
         Adds 'like_count' and 'liked_by_user' to each vacation.
         """
+        filters = VacationFilterSerializer(data=request.query_params)
+        if not filters.is_valid():
+            return Response(filters.errors, status=status.HTTP_400_BAD_REQUEST)
+
         user_id: int = request.session.get("user_id", 0)
-        vacations = Vacation.objects.all().order_by('start_date')
+        query = sorted(request.query_params.lists())
+        etag = make_etag("vacation_list", ("vacation", "like"), user_id, query)
+        return conditional_response(
+            request, etag, lambda: self.build_response(request, user_id, filters.validated_data)
+        )
 
-        serialized = VacationSerializer(vacations, many=True).data
+    def build_response(self, request, user_id: int, filters: dict) -> Response:
+        """
+        Run the list query for a request whose ETag did not match.
+        """
+        vacations = filter_vacations(get_vacations_with_likes(user_id), **filters)
+
+        if request.query_params.get("all") == "true":
+            return Response(VacationListSerializer(vacations, many=True).data)
 
-        for vacation in serialized:
-            vacation_id = vacation["id"]
-            vacation["like_count"] = Like.objects.filter(vacation_id=vacation_id).count()
-            vacation["liked_by_user"] = Like.objects.filter(
-                vacation_id=vacation_id,
-                user_id=user_id
-            ).exists()
+        try:
+            limit = parse_page_size(request.query_params.get("limit"))
+            page = paginate_vacations(vacations, request.query_params.get("cursor"), limit)
+        except ValidationError as e:
+            return Response({"error": e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response(serialized)
+        return Response({
+            "results": VacationListSerializer(page.items, many=True).data,
+            "next_cursor": page.next_cursor,
+        })
 
 
+@query_budget(4)
 class AddVacationView(APIView):
     """
     API endpoint to add a new vacation (Admin only).
@@ -45,8 +74,7 @@ class AddVacationView(APIView):
         """
         Handle POST request to add a vacation.
         """
-        user_id = request.session.get("user_id")
-        user = User.objects.filter(id=user_id).first()
+        user = request.current_user
 
         if not user or not user.is_staff:
             return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
@@ -58,6 +86,7 @@ class AddVacationView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@query_budget(4)
 class EditVacationView(APIView):
     """
     Return JSON :API endpoint to view or update a vacation (Admin only).
@@ -67,8 +96,7 @@ class EditVacationView(APIView):
         """
         Retrieve vacation data for editing.
         """
-        user_id = request.session.get("user_id")
-        user = User.objects.filter(id=user_id).first()
+        user = request.current_user
 
         if not user or not user.is_staff:
             return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
@@ -85,8 +113,7 @@ class EditVacationView(APIView):
         """
         Update vacation data.
         """
-        user_id = request.session.get("user_id")
-        user = User.objects.filter(id=user_id).first()
+        user = request.current_user
 
         if not user or not user.is_staff:
             return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
@@ -103,6 +130,7 @@ class EditVacationView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@query_budget(7)
 class DeleteVacationView(APIView):
     """
     API endpoint to delete a vacation (Admin only).
@@ -112,8 +140,7 @@ class DeleteVacationView(APIView):
         """
         Delete a vacation by ID.
         """
-        user_id = request.session.get("user_id")
-        user = User.objects.filter(id=user_id).first()
+        user = request.current_user
 
         if not user or not user.is_staff:
             return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
@@ -2,8 +2,10 @@ from django.shortcuts import get_object_or_404, render, redirect
 from django.views import View
 from django.contrib import messages
 from vacations.models import Vacation
+from vacations.query_budget import query_budget
 
 
+@query_budget(2)
 class VacationDetailView(View):
     """
     Display full vacation details. Requires user to be logged in.
@@ -16,5 +18,5 @@ class VacationDetailView(View):
         if not user_id:
             return render(request, "auth/login.html")
 
-        vacation = get_object_or_404(Vacation, id=vacation_id)
+        vacation = get_object_or_404(Vacation.objects.select_related("country"), id=vacation_id)
         return render(request, "vacations/vacation_detail.html", {"vacation": vacation})
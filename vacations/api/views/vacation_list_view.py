@@ -1,16 +1,23 @@
+from django.core.exceptions import ValidationError
+from django.http import Http404
 from django.views.generic import TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.shortcuts import redirect
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_protect
 from vacations.models import Vacation, Like
+from vacations.services import paginate_vacations, parse_page_size
+from vacations.query_budget import query_budget
 
 
 
+@query_budget(3)
 class VacationListPageView(TemplateView):
     """
     Render vacation list page. Accessible to all users.
     If logged in, will show which vacations the user liked.
+    Pages through the catalogue with the same keyset cursor as the API
+    ('?cursor=...&limit=...'); '?all=true' renders every vacation.
     """
 
     template_name = 'vacations/vacation_list.html'
@@ -19,14 +26,29 @@ class VacationListPageView(TemplateView):
         context = super().get_context_data(**kwargs)
         user_id = self.request.session.get('user_id')  # might be None
 
-        vacations = Vacation.objects.all().order_by('start_date')
+        # One query for a page of vacations + country, one for the user's likes
+        vacations = Vacation.objects.select_related('country').order_by('start_date', 'id')
+        params = self.request.GET
+        next_cursor = None
+        if params.get('all') != 'true':
+            try:
+                page = paginate_vacations(
+                    vacations, params.get('cursor'), parse_page_size(params.get('limit'))
+                )
+            except ValidationError:
+                raise Http404("Invalid page.")
+            vacations, next_cursor = page.items, page.next_cursor
+
+        vacations = list(vacations)
+        liked_ids = set()
+        if user_id and vacations:
+            # Only the likes of the rendered vacations, not the user's whole history
+            liked_ids = set(Like.objects.filter(
+                user_id=user_id, vacation_id__in=[vacation.id for vacation in vacations]
+            ).values_list('vacation_id', flat=True))
 
         vacation_data = []
         for vacation in vacations:
-            liked = False
-            if user_id:
-                liked = Like.objects.filter(vacation_id=vacation.id, user_id=user_id).exists()
-
             vacation_data.append({
                 'id': vacation.id,
                 'country': vacation.country.name,
@@ -35,9 +57,12 @@ class VacationListPageView(TemplateView):
                 'end_date': vacation.end_date,
                 'price': vacation.price,
                 'image_filename': vacation.image_filename,
-                'like_count': Like.objects.filter(vacation_id=vacation.id).count(),
-                'liked_by_user': liked,
+                'like_count': vacation.like_count,
+                'liked_by_user': vacation.id in liked_ids,
             })
 
         context['vacations'] = vacation_data
+        context['next_cursor'] = next_cursor
+        context['is_first_page'] = not params.get('cursor')
+        context['page_limit'] = params.get('limit', '')
         return context
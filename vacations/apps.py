@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class VacationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'vacations'
+
+    def ready(self) -> None:
+        from django.db.backends.signals import connection_created
+        from vacations.query_budget import install_counter
+        connection_created.connect(install_counter, dispatch_uid="vacations.query_budget.install_counter")
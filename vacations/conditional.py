@@ -0,0 +1,75 @@
+"""
+Conditional GET (ETag / If-None-Match) from the per-table change counters.
+
+The ETag of a response is a hash of the counters of the tables it reads plus
+whatever else it depends on (user, query string, reference date). Checking
+it costs one primary-key read of vacations_dataversion, so a 304 is answered
+before any data table is queried.
+"""
+import hashlib
+from typing import Any, Awaitable, Callable, Mapping, Optional, Sequence
+from asgiref.sync import sync_to_async
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from vacations.versions import get_table_versions
+
+
+def make_etag(name: str, tables: Sequence[str], *parts: Any,
+              versions: Optional[Mapping[str, int]] = None) -> str:
+    """
+    Build a strong ETag for a response.
+
+    :param name: Endpoint name
+    :param tables: Tables the response is computed from
+    :param parts: Other values the response depends on
+    :param versions: Counters already read in this request (must cover
+        ``tables``); read from the database if omitted
+    :return: Quoted ETag
+    """
+    if versions is None:
+        versions = get_table_versions(*tables)
+    raw = ":".join([name, *(f"{t}={versions[t]}" for t in tables), *map(str, parts)])
+    return quote_etag(hashlib.sha1(raw.encode()).hexdigest())
+
+
+def conditional_response(request: HttpRequest, etag: str, build: Callable[[], HttpResponse]) -> HttpResponse:
+    """
+    Answer 304 if the client already has ``etag``, otherwise build the response.
+
+    Either way the ETag is attached and clients are told to revalidate
+    (the data is per-user or admin-only, so shared caches must not keep it).
+
+    :param request: Incoming request
+    :param etag: ETag from make_etag
+    :param build: Zero-argument function producing the full response
+    :return: 304 or the built response
+    """
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = build()
+    return _with_etag(response, etag)
+
+
+async def amake_etag(name: str, tables: Sequence[str], *parts: Any,
+                     versions: Optional[Mapping[str, int]] = None) -> str:
+    """Async ``make_etag``."""
+    if versions is not None:
+        return make_etag(name, tables, *parts, versions=versions)
+    return await sync_to_async(make_etag)(name, tables, *parts)
+
+
+async def aconditional_response(request: HttpRequest, etag: str,
+                                build: Callable[[], Awaitable[HttpResponse]]) -> HttpResponse:
+    """Async ``conditional_response``: ``build`` is a coroutine function."""
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = await build()
+    return _with_etag(response, etag)
+
+
+def _with_etag(response: HttpResponse, etag: str) -> HttpResponse:
+    if response.status_code in (200, 304):
+        response.headers["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -1,11 +1,7 @@
-from vacations.models import User
+from vacations.middleware import get_current_user
 
 def current_user_full_name(request):
-    user_id = request.session.get("user_id")
-    if not user_id:
-        return {}
-
-    user = User.objects.filter(id=user_id).first()
+    user = get_current_user(request)
     if not user:
         return {}
 
@@ -0,0 +1,130 @@
+import json
+from datetime import date
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connection, transaction
+from django.db.models import QuerySet
+from vacations.models import Like, Vacation
+from vacations.services import filter_vacations
+
+HOT_TABLES = ("vacations_vacation", "vacations_like")
+AS_OF = date(2010, 6, 1)
+
+# Synthetic rows spread over 20 years and 50 countries so that every hot
+# filter is selective, as it is on a real catalogue.
+_SEED_SQL = [
+    "INSERT INTO vacations_role (name) VALUES ('plan-check')",
+    """
+    INSERT INTO vacations_user (first_name, last_name, email, password, role_id, is_staff)
+    SELECT 'Plan', 'Check', 'plan-check-' || g || '@example.com', 'x',
+           (SELECT id FROM vacations_role WHERE name = 'plan-check'), false
+    FROM generate_series(1, 100) AS g
+    """,
+    """
+    INSERT INTO vacations_country (name)
+    SELECT 'Plan check ' || g FROM generate_series(1, 50) AS g
+    """,
+    """
+    INSERT INTO vacations_vacation
+        (country_id, description, start_date, end_date, price, image_filename, like_count)
+    SELECT c.ids[1 + g %% 50], 'Plan check', DATE '2000-01-01' + g %% 7300,
+           DATE '2000-01-01' + g %% 7300 + 7, 100 + g %% 9900, 'plan.jpg', 0
+    FROM generate_series(1, %(rows)s) AS g,
+         (SELECT array_agg(id) AS ids FROM vacations_country WHERE name LIKE 'Plan check %%') AS c
+    """,
+    """
+    INSERT INTO vacations_like (user_id, vacation_id)
+    SELECT u.ids[1 + v.id %% 100], v.id
+    FROM vacations_vacation AS v,
+         (SELECT array_agg(id) AS ids FROM vacations_user WHERE email LIKE 'plan-check-%%') AS u
+    WHERE v.description = 'Plan check'
+    """,
+    "ANALYZE vacations_vacation, vacations_like, vacations_user, vacations_country",
+]
+
+
+def hot_queries() -> List[Tuple[str, Callable[[], QuerySet]]]:
+    """
+    The filter and join shapes used on every request, as querysets.
+
+    The date-bucket counts are one aggregate over the whole table by design
+    (see stats_api.services), so they are not listed here.
+
+    :return: (label, queryset factory) pairs
+    """
+    vacation_id = Vacation.objects.order_by('-id').values_list('id', flat=True).first()
+    country_id = Vacation.objects.order_by('-id').values_list('country_id', flat=True).first()
+    user_id = Like.objects.order_by('-id').values_list('user_id', flat=True).first()
+    return [
+        ("vacation list page", lambda: Vacation.objects.order_by('start_date', 'id')[:20]),
+        ("upcoming vacations",
+         lambda: Vacation.objects.filter(start_date__gt=AS_OF).order_by('start_date', 'id')[:20]),
+        ("past vacations window",
+         lambda: Vacation.objects.filter(end_date__lt=AS_OF).order_by('-end_date')[:20]),
+        ("likes of a vacation", lambda: Like.objects.filter(vacation_id=vacation_id)),
+        ("liked ids of a user",
+         lambda: Like.objects.filter(user_id=user_id).values_list('vacation_id', flat=True)),
+        ("vacations of a country", lambda: Vacation.objects.filter(country_id=country_id)),
+        ("price range", lambda: filter_vacations(Vacation.objects.all(), min_price=500, max_price=510)),
+        ("description search", lambda: filter_vacations(Vacation.objects.all(), q="sunset")),
+    ]
+
+
+def _walk(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _walk(child)
+
+
+def seq_scanned_tables(queryset: QuerySet) -> List[str]:
+    """
+    Run EXPLAIN on a queryset and list the hot tables it scans sequentially.
+
+    :param queryset: Query to explain
+    :return: Names of hot tables read with a Seq Scan
+    """
+    plan = json.loads(queryset.explain(format="json"))[0]["Plan"]
+    return [
+        node["Relation Name"] for node in _walk(plan)
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in HOT_TABLES
+    ]
+
+
+class Command(BaseCommand):
+    """
+    Custom Django management command to verify that hot queries use indexes.
+    """
+
+    help = "EXPLAIN the hot vacation/like queries and fail on sequential scans."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--seed", type=int, default=50000,
+            help="Synthetic vacations inserted (and rolled back) before explaining; "
+                 "0 explains against the existing data (default: 50000).",
+        )
+
+    def handle(self, *args, **options) -> None:
+        """
+        Seed inside a transaction, explain every hot query, then roll back.
+        """
+        failures: List[str] = []
+        with transaction.atomic():
+            if options["seed"]:
+                with connection.cursor() as cursor:
+                    for sql in _SEED_SQL:
+                        cursor.execute(sql, {"rows": options["seed"]})
+
+            for label, build in hot_queries():
+                tables = seq_scanned_tables(build())
+                if tables:
+                    failures.append(label)
+                    self.stdout.write(self.style.ERROR(f"❌ {label}: seq scan on {', '.join(tables)}"))
+                else:
+                    self.stdout.write(f"   {label}: index")
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f"{len(failures)} hot query(ies) fall back to a sequential scan.")
+        self.stdout.write(self.style.SUCCESS("✅ All hot queries use an index."))
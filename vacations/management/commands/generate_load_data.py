@@ -0,0 +1,213 @@
+import bisect
+import heapq
+import itertools
+import math
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Sequence, Tuple
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connection, transaction
+from vacations.models import Country, Role
+
+IMAGES = [
+    "barcelona.jpg", "berlin.jpg", "brazil.jpg", "deadsea.jpg", "mexico.jpg", "miami.jpg",
+    "nyc.jpg", "paris.jpg", "rockies.jpg", "rome.jpg", "tel_aviv.jpg", "tokyo.jpg",
+]
+WORDS = [
+    "beach", "city", "mountain", "culture", "food", "history", "island", "lake", "museum",
+    "nightlife", "relaxing", "family", "adventure", "hiking", "wine", "sunset", "spa", "tour",
+]
+# Popularity follows a Zipf law: the vacation of rank r gets weight 1 / r**s.
+VACATION_SKEW = 1.1
+USER_SKEW = 0.8
+LIKE_HISTORY_SECONDS = 365 * 24 * 3600
+
+
+def zipf_cum_weights(n: int, s: float) -> List[float]:
+    """Cumulative Zipf weights for ranks 1..n."""
+    return list(itertools.accumulate(1 / rank ** s for rank in range(1, n + 1)))
+
+
+def split_quota(total: int, cum_weights: Sequence[float], cap: int) -> List[int]:
+    """
+    Split ``total`` into per-item counts proportional to the weights, each at most ``cap``.
+
+    :param total: Number to distribute (must not exceed len(cum_weights) * cap)
+    :param cum_weights: Cumulative weights, one per item
+    :param cap: Maximum count per item
+    :return: Counts summing to ``total``
+    """
+    weights = [b - a for a, b in zip([0.0, *cum_weights], cum_weights)]
+    scale = total / cum_weights[-1]
+    counts = [min(cap, int(w * scale)) for w in weights]
+    missing = total - sum(counts)
+    for i in itertools.cycle(range(len(counts))):
+        if missing <= 0:
+            break
+        if counts[i] < cap:
+            counts[i] += 1
+            missing -= 1
+    return counts
+
+
+class Command(BaseCommand):
+    """
+    Custom Django management command to generate a large synthetic dataset.
+    """
+
+    help = (
+        "Append synthetic users, vacations and likes with COPY "
+        "(skewed like distribution), reporting rows/sec."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--users", type=int, default=10000, help="Users to create (default: 10000).")
+        parser.add_argument("--vacations", type=int, default=10000, help="Vacations to create (default: 10000).")
+        parser.add_argument("--likes", type=int, default=100000, help="Likes to create (default: 100000).")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed for reproducible data (default: 0).")
+
+    def handle(self, *args, **options) -> None:
+        """
+        COPY users, vacations and likes in one transaction, then fix the like counters and rollups.
+        """
+        users, vacations, likes = options["users"], options["vacations"], options["likes"]
+        if min(users, vacations) < 1 or likes < 0:
+            raise CommandError("--users and --vacations must be positive, --likes not negative.")
+        if likes > users * vacations:
+            raise CommandError("--likes cannot exceed --users x --vacations (one like per pair).")
+
+        rng = random.Random(options["seed"])
+        tag = f"{options['seed']}-{int(time.time())}"
+        started = time.perf_counter()
+        with transaction.atomic():
+            role_id = Role.objects.get_or_create(name="user")[0].id
+            country_ids = self.country_ids()
+
+            user_ids = self.copy_rows(
+                "vacations_user", ["first_name", "last_name", "email", "password", "role_id", "is_staff"],
+                (("Load", str(i), f"load-{tag}-{i}@example.com", "loadpass", role_id, False)
+                 for i in range(users)),
+                users,
+            )
+            vacation_ids = self.copy_rows(
+                "vacations_vacation",
+                ["country_id", "description", "start_date", "end_date", "price", "image_filename", "like_count"],
+                self.vacation_rows(rng, country_ids, vacations),
+                vacations,
+            )
+            self.copy_rows("vacations_like", ["user_id", "vacation_id", "created_at"],
+                           self.like_rows(rng, user_ids, vacation_ids, likes), likes, fetch_ids=False)
+
+            # The new likes only touch the new vacations: fix their counters
+            # and roll them up per day.
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "UPDATE vacations_vacation AS v SET like_count = c.n FROM ("
+                    " SELECT vacation_id, COUNT(*) AS n FROM vacations_like"
+                    " WHERE vacation_id >= %s GROUP BY vacation_id"
+                    ") AS c WHERE v.id = c.vacation_id",
+                    [vacation_ids[0]],
+                )
+                cursor.execute(
+                    "INSERT INTO vacations_likerollup (bucket, vacation_id, likes)"
+                    " SELECT (created_at AT TIME ZONE 'UTC')::date, vacation_id, COUNT(*)"
+                    " FROM vacations_like WHERE vacation_id >= %s GROUP BY 1, 2",
+                    [vacation_ids[0]],
+                )
+
+        elapsed = time.perf_counter() - started
+        total = users + vacations + likes
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Generated {total} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/sec)."
+        ))
+
+    def country_ids(self) -> List[int]:
+        """
+        Return all country IDs, creating a default set when the table is empty.
+        """
+        ids = list(Country.objects.order_by("id").values_list("id", flat=True))
+        if not ids:
+            ids = [c.id for c in Country.objects.bulk_create(
+                [Country(name=f"Load country {i}") for i in range(20)]
+            )]
+        return ids
+
+    def copy_rows(self, table: str, columns: List[str], rows: Iterator[Tuple], count: int,
+                  fetch_ids: bool = True) -> List[int]:
+        """
+        Stream rows into a table with COPY FROM STDIN and report the rate.
+
+        :param table: Target table
+        :param columns: Column names, in row order
+        :param rows: Row tuples
+        :param count: Number of rows (for reporting and ID lookup)
+        :param fetch_ids: Return the IDs of the new rows (they are the highest IDs)
+        :return: New row IDs in insertion order, or an empty list
+        """
+        started = time.perf_counter()
+        with connection.cursor() as cursor:
+            with cursor.copy(f"COPY {table} ({', '.join(columns)}) FROM STDIN") as copy:
+                for row in rows:
+                    copy.write_row(row)
+            ids: List[int] = []
+            if fetch_ids:
+                cursor.execute(
+                    f"SELECT id FROM (SELECT id FROM {table} ORDER BY id DESC LIMIT %s) AS t ORDER BY id",
+                    [count],
+                )
+                ids = [r[0] for r in cursor.fetchall()]
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"   {table}: {count} rows, {count / max(elapsed, 1e-9):,.0f} rows/sec")
+        return ids
+
+    def vacation_rows(self, rng: random.Random, country_ids: List[int], count: int) -> Iterator[Tuple]:
+        """
+        Yield vacations spread over two years around today.
+        """
+        today = date.today()
+        for _ in range(count):
+            start = today + timedelta(days=rng.randint(-365, 365))
+            description = " ".join(rng.sample(WORDS, 4)).capitalize()
+            yield (
+                rng.choice(country_ids), description, start,
+                start + timedelta(days=rng.randint(3, 21)),
+                rng.randint(200, 10000), rng.choice(IMAGES), 0,
+            )
+
+    def like_rows(self, rng: random.Random, user_ids: List[int], vacation_ids: List[int],
+                  count: int) -> Iterator[Tuple[int, int, datetime]]:
+        """
+        Yield distinct (user, vacation, created_at) likes with Zipf-skewed popularity.
+
+        A few users like many vacations and a few vacations collect most of
+        the likes. Only one user's picks are held in memory at a time.
+        Likes are dated uniformly over the past year.
+        """
+        if not count:
+            return
+        popularity = zipf_cum_weights(len(vacation_ids), VACATION_SKEW)
+        ranked = vacation_ids[:]
+        rng.shuffle(ranked)
+        quotas = split_quota(count, zipf_cum_weights(len(user_ids), USER_SKEW), len(vacation_ids))
+        users = user_ids[:]
+        rng.shuffle(users)
+
+        weights = [1 / rank ** VACATION_SKEW for rank in range(1, len(ranked) + 1)]
+        last = len(ranked) - 1
+        now = datetime.now(timezone.utc)
+
+        for user_id, quota in zip(users, quotas):
+            if quota * 20 > len(ranked):
+                # Heavy user: weighted sampling without replacement
+                # (Efraimidis-Spirakis keys), linear in the catalogue size.
+                keys = ((math.log(1.0 - rng.random()) / w, v) for w, v in zip(weights, ranked))
+                picks = [v for _, v in heapq.nlargest(quota, keys)]
+            else:
+                chosen: Dict[int, None] = {}
+                while len(chosen) < quota:
+                    point = rng.random() * popularity[-1]
+                    chosen[ranked[min(bisect.bisect_left(popularity, point), last)]] = None
+                picks = list(chosen)
+            for vacation_id in picks:
+                yield user_id, vacation_id, now - timedelta(seconds=rng.randrange(LIKE_HISTORY_SECONDS))
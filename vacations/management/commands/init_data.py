@@ -1,4 +1,5 @@
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from datetime import date
 from vacations.models import Role, User, Country, Vacation
 
@@ -14,9 +15,18 @@ class Command(BaseCommand):
     def handle(self, *args, **kwargs) -> None:
         """
         Clears existing data and populates roles, users, countries, and vacations.
-        Ensures clean state and consistent IDs.
+        Ensures clean state and consistent IDs. Each step is one bulk INSERT
+        and the whole run is a single transaction.
         """
+        with transaction.atomic():
+            self.populate()
 
+        self.stdout.write(self.style.SUCCESS("✅ Database initialized successfully."))
+
+    def populate(self) -> None:
+        """
+        Replace all roles, users, countries and vacations with the initial set.
+        """
         # Step 1: Clear old data (important for consistent IDs)
         Vacation.objects.all().delete()
         Country.objects.all().delete()
@@ -24,35 +34,35 @@ class Command(BaseCommand):
         Role.objects.all().delete()
 
         # Step 2: Create roles
-        admin_role = Role.objects.create(name="admin")
-        user_role = Role.objects.create(name="user")
+        admin_role, user_role = Role.objects.bulk_create([Role(name="admin"), Role(name="user")])
 
         # Step 3: Create users
-        User.objects.create(
-            email="admin@example.com",
-            first_name="Admin",
-            last_name="Manager",
-            password="adminpass",
-            role=admin_role,
-            is_staff=True
-        )
-
-        User.objects.create(
-            email="Dan@example.com",
-            first_name="Dan",
-            last_name="Doe",
-            password="Danpass",
-            role=user_role
-        )
+        User.objects.bulk_create([
+            User(
+                email="admin@example.com",
+                first_name="Admin",
+                last_name="Manager",
+                password="adminpass",
+                role=admin_role,
+                is_staff=True
+            ),
+            User(
+                email="Dan@example.com",
+                first_name="Dan",
+                last_name="Doe",
+                password="Danpass",
+                role=user_role
+            ),
+        ])
 
         # Step 4: Create countries
         country_names: list[str] = [
             "Israel", "USA", "France", "Germany",
             "Italy", "Spain", "Canada", "Brazil", "Japan", "Mexico"
         ]
-        country_objs = [
-            Country.objects.create(name=name) for name in country_names
-        ]
+        country_objs = Country.objects.bulk_create(
+            [Country(name=name) for name in country_names]
+        )
 
         # Step 5: Create vacations (fixed order = fixed IDs)
         vacations_data: list[tuple[str, int, date, date, int, str]] = [
@@ -70,8 +80,8 @@ class Command(BaseCommand):
             ("Miami Beach", 1, date(2026, 6, 10), date(2026, 6, 20), 3600, "miami.jpg"),
         ]
 
-        for desc, country_idx, start, end, price, img in vacations_data:
-            Vacation.objects.create(
+        Vacation.objects.bulk_create([
+            Vacation(
                 description=desc,
                 country=country_objs[country_idx],
                 start_date=start,
@@ -79,5 +89,5 @@ class Command(BaseCommand):
                 price=price,
                 image_filename=img
             )
-
-        self.stdout.write(self.style.SUCCESS("✅ Database initialized successfully."))
+            for desc, country_idx, start, end, price, img in vacations_data
+        ])
@@ -0,0 +1,57 @@
+import time
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand, CommandParser
+from django.utils import timezone
+
+
+def purge_expired_sessions(batch_size: int, pause: float = 0.0) -> int:
+    """
+    Delete expired rows from django_session in batches.
+
+    Each batch is a short DELETE on primary keys, so the table is never
+    locked for long even when millions of rows have expired.
+
+    :param batch_size: Maximum rows deleted per statement
+    :param pause: Seconds to sleep between batches
+    :return: Total number of rows deleted
+    """
+    now = timezone.now()
+    total = 0
+    while True:
+        keys = list(
+            Session.objects.filter(expire_date__lt=now)
+            .values_list('session_key', flat=True)[:batch_size]
+        )
+        if not keys:
+            return total
+        deleted, _ = Session.objects.filter(session_key__in=keys).delete()
+        total += deleted
+        if pause:
+            time.sleep(pause)
+
+
+class Command(BaseCommand):
+    """
+    Custom Django management command to purge expired database sessions.
+    """
+
+    help = "Delete expired sessions in batches (run from cron, or with --every as a background loop)."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--batch-size", type=int, default=5000,
+                            help="Rows deleted per statement (default: 5000).")
+        parser.add_argument("--pause", type=float, default=0.0,
+                            help="Seconds to sleep between batches (default: 0).")
+        parser.add_argument("--every", type=int, default=0,
+                            help="Keep running and purge every N seconds (default: run once).")
+
+    def handle(self, *args, **options) -> None:
+        """
+        Purge once, or forever at a fixed interval when --every is given.
+        """
+        while True:
+            deleted = purge_expired_sessions(options["batch_size"], options["pause"])
+            self.stdout.write(self.style.SUCCESS(f"✅ Purged {deleted} expired session(s)."))
+            if not options["every"]:
+                return
+            time.sleep(options["every"])
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandParser
+from vacations.services import recount_likes
+
+
+class Command(BaseCommand):
+    """
+    Custom Django management command to repair the denormalized like counters.
+    """
+
+    help = "Recalculate Vacation.like_count from the likes table."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--batch-size", type=int, default=1000,
+            help="Number of vacation IDs updated per statement (default: 1000).",
+        )
+
+    def handle(self, *args, **options) -> None:
+        """
+        Rewrite every drifted like counter in primary-key batches.
+        """
+        fixed: int = recount_likes(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"✅ Repaired {fixed} like counter(s)."))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandParser
+from vacations.services import rollup_likes
+
+
+class Command(BaseCommand):
+    """
+    Custom Django management command to rebuild the daily like rollups.
+    """
+
+    help = "Rebuild vacations_likerollup (likes per vacation and day) from the likes table."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--batch-size", type=int, default=1000,
+            help="Number of vacation IDs rebuilt per transaction (default: 1000).",
+        )
+
+    def handle(self, *args, **options) -> None:
+        """
+        Re-aggregate the rollup rows in primary-key batches.
+        """
+        written: int = rollup_likes(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"✅ Wrote {written} like rollup row(s)."))
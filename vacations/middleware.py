@@ -0,0 +1,43 @@
+from typing import Callable, Optional
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.http import HttpRequest, HttpResponse
+from django.utils.functional import SimpleLazyObject
+from vacations.models import User
+
+
+def get_current_user(request: HttpRequest) -> Optional[User]:
+    """
+    Return the session user (with role) for this request, loading it at most once.
+
+    :param request: Django HTTP request object
+    :return: User instance or None if nobody is logged in
+    """
+    if not hasattr(request, '_current_user'):
+        user_id = request.session.get('user_id')
+        request._current_user = (
+            User.objects.select_related('role').filter(id=user_id).first() if user_id else None
+        )
+    return request._current_user
+
+
+class CurrentUserMiddleware:
+    """
+    Attach the session user to ``request.current_user``.
+
+    The user is loaded lazily with its role on first access and shared by
+    views and context processors, so a request costs at most one user query.
+    Must be placed after SessionMiddleware. Works in sync and async stacks
+    (async views must not touch ``current_user``, its loading is sync).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        request.current_user = SimpleLazyObject(lambda: get_current_user(request))
+        return self.get_response(request)
@@ -0,0 +1,31 @@
+
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_like_count(apps, schema_editor):
+    Vacation = apps.get_model('vacations', 'Vacation')
+    Like = apps.get_model('vacations', 'Like')
+    likes = (
+        Like.objects.filter(vacation=OuterRef('pk'))
+        .values('vacation').annotate(c=Count('id')).values('c')
+    )
+    Vacation.objects.update(like_count=Coalesce(Subquery(likes), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacations', '0002_user_is_staff'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vacation',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_like_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+from django.db import migrations, models
+
+# The tables are unmanaged, so the indexes are created with RunSQL and only
+# recorded in the migration state. CONCURRENTLY keeps the table writable
+# while the index builds; it cannot run inside a transaction.
+CREATE_SQL = [
+    'CREATE INDEX CONCURRENTLY IF NOT EXISTS vacation_start_date_id_idx '
+    'ON vacations_vacation (start_date, id);',
+    'CREATE INDEX CONCURRENTLY IF NOT EXISTS vacation_end_date_idx '
+    'ON vacations_vacation (end_date);',
+]
+DROP_SQL = [
+    'DROP INDEX CONCURRENTLY IF EXISTS vacation_start_date_id_idx;',
+    'DROP INDEX CONCURRENTLY IF EXISTS vacation_end_date_idx;',
+]
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('vacations', '0003_vacation_like_count'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            CREATE_SQL,
+            DROP_SQL,
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='vacation',
+                    index=models.Index(fields=['start_date', 'id'], name='vacation_start_date_id_idx'),
+                ),
+                migrations.AddIndex(
+                    model_name='vacation',
+                    index=models.Index(fields=['end_date'], name='vacation_end_date_idx'),
+                ),
+            ],
+        ),
+    ]
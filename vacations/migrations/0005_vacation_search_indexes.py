@@ -0,0 +1,47 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+# Same approach as 0004: unmanaged tables, so RunSQL builds the indexes
+# concurrently and state_operations record them. The GIN expression must
+# match what SearchVector('description', config='english') compiles to.
+CREATE_SQL = [
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS vacation_description_fts_idx "
+    "ON vacations_vacation USING gin "
+    "(to_tsvector('english'::regconfig, COALESCE(description, ''::text)));",
+    'CREATE INDEX CONCURRENTLY IF NOT EXISTS vacation_price_idx '
+    'ON vacations_vacation (price);',
+]
+DROP_SQL = [
+    'DROP INDEX CONCURRENTLY IF EXISTS vacation_description_fts_idx;',
+    'DROP INDEX CONCURRENTLY IF EXISTS vacation_price_idx;',
+]
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('vacations', '0004_vacation_date_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            CREATE_SQL,
+            DROP_SQL,
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='vacation',
+                    index=django.contrib.postgres.indexes.GinIndex(
+                        django.contrib.postgres.search.SearchVector('description', config='english'),
+                        name='vacation_description_fts_idx',
+                    ),
+                ),
+                migrations.AddIndex(
+                    model_name='vacation',
+                    index=models.Index(fields=['price'], name='vacation_price_idx'),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,36 @@
+import django.db.models.deletion
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+# Likes that predate the column get the migration time; the rollup is then
+# built from the likes table (python manage.py rollup_likes rebuilds it).
+BACKFILL_SQL = (
+    "INSERT INTO vacations_likerollup (bucket, vacation_id, likes) "
+    "SELECT (created_at AT TIME ZONE 'UTC')::date, vacation_id, COUNT(*) "
+    "FROM vacations_like GROUP BY 1, 2;"
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacations', '0005_vacation_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='like',
+            name='created_at',
+            field=models.DateTimeField(db_default=django.db.models.functions.datetime.Now()),
+        ),
+        migrations.CreateModel(
+            name='LikeRollup',
+            fields=[
+                ('pk', models.CompositePrimaryKey('bucket', 'vacation', blank=True, editable=False, primary_key=True, serialize=False)),
+                ('bucket', models.DateField()),
+                ('likes', models.IntegerField(default=0)),
+                ('vacation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='vacations.vacation')),
+            ],
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,24 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacations', '0006_like_created_at_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatsSnapshot',
+            fields=[
+                ('day', models.DateField(primary_key=True, serialize=False)),
+                ('past_vacations', models.IntegerField()),
+                ('ongoing_vacations', models.IntegerField()),
+                ('future_vacations', models.IntegerField()),
+                ('total_users', models.IntegerField()),
+                ('total_likes', models.IntegerField()),
+                ('likes_distribution', models.JSONField(default=list)),
+                ('taken_at', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,134 @@
+from django.db import migrations, models
+
+# Table -> its counter column in vacations_dataversion (the rollups are like
+# data; roles are user data, since a user's role decides its access)
+VERSIONED = {
+    'vacations_vacation': 'vacation',
+    'vacations_like': 'like',
+    'vacations_likerollup': 'like',
+    'vacations_user': 'user',
+    'vacations_role': 'user',
+    'vacations_country': 'country',
+    'vacations_statssnapshot': 'snapshot',
+}
+
+# Denormalized column -> the counter its changes belong to. An UPDATE that
+# only changes it (a like or unlike moving vacations_vacation.like_count)
+# bumps that counter instead of the table's, so it leaves date-based
+# vacation stats valid.
+DENORMALIZED = {
+    'vacations_vacation': ('like_count', 'like'),
+}
+
+# Counters start from the clock, so a recreated row never repeats a version.
+CLOCK = "(extract(epoch FROM clock_timestamp()) * 1000)::bigint"
+
+# One trigger per event and table. Transition tables let statements that
+# change no rows (ON CONFLICT DO NOTHING, UPDATE ... WHERE nothing) skip
+# the bump; the upsert recreates the row if it was truncated. UPDATE
+# triggers given (counter, column, column's counter) compare old and new
+# rows to tell changes of that column apart from the rest.
+FUNCTION_SQL = """
+CREATE FUNCTION vacations_bump_data_version() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    changed boolean := TG_OP = 'TRUNCATE';
+    column_changed boolean := false;
+    bump constant text := 'INSERT INTO vacations_dataversion AS v (id) VALUES (1) '
+                          'ON CONFLICT (id) DO UPDATE SET %1$I = v.%1$I + 1';
+BEGIN
+    IF TG_OP = 'UPDATE' AND TG_NARGS = 3 THEN
+        EXECUTE format(
+            'SELECT coalesce(bool_or(to_jsonb(n) - %1$L IS DISTINCT FROM to_jsonb(o) - %1$L), false), '
+            'coalesce(bool_or(n.%1$I IS DISTINCT FROM o.%1$I), false) '
+            'FROM changed_rows n JOIN old_rows o USING (id)',
+            TG_ARGV[1]
+        ) INTO changed, column_changed;
+        IF column_changed THEN
+            EXECUTE format(bump, TG_ARGV[2]);
+        END IF;
+    ELSIF NOT changed THEN
+        EXECUTE 'SELECT EXISTS (SELECT FROM changed_rows)' INTO changed;
+    END IF;
+    IF changed THEN
+        EXECUTE format(bump, TG_ARGV[0]);
+    END IF;
+    RETURN NULL;
+END
+$$;
+"""
+
+TRIGGER_SQL = (
+    "CREATE TRIGGER {table}_{suffix}_version AFTER {event} ON {table}{referencing} "
+    "FOR EACH STATEMENT EXECUTE FUNCTION vacations_bump_data_version({args});"
+)
+EVENTS = [
+    ('ins', 'INSERT', ' REFERENCING NEW TABLE AS changed_rows'),
+    ('upd', 'UPDATE', ' REFERENCING NEW TABLE AS changed_rows'),
+    ('del', 'DELETE', ' REFERENCING OLD TABLE AS changed_rows'),
+    ('trunc', 'TRUNCATE', ''),
+]
+
+
+def trigger_sql(table: str, column: str, suffix: str, event: str, referencing: str) -> str:
+    args = [column]
+    if event == 'UPDATE' and table in DENORMALIZED:
+        args += DENORMALIZED[table]
+        referencing = ' REFERENCING OLD TABLE AS old_rows NEW TABLE AS changed_rows'
+    return TRIGGER_SQL.format(
+        table=table, suffix=suffix, event=event, referencing=referencing,
+        args=', '.join(f"'{arg}'" for arg in args),
+    )
+
+
+CREATE_SQL = [
+    'CREATE TABLE vacations_dataversion (id smallint PRIMARY KEY CHECK (id = 1), '
+    + ', '.join(f'"{column}" bigint NOT NULL DEFAULT {CLOCK}' for column in dict.fromkeys(VERSIONED.values()))
+    + ');',
+    'INSERT INTO vacations_dataversion (id) VALUES (1);',
+    FUNCTION_SQL,
+    *(
+        trigger_sql(table, column, suffix, event, referencing)
+        for table, column in VERSIONED.items()
+        for suffix, event, referencing in EVENTS
+    ),
+]
+DROP_SQL = [
+    *(
+        f'DROP TRIGGER IF EXISTS {table}_{suffix}_version ON {table};'
+        for table in VERSIONED
+        for suffix, _, _ in EVENTS
+    ),
+    'DROP FUNCTION IF EXISTS vacations_bump_data_version();',
+    'DROP TABLE IF EXISTS vacations_dataversion;',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacations', '0007_stats_snapshot'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            CREATE_SQL,
+            DROP_SQL,
+            state_operations=[
+                migrations.CreateModel(
+                    name='DataVersion',
+                    fields=[
+                        ('id', models.SmallIntegerField(primary_key=True, serialize=False)),
+                        ('vacation', models.BigIntegerField()),
+                        ('like', models.BigIntegerField()),
+                        ('user', models.BigIntegerField()),
+                        ('country', models.BigIntegerField()),
+                        ('snapshot', models.BigIntegerField()),
+                    ],
+                    options={
+                        'db_table': 'vacations_dataversion',
+                        'managed': False,
+                    },
+                ),
+            ],
+        ),
+    ]
@@ -1,4 +1,7 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
 from django.db import models
+from django.db.models.functions import Now
 
 class Role(models.Model):
     name = models.CharField(max_length=50, unique=True)
@@ -33,16 +36,80 @@ class Vacation(models.Model):
     end_date = models.DateField()
     price = models.DecimalField(max_digits=8, decimal_places=2)
     image_filename = models.CharField(max_length=255)
+    like_count = models.PositiveIntegerField(default=0)
 
     class Meta:
         managed = False
         db_table = "vacations_vacation"
+        indexes = [
+            # Ordering / keyset pagination and the date-bucket filters.
+            models.Index(fields=['start_date', 'id'], name='vacation_start_date_id_idx'),
+            models.Index(fields=['end_date'], name='vacation_end_date_idx'),
+            # List filters: price range and full-text search on the description.
+            models.Index(fields=['price'], name='vacation_price_idx'),
+            GinIndex(SearchVector('description', config='english'), name='vacation_description_fts_idx'),
+        ]
 
 class Like(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     vacation = models.ForeignKey(Vacation, on_delete=models.CASCADE)
+    # Database default, so the raw-SQL and COPY inserts get it too
+    created_at = models.DateTimeField(db_default=Now())
 
     class Meta:
         managed = False
         db_table = "vacations_like"
         unique_together = ('user', 'vacation')
+
+class LikeRollup(models.Model):
+    """Number of current likes per vacation created on each UTC day.
+
+    Kept in step by the like/unlike statements in services.py and rebuilt
+    by the rollup_likes command.
+    """
+    pk = models.CompositePrimaryKey('bucket', 'vacation')
+    bucket = models.DateField()
+    vacation = models.ForeignKey(Vacation, on_delete=models.CASCADE)
+    likes = models.IntegerField(default=0)
+
+    class Meta:
+        managed = False
+        db_table = "vacations_likerollup"
+
+
+class StatsSnapshot(models.Model):
+    """Dashboard KPIs as they stood on one UTC day.
+
+    Written by the stats_api snapshot_stats command (one row per day, rewritten by
+    reruns); likes_distribution holds the [{"destination", "likes"}] list.
+    """
+    day = models.DateField(primary_key=True)
+    past_vacations = models.IntegerField()
+    ongoing_vacations = models.IntegerField()
+    future_vacations = models.IntegerField()
+    total_users = models.IntegerField()
+    total_likes = models.IntegerField()
+    likes_distribution = models.JSONField(default=list)
+    taken_at = models.DateTimeField()
+
+    class Meta:
+        managed = False
+        db_table = "vacations_statssnapshot"
+
+
+class DataVersion(models.Model):
+    """Change counters of the tables derived data is computed from (one row).
+
+    Bumped by statement triggers in the writing transaction (migration
+    0008), read by vacations.versions.get_table_versions.
+    """
+    id = models.SmallIntegerField(primary_key=True)
+    vacation = models.BigIntegerField()
+    like = models.BigIntegerField()
+    user = models.BigIntegerField()
+    country = models.BigIntegerField()
+    snapshot = models.BigIntegerField()
+
+    class Meta:
+        managed = False
+        db_table = "vacations_dataversion"
@@ -0,0 +1,173 @@
+"""
+Per-view SQL statement budgets.
+
+Views declare the most statements one request may run with
+``@query_budget(n)``. ``QueryBudgetMiddleware`` counts the statements of every
+request (session and current-user lookups included, savepoints not) and,
+depending on ``settings.QUERY_BUDGET_ACTION``, logs the offending SQL
+(``"log"``) or raises ``QueryBudgetExceeded`` (``"raise"``, used by the tests)
+when the view's budget is exceeded. ``"off"`` skips counting altogether.
+
+Statements are recorded by an execute wrapper that ``install_counter``
+adds to every database connection (``connection_created``). It appends to
+the list of the request being counted, held in a context variable: that
+follows the request into ``sync_to_async`` threads, so async views are
+counted without leaving the event loop.
+"""
+import logging
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TypeVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+
+logger = logging.getLogger(__name__)
+
+V = TypeVar("V")
+
+# Savepoints depend on how deeply the request is nested in transactions
+# (tests run inside one), so they are not counted.
+_TRANSACTION_CONTROL = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+# "module.qualname" of every budgeted view -> its budget
+QUERY_BUDGETS: Dict[str, int] = {}
+
+# SQL run so far by the request being counted (None: not counting)
+_statements: ContextVar[Optional[List[str]]] = ContextVar("query_budget_statements", default=None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A request ran more SQL statements than its view's budget."""
+
+
+def query_budget(max_queries: int) -> Callable[[V], V]:
+    """
+    Declare the maximum number of SQL statements a request to a view may run.
+
+    Works on view functions (below any other decorator) and view classes.
+
+    :param max_queries: Statement budget per request
+    :return: Decorator returning the view unchanged
+    """
+    def decorate(view: V) -> V:
+        view.query_budget = max_queries
+        QUERY_BUDGETS[f"{view.__module__}.{view.__qualname__}"] = max_queries
+        return view
+    return decorate
+
+
+def budget_for(view_func: Callable) -> Optional[int]:
+    """
+    Return the budget of a resolved view callable, or None if it has none.
+
+    :param view_func: Function from ``request.resolver_match.func``
+    :return: Statement budget or None
+    """
+    view = getattr(view_func, "view_class", view_func)
+    return getattr(view, "query_budget", None)
+
+
+def check_budget(view_name: str, statements: List[str], budget: int) -> None:
+    """
+    Log or raise (per QUERY_BUDGET_ACTION) if ``statements`` exceed ``budget``.
+
+    :param view_name: Dotted view path, for the message
+    :param statements: SQL run by the request
+    :param budget: The view's budget
+    :raises QueryBudgetExceeded: If over budget and the action is "raise"
+    """
+    if len(statements) <= budget:
+        return
+    message = (
+        f"{view_name} ran {len(statements)} SQL statements (budget {budget}):\n"
+        + "\n".join(f"  {sql}" for sql in statements)
+    )
+    if settings.QUERY_BUDGET_ACTION == "raise":
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+def _record(execute, sql, params, many, context):
+    statements = _statements.get()
+    if statements is not None and not sql.startswith(_TRANSACTION_CONTROL):
+        statements.append(sql)
+    return execute(sql, params, many, context)
+
+
+def install_counter(sender, connection, **kwargs) -> None:
+    """
+    ``connection_created`` receiver adding the statement recorder to a connection.
+
+    :param sender: Database wrapper class
+    :param connection: The connection just opened (reopened ones keep theirs)
+    """
+    if _record not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record)
+
+
+class QueryBudgetMiddleware:
+    """
+    Count the SQL statements of each request and check them against the
+    view's budget. Place it before SessionMiddleware so the session save is
+    counted too. Streaming responses are checked once the body is consumed,
+    except async streams, whose body comes from work shared by all clients.
+
+    Under ASGI the request stays async; the statements of the sync code it
+    runs, ``stats_api.services.gather_queries`` workers included, are
+    recorded through the context variable.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if self.async_mode:
+            return self.__acall__(request)
+        if getattr(settings, "QUERY_BUDGET_ACTION", "off") == "off":
+            return self.get_response(request)
+        statements: List[str] = []
+        token = _statements.set(statements)
+        try:
+            response = self.get_response(request)
+        finally:
+            _statements.reset(token)
+        return self._check(request, response, statements)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        if getattr(settings, "QUERY_BUDGET_ACTION", "off") == "off":
+            return await self.get_response(request)
+        statements: List[str] = []
+        token = _statements.set(statements)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _statements.reset(token)
+        return self._check(request, response, statements)
+
+    def _check(self, request: HttpRequest, response: HttpResponse, statements: List[str]) -> HttpResponse:
+        match = getattr(request, "resolver_match", None)
+        budget = budget_for(match.func) if match else None
+        if budget is None:
+            return response
+        if response.streaming and not response.is_async:
+            response.streaming_content = self._stream(
+                response.streaming_content, match._func_path, statements, budget
+            )
+        else:
+            check_budget(match._func_path, statements, budget)
+        return response
+
+    @staticmethod
+    def _stream(content: Iterable[bytes], view_name: str, statements: List[str], budget: int) -> Iterator[bytes]:
+        token = _statements.set(statements)
+        try:
+            yield from content
+        finally:
+            _statements.reset(token)
+        check_budget(view_name, statements, budget)
@@ -1,7 +1,13 @@
-from typing import Optional
+import base64
+from typing import Dict, NamedTuple, Optional, Set, Tuple
 from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.models import BooleanField, Count, Exists, F, Max, Min, OuterRef, Q, QuerySet, Subquery, Value
+from django.db.models.functions import Coalesce
 from datetime import date
+from decimal import Decimal
 from typing import List
+from django.contrib.postgres.search import SearchQuery, SearchVector
 from vacations.models import User, Vacation,Country,Like, Role
 
 
@@ -41,28 +47,277 @@ def login_user(email: str, password: str) -> Optional[User]:
     return User.objects.filter(email=email, password=password).first()
 
 
+class LikeResult(NamedTuple):
+    """Outcome of a single-statement like/unlike."""
+
+    found: bool
+    changed: bool
+    like_count: int
+    like_id: Optional[int] = None
+
+
+# Keep vacations_likerollup (likes per vacation and creation day) in step
+# with the rows a statement inserted ("ins") or deleted ("del").
+_ROLLUP_ADD_SQL = """INSERT INTO vacations_likerollup (bucket, vacation_id, likes)
+    SELECT (created_at AT TIME ZONE 'UTC')::date, vacation_id, COUNT(*) FROM ins GROUP BY 1, 2
+    ON CONFLICT (bucket, vacation_id) DO UPDATE SET likes = vacations_likerollup.likes + EXCLUDED.likes"""
+
+_ROLLUP_REMOVE_SQL = """UPDATE vacations_likerollup AS r SET likes = r.likes - d.n
+    FROM (SELECT (created_at AT TIME ZONE 'UTC')::date AS bucket, vacation_id, COUNT(*) AS n
+          FROM del GROUP BY 1, 2) AS d
+    WHERE r.bucket = d.bucket AND r.vacation_id = d.vacation_id"""
+
+_SET_LIKE_SQL = """
+WITH vac AS (
+    SELECT id, like_count FROM vacations_vacation WHERE id = %(vacation_id)s
+), ins AS (
+    INSERT INTO vacations_like (user_id, vacation_id)
+    SELECT %(user_id)s, id FROM vac
+    ON CONFLICT (user_id, vacation_id) DO NOTHING
+    RETURNING id, vacation_id, created_at
+), upd AS (
+    UPDATE vacations_vacation AS v SET like_count = v.like_count + 1
+    FROM ins WHERE v.id = ins.vacation_id
+    RETURNING v.like_count
+), roll AS (
+    {rollup_add}
+)
+SELECT EXISTS (SELECT 1 FROM vac),
+       COALESCE((SELECT like_count FROM upd), (SELECT like_count FROM vac), 0),
+       (SELECT id FROM ins)
+""".format(rollup_add=_ROLLUP_ADD_SQL)
+
+_CLEAR_LIKE_SQL = """
+WITH vac AS (
+    SELECT id, like_count FROM vacations_vacation WHERE id = %(vacation_id)s
+), del AS (
+    DELETE FROM vacations_like
+    WHERE user_id = %(user_id)s AND vacation_id = %(vacation_id)s
+    RETURNING id, vacation_id, created_at
+), upd AS (
+    UPDATE vacations_vacation AS v SET like_count = GREATEST(v.like_count - 1, 0)
+    FROM del WHERE v.id = del.vacation_id
+    RETURNING v.like_count
+), roll AS (
+    {rollup_remove}
+)
+SELECT EXISTS (SELECT 1 FROM vac),
+       COALESCE((SELECT like_count FROM upd), (SELECT like_count FROM vac), 0),
+       (SELECT id FROM del)
+""".format(rollup_remove=_ROLLUP_REMOVE_SQL)
+
+
+def _run_like_statement(sql: str, user_id: int, vacation_id: int) -> LikeResult:
+    with connection.cursor() as cursor:
+        cursor.execute(sql, {"user_id": user_id, "vacation_id": vacation_id})
+        found, like_count, like_id = cursor.fetchone()
+    return LikeResult(found=found, changed=like_id is not None, like_count=like_count, like_id=like_id)
+
+
+def set_like(user_id: int, vacation_id: int) -> LikeResult:
+    """
+    Idempotently like a vacation in a single SQL statement.
+
+    Relies on the (user_id, vacation_id) unique constraint with
+    ON CONFLICT DO NOTHING, and bumps the like counter only when a row was
+    actually inserted, so concurrent calls cannot double-count.
+
+    :param user_id: ID of the user
+    :param vacation_id: ID of the vacation
+    :return: LikeResult (found=False if the vacation does not exist)
+    """
+    return _run_like_statement(_SET_LIKE_SQL, user_id, vacation_id)
+
+
+def clear_like(user_id: int, vacation_id: int) -> LikeResult:
+    """
+    Idempotently unlike a vacation in a single SQL statement.
+
+    :param user_id: ID of the user
+    :param vacation_id: ID of the vacation
+    :return: LikeResult (found=False if the vacation does not exist)
+    """
+    return _run_like_statement(_CLEAR_LIKE_SQL, user_id, vacation_id)
+
+
 def add_like(user_id: int, vacation_id: int) -> Like:
     """
-    Add a like to a vacation by a user.
+    Add a like to a vacation by a user and bump the vacation's like counter.
 
     :param user_id: ID of the user
     :param vacation_id: ID of the vacation
-    :raises ValidationError: If like already exists
+    :raises ValidationError: If the vacation does not exist or like already exists
     :return: Created Like instance
     """
-    if Like.objects.filter(user_id=user_id, vacation_id=vacation_id).exists():
+    result = set_like(user_id, vacation_id)
+    if not result.found:
+        raise ValidationError("Vacation not found.")
+    if not result.changed:
         raise ValidationError("Like already exists.")
-    return Like.objects.create(user_id=user_id, vacation_id=vacation_id)
+    return Like(id=result.like_id, user_id=user_id, vacation_id=vacation_id)
 
 
-def remove_like(user_id: int, vacation_id: int) -> None:
+def remove_like(user_id: int, vacation_id: int) -> int:
     """
-    Remove a like from a vacation by a user.
+    Remove a like from a vacation by a user and decrement the like counter.
 
     :param user_id: ID of the user
     :param vacation_id: ID of the vacation
+    :return: Number of likes removed (0 or 1)
+    """
+    return int(clear_like(user_id, vacation_id).changed)
+
+
+_BULK_SET_LIKES_SQL = """
+WITH ins AS (
+    INSERT INTO vacations_like (user_id, vacation_id)
+    SELECT %(user_id)s, unnest(%(vacation_ids)s::bigint[])
+    ON CONFLICT (user_id, vacation_id) DO NOTHING
+    RETURNING vacation_id, created_at
+), upd AS (
+    UPDATE vacations_vacation AS v SET like_count = v.like_count + 1
+    FROM ins WHERE v.id = ins.vacation_id
+), roll AS (
+    {rollup_add}
+)
+SELECT vacation_id FROM ins
+""".format(rollup_add=_ROLLUP_ADD_SQL)
+
+_BULK_CLEAR_LIKES_SQL = """
+WITH del AS (
+    DELETE FROM vacations_like
+    WHERE user_id = %(user_id)s AND vacation_id = ANY(%(vacation_ids)s::bigint[])
+    RETURNING vacation_id, created_at
+), upd AS (
+    UPDATE vacations_vacation AS v SET like_count = GREATEST(v.like_count - 1, 0)
+    FROM del WHERE v.id = del.vacation_id
+), roll AS (
+    {rollup_remove}
+)
+SELECT vacation_id FROM del
+""".format(rollup_remove=_ROLLUP_REMOVE_SQL)
+
+
+def _run_bulk_like_statement(sql: str, user_id: int, vacation_ids: List[int]) -> Set[int]:
+    if not vacation_ids:
+        return set()
+    with connection.cursor() as cursor:
+        cursor.execute(sql, {"user_id": user_id, "vacation_ids": vacation_ids})
+        return {row[0] for row in cursor.fetchall()}
+
+
+def apply_like_batch(user_id: int, like_ids: List[int], unlike_ids: List[int]) -> List[Dict[str, object]]:
     """
-    Like.objects.filter(user_id=user_id, vacation_id=vacation_id).delete()
+    Apply many like/unlike actions for one user in a single transaction.
+
+    Vacation existence is checked with one IN query, then all likes are
+    inserted and all unlikes deleted with one statement each, keeping the
+    like counters in sync. Per-item semantics match add_like/remove_like,
+    but instead of raising, each item reports its own status.
+
+    Statuses: "added" / "already_liked" for likes, "removed" / "not_liked"
+    for unlikes, "not_found" for unknown vacations and "conflict" for IDs
+    present in both lists (those are skipped).
+
+    :param user_id: ID of the user
+    :param like_ids: Vacation IDs to like
+    :param unlike_ids: Vacation IDs to unlike
+    :return: One {"vacation_id", "action", "status"} dict per distinct requested item
+    """
+    like_ids = list(dict.fromkeys(like_ids))
+    unlike_ids = list(dict.fromkeys(unlike_ids))
+    conflicts: Set[int] = set(like_ids) & set(unlike_ids)
+    existing: Set[int] = set(
+        Vacation.objects.filter(id__in=set(like_ids) | set(unlike_ids)).values_list('id', flat=True)
+    )
+    to_like = [v for v in like_ids if v in existing and v not in conflicts]
+    to_unlike = [v for v in unlike_ids if v in existing and v not in conflicts]
+
+    with transaction.atomic():
+        added = _run_bulk_like_statement(_BULK_SET_LIKES_SQL, user_id, to_like)
+        removed = _run_bulk_like_statement(_BULK_CLEAR_LIKES_SQL, user_id, to_unlike)
+
+    def status_for(vacation_id: int, done: Set[int], done_status: str, noop_status: str) -> str:
+        if vacation_id in conflicts:
+            return "conflict"
+        if vacation_id not in existing:
+            return "not_found"
+        return done_status if vacation_id in done else noop_status
+
+    results: List[Dict[str, object]] = [
+        {"vacation_id": v, "action": "like", "status": status_for(v, added, "added", "already_liked")}
+        for v in like_ids
+    ]
+    results += [
+        {"vacation_id": v, "action": "unlike", "status": status_for(v, removed, "removed", "not_liked")}
+        for v in unlike_ids
+    ]
+    return results
+
+
+def recount_likes(batch_size: int = 1000) -> int:
+    """
+    Repair drift between Vacation.like_count and the likes table.
+
+    Vacations are processed in primary-key ranges of ``batch_size`` and only
+    rows whose counter differs from the real count are rewritten.
+
+    :param batch_size: Number of vacation IDs covered by each UPDATE
+    :return: Number of vacations whose counter was corrected
+    """
+    bounds = Vacation.objects.aggregate(low=Min('id'), high=Max('id'))
+    if bounds['low'] is None:
+        return 0
+
+    likes = (
+        Like.objects.filter(vacation=OuterRef('pk'))
+        .values('vacation').annotate(c=Count('id')).values('c')
+    )
+    actual = Coalesce(Subquery(likes), 0)
+    fixed = 0
+    for low in range(bounds['low'], bounds['high'] + 1, batch_size):
+        fixed += (
+            Vacation.objects
+            .filter(id__gte=low, id__lt=low + batch_size)
+            .annotate(actual=actual)
+            .exclude(like_count=F('actual'))
+            .update(like_count=actual)
+        )
+    return fixed
+
+
+def rollup_likes(batch_size: int = 1000) -> int:
+    """
+    Rebuild vacations_likerollup (likes per vacation and UTC creation day).
+
+    Vacations are processed in primary-key ranges of ``batch_size``; each
+    range is re-aggregated from the likes table in its own transaction. An
+    unlike racing with its batch can leave that batch one off, so run it
+    when traffic is low; it is safe to run again.
+
+    :param batch_size: Number of vacation IDs covered by each batch
+    :return: Number of rollup rows written
+    """
+    bounds = Vacation.objects.aggregate(low=Min('id'), high=Max('id'))
+    if bounds['low'] is None:
+        return 0
+
+    written = 0
+    for low in range(bounds['low'], bounds['high'] + 1, batch_size):
+        ids = {"low": low, "high": low + batch_size}
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                "DELETE FROM vacations_likerollup WHERE vacation_id >= %(low)s AND vacation_id < %(high)s", ids,
+            )
+            cursor.execute(
+                "INSERT INTO vacations_likerollup (bucket, vacation_id, likes) "
+                "SELECT (created_at AT TIME ZONE 'UTC')::date, vacation_id, COUNT(*) FROM vacations_like "
+                "WHERE vacation_id >= %(low)s AND vacation_id < %(high)s GROUP BY 1, 2 "
+                "ON CONFLICT (bucket, vacation_id) DO UPDATE SET likes = EXCLUDED.likes",
+                ids,
+            )
+            written += cursor.rowcount
+    return written
 
     
 def add_vacation(
@@ -143,6 +398,148 @@ def get_all_vacations() -> List[Vacation]:
     """
     return list(Vacation.objects.all().order_by('start_date'))
 
+def get_vacations_with_likes(user_id: Optional[int]) -> QuerySet:
+    """
+    Return all vacations ordered by start date, annotated with like data.
+
+    'like_count' is the stored counter; 'liked_by_user' is computed in the
+    same SQL statement instead of one query per vacation.
+
+    :param user_id: ID of the current user, or None for anonymous visitors
+    :return: Annotated Vacation queryset
+    """
+    if user_id:
+        liked_by_user = Exists(Like.objects.filter(vacation_id=OuterRef('pk'), user_id=user_id))
+    else:
+        liked_by_user = Value(False, output_field=BooleanField())
+    return (
+        Vacation.objects
+        .annotate(liked_by_user=liked_by_user)
+        .order_by('start_date', 'id')
+    )
+
+def filter_vacations(
+    vacations: QuerySet,
+    country: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    min_price: Optional[Decimal] = None,
+    max_price: Optional[Decimal] = None,
+    q: str = '',
+) -> QuerySet:
+    """
+    Narrow a vacation queryset in SQL; every filter is optional.
+
+    Date and price bounds use the btree indexes, 'q' is an English full-text
+    match on the description served by the GIN index of migration 0005.
+
+    :param vacations: Vacation queryset to filter
+    :param country: Country ID
+    :param date_from: Earliest start date
+    :param date_to: Latest end date
+    :param min_price: Minimum price
+    :param max_price: Maximum price
+    :param q: Free-text search on the description
+    :return: Filtered queryset
+    """
+    if country is not None:
+        vacations = vacations.filter(country_id=country)
+    if date_from is not None:
+        vacations = vacations.filter(start_date__gte=date_from)
+    if date_to is not None:
+        vacations = vacations.filter(end_date__lte=date_to)
+    if min_price is not None:
+        vacations = vacations.filter(price__gte=min_price)
+    if max_price is not None:
+        vacations = vacations.filter(price__lte=max_price)
+    if q:
+        vacations = (
+            vacations
+            .alias(search=SearchVector('description', config='english'))
+            .filter(search=SearchQuery(q, config='english'))
+        )
+    return vacations
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class VacationPage(NamedTuple):
+    """One keyset page of vacations and the cursor of the page after it."""
+    items: List[Vacation]
+    next_cursor: Optional[str]
+
+
+def encode_vacation_cursor(vacation: Vacation) -> str:
+    """
+    Build the opaque cursor pointing just after a vacation.
+
+    :param vacation: Last vacation of the current page
+    :return: URL-safe cursor string
+    """
+    raw = f"{vacation.start_date.isoformat()}:{vacation.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_vacation_cursor(cursor: str) -> Tuple[date, int]:
+    """
+    Decode a cursor produced by encode_vacation_cursor.
+
+    :param cursor: Cursor string from the client
+    :raises ValidationError: If the cursor is malformed
+    :return: (start_date, id) of the last vacation already returned
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        start_date, vacation_id = raw.split(':')
+        return date.fromisoformat(start_date), int(vacation_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValidationError("Invalid cursor.")
+
+def parse_page_size(value: Optional[str]) -> int:
+    """
+    Validate the requested page size.
+
+    :param value: Raw 'limit' query parameter, or None for the default
+    :raises ValidationError: If it is not an integer between 1 and MAX_PAGE_SIZE
+    :return: Page size
+    """
+    if value in (None, ''):
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValidationError("Invalid limit.")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValidationError(f"Limit must be between 1 and {MAX_PAGE_SIZE}.")
+    return limit
+
+def paginate_vacations(vacations: QuerySet, cursor: Optional[str], limit: int) -> VacationPage:
+    """
+    Return one page of vacations after a cursor, ordered by (start_date, id).
+
+    Keyset pagination: the page starts with an index range condition on
+    (start_date, id) instead of an OFFSET, so every page costs the same no
+    matter how deep the client has scrolled. One extra row is fetched to
+    know whether a next page exists.
+
+    :param vacations: Vacation queryset (filters/annotations are kept)
+    :param cursor: Cursor returned with the previous page, or None for the first page
+    :param limit: Page size
+    :raises ValidationError: If the cursor is malformed
+    :return: VacationPage with the rows and the next cursor (None on the last page)
+    """
+    vacations = vacations.order_by('start_date', 'id')
+    if cursor:
+        start_date, vacation_id = decode_vacation_cursor(cursor)
+        vacations = vacations.filter(
+            Q(start_date__gt=start_date) | Q(start_date=start_date, id__gt=vacation_id),
+            start_date__gte=start_date,
+        )
+    rows = list(vacations[:limit + 1])
+    if len(rows) <= limit:
+        return VacationPage(rows, None)
+    return VacationPage(rows[:limit], encode_vacation_cursor(rows[limit - 1]))
+
 def add_country(name: str) -> Country:
     """
     Add a new country if it does not already exist.
@@ -0,0 +1,717 @@
+"""Tests for the vacations API and pages."""
+from __future__ import annotations
+
+import threading
+from datetime import date, timedelta
+from io import StringIO
+from typing import List
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from vacations.models import Country, Like, LikeRollup, Role, User, Vacation
+from vacations.services import add_like, apply_like_batch, clear_like, delete_vacation, remove_like, set_like
+
+
+class VacationsTestCase(TestCase):
+    """Seed roles, two users and a handful of liked vacations."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        admin_role = Role.objects.create(name="admin")
+        user_role = Role.objects.create(name="user")
+        cls.admin = User.objects.create(
+            first_name="Admin", last_name="User", email="admin@admin.com",
+            password="adminadmin", role=admin_role, is_staff=True,
+        )
+        cls.user = User.objects.create(
+            first_name="Dan", last_name="Doe", email="dan@example.com",
+            password="12345678", role=user_role,
+        )
+        cls.country = Country.objects.create(name="Italy")
+        cls.vacations = cls.create_vacations(3)
+        add_like(cls.user.id, cls.vacations[0].id)
+        add_like(cls.admin.id, cls.vacations[0].id)
+        add_like(cls.admin.id, cls.vacations[2].id)
+
+    @classmethod
+    def create_vacations(cls, count: int) -> List[Vacation]:
+        start = date.today() + timedelta(days=30)
+        return Vacation.objects.bulk_create([
+            Vacation(
+                country=cls.country, description=f"Trip {i}",
+                start_date=start + timedelta(days=i), end_date=start + timedelta(days=i + 5),
+                price="1500.50", image_filename=f"trip_{i}.jpg",
+            )
+            for i in range(count)
+        ])
+
+    def login(self, user: User) -> None:
+        session = self.client.session
+        session["user_id"] = user.id
+        session.save()
+
+
+class VacationListApiTests(VacationsTestCase):
+    def test_like_fields(self) -> None:
+        self.login(self.user)
+        data = self.client.get(reverse("api-vacation-list")).json()["results"]
+
+        self.assertEqual([v["id"] for v in data], [v.id for v in self.vacations])
+        self.assertEqual([v["like_count"] for v in data], [2, 0, 1])
+        self.assertEqual([v["liked_by_user"] for v in data], [True, False, False])
+        self.assertEqual(
+            list(data[0]),
+            ["id", "country", "description", "start_date", "end_date", "price",
+             "image_filename", "like_count", "liked_by_user"],
+        )
+        self.assertEqual(data[0]["price"], "1500.50")
+
+    def test_anonymous_never_liked(self) -> None:
+        data = self.client.get(reverse("api-vacation-list")).json()["results"]
+        self.assertFalse(any(v["liked_by_user"] for v in data))
+
+    def test_query_count_independent_of_rows(self) -> None:
+        self.login(self.user)
+        # session + change counters + one annotated list query
+        with self.assertNumQueries(3):
+            self.client.get(reverse("api-vacation-list"))
+
+        self.create_vacations(50)
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("api-vacation-list"), {"all": "true"})
+        self.assertEqual(len(response.json()), 53)
+
+
+class VacationPaginationTests(VacationsTestCase):
+    def fetch_all(self, name: str, limit: int) -> List[int]:
+        ids: List[int] = []
+        params = {"limit": limit}
+        while True:
+            data = self.client.get(reverse(name), params).json()
+            ids += [v["id"] for v in data["results"]]
+            if not data["next_cursor"]:
+                return ids
+            params["cursor"] = data["next_cursor"]
+
+    def test_pages_cover_catalogue_once_in_order(self) -> None:
+        # Same start dates as the fixture rows, so ties are broken by id.
+        self.create_vacations(8)
+        expected = list(
+            Vacation.objects.order_by("start_date", "id").values_list("id", flat=True)
+        )
+        self.assertEqual(self.fetch_all("api-vacation-list", limit=3), expected)
+
+    def test_last_page_has_no_cursor(self) -> None:
+        data = self.client.get(reverse("api-vacation-list"), {"limit": 3}).json()
+        self.assertEqual(len(data["results"]), 3)
+        self.assertIsNone(data["next_cursor"])
+
+    def test_deep_page_cost_is_constant(self) -> None:
+        self.login(self.user)
+        self.create_vacations(40)
+        first = self.client.get(reverse("api-vacation-list"), {"limit": 5}).json()
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse("api-vacation-list"), {"limit": 5, "cursor": first["next_cursor"]})
+        sql = ctx.captured_queries[-1]["sql"]
+        self.assertIn("LIMIT 6", sql)
+        self.assertNotIn("OFFSET", sql)
+
+    def test_invalid_parameters(self) -> None:
+        for params in ({"cursor": "not-a-cursor"}, {"limit": 0}, {"limit": "x"}, {"limit": 101}):
+            response = self.client.get(reverse("api-vacation-list"), params)
+            self.assertEqual(response.status_code, 400, params)
+
+    def test_html_page_follows_cursor(self) -> None:
+        self.create_vacations(2)
+        first = self.client.get(reverse("vacation-list"), {"limit": 4})
+        self.assertEqual(len(first.context["vacations"]), 4)
+        self.assertContains(first, "Next page")
+
+        rest = self.client.get(
+            reverse("vacation-list"), {"limit": 4, "cursor": first.context["next_cursor"]}
+        )
+        self.assertEqual(len(rest.context["vacations"]), 1)
+        self.assertIsNone(rest.context["next_cursor"])
+        self.assertEqual(
+            self.client.get(reverse("vacation-list"), {"cursor": "bad"}).status_code, 404
+        )
+
+
+class VacationListPageTests(VacationsTestCase):
+    def test_context_rows(self) -> None:
+        self.login(self.user)
+        rows = self.client.get(reverse("vacation-list")).context["vacations"]
+
+        self.assertEqual([r["like_count"] for r in rows], [2, 0, 1])
+        self.assertEqual([r["liked_by_user"] for r in rows], [True, False, False])
+        self.assertEqual(rows[0]["country"], "Italy")
+
+    def test_query_count_independent_of_rows(self) -> None:
+        self.login(self.user)
+        # session + page of vacations + the user's likes among them
+        with self.assertNumQueries(3):
+            self.client.get(reverse("vacation-list"))
+
+        self.create_vacations(50)
+        with self.assertNumQueries(3):
+            self.client.get(reverse("vacation-list"))
+
+    def test_like_lookup_covers_only_the_page(self) -> None:
+        self.login(self.admin)
+        with CaptureQueriesContext(connection) as ctx:
+            rows = self.client.get(reverse("vacation-list"), {"limit": 2}).context["vacations"]
+        self.assertEqual([r["liked_by_user"] for r in rows], [True, False])
+        like_sql = [q["sql"] for q in ctx.captured_queries if 'FROM "vacations_like"' in q["sql"]]
+        self.assertEqual(len(like_sql), 1)
+        self.assertIn(f'"vacation_id" IN ({self.vacations[0].id}, {self.vacations[1].id})', like_sql[0])
+
+    def test_anonymous_skips_like_lookup(self) -> None:
+        with self.assertNumQueries(1):
+            self.client.get(reverse("vacation-list"))
+
+
+class LikeCounterTests(VacationsTestCase):
+    def like_count(self, vacation: Vacation) -> int:
+        return Vacation.objects.get(id=vacation.id).like_count
+
+    def test_seeded_counters(self) -> None:
+        self.assertEqual([self.like_count(v) for v in self.vacations], [2, 0, 1])
+
+    def test_like_and_unlike_views_keep_counter_in_sync(self) -> None:
+        self.login(self.user)
+        vacation = self.vacations[1]
+
+        response = self.client.post(reverse("vacation-like", args=[vacation.id]))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.like_count(vacation), 1)
+
+        response = self.client.post(reverse("vacation-like", args=[vacation.id]))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.like_count(vacation), 1)
+
+        response = self.client.post(reverse("vacation-unlike", args=[vacation.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.like_count(vacation), 0)
+
+        response = self.client.post(reverse("vacation-unlike", args=[vacation.id]))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.like_count(vacation), 0)
+
+    def test_remove_like_service(self) -> None:
+        self.assertEqual(remove_like(self.user.id, self.vacations[0].id), 1)
+        self.assertEqual(remove_like(self.user.id, self.vacations[0].id), 0)
+        self.assertEqual(self.like_count(self.vacations[0]), 1)
+
+    def test_recount_likes_command_repairs_drift(self) -> None:
+        Vacation.objects.filter(id=self.vacations[0].id).update(like_count=9)
+        Like.objects.create(user=self.user, vacation=self.vacations[1])
+
+        out = StringIO()
+        call_command("recount_likes", batch_size=2, stdout=out)
+
+        self.assertIn("Repaired 2", out.getvalue())
+        self.assertEqual([self.like_count(v) for v in self.vacations], [2, 1, 1])
+
+
+class LikeRollupTests(VacationsTestCase):
+    def rollup(self) -> dict:
+        return {(r.bucket, r.vacation_id): r.likes for r in LikeRollup.objects.exclude(likes=0)}
+
+    def rebuilt(self) -> dict:
+        call_command("rollup_likes", batch_size=2, stdout=StringIO())
+        return self.rollup()
+
+    def test_like_paths_keep_rollup_in_step(self) -> None:
+        today = timezone.now().date()
+        v0, v1, v2 = self.vacations
+        self.assertEqual(self.rollup(), {(today, v0.id): 2, (today, v2.id): 1})
+
+        # Likes removed later are taken off the day they were made
+        Like.objects.filter(user=self.admin, vacation=v2).update(created_at=timezone.now() - timedelta(days=3))
+        call_command("rollup_likes", stdout=StringIO())
+        remove_like(self.admin.id, v2.id)
+        set_like(self.user.id, v1.id)
+        apply_like_batch(self.admin.id, [v1.id, v2.id], [v0.id])
+
+        expected = {(today, v0.id): 1, (today, v1.id): 2, (today, v2.id): 1}
+        self.assertEqual(self.rollup(), expected)
+        self.assertEqual(self.rebuilt(), expected)
+
+    def test_rollup_likes_command_repairs_drift(self) -> None:
+        expected = self.rollup()
+        LikeRollup.objects.filter(vacation=self.vacations[0]).update(likes=7)
+        out = StringIO()
+        call_command("rollup_likes", batch_size=2, stdout=out)
+        self.assertIn("Wrote 2", out.getvalue())
+        self.assertEqual(self.rollup(), expected)
+
+    def test_deleting_a_vacation_drops_its_rollups(self) -> None:
+        delete_vacation(self.vacations[0].id)
+        self.assertEqual(list(self.rollup()), [(timezone.now().date(), self.vacations[2].id)])
+
+
+class LikeToggleTests(VacationsTestCase):
+    def test_put_and_delete_are_idempotent(self) -> None:
+        self.login(self.user)
+        url = reverse("vacation-like", args=[self.vacations[1].id])
+
+        for _ in range(2):
+            response = self.client.put(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json(), {
+                "vacation_id": self.vacations[1].id, "liked_by_user": True, "like_count": 1,
+            })
+        for _ in range(2):
+            response = self.client.delete(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["like_count"], 0)
+
+    def test_missing_vacation(self) -> None:
+        self.login(self.user)
+        self.assertEqual(self.client.put(reverse("vacation-like", args=[999999])).status_code, 404)
+        self.assertEqual(self.client.delete(reverse("vacation-like", args=[999999])).status_code, 404)
+        with self.assertRaises(ValidationError):
+            add_like(self.user.id, 999999)
+
+    def test_requires_session(self) -> None:
+        url = reverse("vacation-like", args=[self.vacations[1].id])
+        self.assertEqual(self.client.put(url).status_code, 403)
+
+    def test_one_round_trip_per_action(self) -> None:
+        with self.assertNumQueries(1):
+            self.assertTrue(set_like(self.user.id, self.vacations[1].id).changed)
+        with self.assertNumQueries(1):
+            self.assertFalse(set_like(self.user.id, self.vacations[1].id).changed)
+        with self.assertNumQueries(1):
+            self.assertTrue(clear_like(self.user.id, self.vacations[1].id).changed)
+
+
+class LikeBatchTests(VacationsTestCase):
+    def post_batch(self, payload: dict):
+        return self.client.post(reverse("like-batch"), payload, content_type="application/json")
+
+    def test_per_item_results_and_counters(self) -> None:
+        self.login(self.user)
+        v0, v1, v2 = self.vacations
+        response = self.post_batch({
+            "like": [v0.id, v1.id, v1.id, 999999, v2.id],
+            "unlike": [v0.id, v2.id],
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"], [
+            {"vacation_id": v0.id, "action": "like", "status": "conflict"},
+            {"vacation_id": v1.id, "action": "like", "status": "added"},
+            {"vacation_id": 999999, "action": "like", "status": "not_found"},
+            {"vacation_id": v2.id, "action": "like", "status": "conflict"},
+            {"vacation_id": v0.id, "action": "unlike", "status": "conflict"},
+            {"vacation_id": v2.id, "action": "unlike", "status": "conflict"},
+        ])
+        self.assertEqual(Vacation.objects.get(id=v1.id).like_count, 1)
+
+        response = self.post_batch({"like": [v0.id, v1.id], "unlike": [v2.id]})
+        self.assertEqual([r["status"] for r in response.json()["results"]],
+                         ["already_liked", "already_liked", "not_liked"])
+
+        response = self.post_batch({"unlike": [v0.id, v1.id]})
+        self.assertEqual([r["status"] for r in response.json()["results"]], ["removed", "removed"])
+        self.assertEqual([Vacation.objects.get(id=v.id).like_count for v in self.vacations], [1, 0, 1])
+
+    def test_constant_query_count(self) -> None:
+        self.login(self.admin)
+        more = self.create_vacations(20)
+        # session + existence check + savepoint/insert/delete/release
+        with self.assertNumQueries(6):
+            self.post_batch({"like": [v.id for v in more], "unlike": [self.vacations[0].id]})
+
+    def test_validation(self) -> None:
+        self.assertEqual(self.post_batch({"like": [1]}).status_code, 403)
+        self.login(self.user)
+        self.assertEqual(self.post_batch({}).status_code, 400)
+        self.assertEqual(self.post_batch({"like": ["x"]}).status_code, 400)
+
+
+class ConcurrentLikeTests(TransactionTestCase):
+    """Hammer one (user, vacation) pair from many threads."""
+
+    threads = 12
+    rounds = 10
+
+    def setUp(self) -> None:
+        role = Role.objects.create(name="user")
+        self.user = User.objects.create(
+            first_name="Dan", last_name="Doe", email="dan@example.com", password="12345678", role=role,
+        )
+        country = Country.objects.create(name="Italy")
+        self.vacation = Vacation.objects.create(
+            country=country, description="Trip", start_date=date.today(),
+            end_date=date.today(), price=100, image_filename="x.jpg",
+        )
+
+    def tearDown(self) -> None:
+        # flush() skips unmanaged models, so clean up explicitly
+        for model in (Like, Vacation, Country, User, Role):
+            model.objects.all().delete()
+
+    def hammer(self, action) -> None:
+        barrier = threading.Barrier(self.threads)
+        errors: List[BaseException] = []
+
+        def worker(index: int) -> None:
+            try:
+                barrier.wait()
+                for i in range(self.rounds):
+                    action(index, i)
+            except BaseException as exc:  # pragma: no cover - surfaced below
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=worker, args=(n,)) for n in range(self.threads)]
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        self.assertEqual(errors, [])
+
+    def assert_counter_consistent(self) -> int:
+        likes = Like.objects.filter(user=self.user, vacation=self.vacation).count()
+        self.assertLessEqual(likes, 1)
+        self.assertEqual(Vacation.objects.get(id=self.vacation.id).like_count, likes)
+        return likes
+
+    def test_concurrent_likes_insert_once(self) -> None:
+        self.hammer(lambda n, i: set_like(self.user.id, self.vacation.id))
+        self.assertEqual(self.assert_counter_consistent(), 1)
+
+    def test_concurrent_like_unlike_keeps_counter_exact(self) -> None:
+        def flip(n: int, i: int) -> None:
+            if (n + i) % 2:
+                set_like(self.user.id, self.vacation.id)
+            else:
+                clear_like(self.user.id, self.vacation.id)
+
+        self.hammer(flip)
+        self.assert_counter_consistent()
+
+
+class CurrentUserMiddlewareTests(VacationsTestCase):
+    def user_queries(self, method: str, url: str) -> List[str]:
+        with CaptureQueriesContext(connection) as ctx:
+            getattr(self.client, method)(url)
+        return [q["sql"] for q in ctx.captured_queries if 'FROM "vacations_user"' in q["sql"]]
+
+    def test_admin_pages_load_user_once(self) -> None:
+        self.login(self.admin)
+        urls = [
+            ("get", reverse("admin-vacation-list")),
+            ("get", reverse("vacation-add-form")),
+            ("get", reverse("edit-vacation-page", args=[self.vacations[0].id])),
+            ("get", reverse("vacation-edit-api", args=[self.vacations[0].id])),
+        ]
+        for method, url in urls:
+            queries = self.user_queries(method, url)
+            self.assertEqual(len(queries), 1, url)
+            self.assertIn('"vacations_role"', queries[0])
+
+    def test_context_processor_reuses_loaded_user(self) -> None:
+        self.login(self.admin)
+        processors = settings.TEMPLATES[0]["OPTIONS"]["context_processors"] + [
+            "vacations.context_processors.current_user_full_name",
+        ]
+        templates = [{**settings.TEMPLATES[0], "OPTIONS": {"context_processors": processors}}]
+        with self.settings(TEMPLATES=templates):
+            queries = self.user_queries("get", reverse("admin-vacation-list"))
+            response = self.client.get(reverse("admin-vacation-list"))
+        self.assertEqual(len(queries), 1)
+        self.assertContains(response, "Hello, Admin User")
+
+    def test_non_staff_and_anonymous_are_rejected(self) -> None:
+        self.assertEqual(self.client.get(reverse("admin-vacation-list")).status_code, 302)
+        self.login(self.user)
+        self.assertEqual(self.client.get(reverse("admin-vacation-list")).status_code, 403)
+        self.assertEqual(
+            self.client.delete(reverse("vacation-delete", args=[self.vacations[0].id])).status_code, 403
+        )
+
+
+class VacationListETagTests(VacationsTestCase):
+    def get(self, etag: str = "", **params):
+        headers = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+        return self.client.get(reverse("api-vacation-list"), params, **headers)
+
+    def test_304_touches_no_data_tables(self) -> None:
+        self.login(self.user)
+        etag = self.get()["ETag"]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.get(etag)
+        self.assertEqual(response.status_code, 304)
+        data = [q["sql"] for q in ctx.captured_queries if '"vacations_' in q["sql"] and "dataversion" not in q["sql"]]
+        self.assertEqual(data, [])
+
+    def test_like_and_vacation_writes_change_etag(self) -> None:
+        self.login(self.user)
+        etag = self.get()["ETag"]
+        set_like(self.user.id, self.vacations[1].id)
+        self.assertEqual(self.get(etag).status_code, 200)
+
+        etag = self.get()["ETag"]
+        Vacation.objects.filter(id=self.vacations[2].id).update(price="999.00")
+        self.assertEqual(self.get(etag).status_code, 200)
+
+    def test_raw_sql_writes_change_etag(self) -> None:
+        # Writers outside this process (the stats service, psql) only reach
+        # the counters through the database triggers.
+        etag = self.get()["ETag"]
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE vacations_vacation SET price = price + 1 WHERE id = %s", [self.vacations[0].id])
+        response = self.get(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+        etag = response["ETag"]
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE vacations_vacation SET price = price WHERE id = 0")
+        self.assertEqual(self.get(etag).status_code, 304)
+
+    def test_etag_depends_on_user_and_query(self) -> None:
+        anonymous = self.get()["ETag"]
+        self.assertNotEqual(self.get(limit=2)["ETag"], anonymous)
+        self.login(self.user)
+        self.assertEqual(self.get(anonymous).status_code, 200)
+
+
+class VacationFilterTests(VacationsTestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        super().setUpTestData()
+        japan = Country.objects.create(name="Japan")
+        cls.beach = Vacation.objects.create(
+            country=japan, description="Sunny beaches and quiet islands",
+            start_date=date.today() + timedelta(days=60), end_date=date.today() + timedelta(days=70),
+            price="800.00", image_filename="beach.jpg",
+        )
+
+    def ids(self, **params) -> List[int]:
+        response = self.client.get(reverse("api-vacation-list"), {"all": "true", **params})
+        self.assertEqual(response.status_code, 200)
+        return [v["id"] for v in response.json()]
+
+    def test_filters(self) -> None:
+        self.assertEqual(self.ids(country=self.beach.country_id), [self.beach.id])
+        self.assertEqual(self.ids(max_price="1000"), [self.beach.id])
+        self.assertEqual(self.ids(min_price="1000"), [v.id for v in self.vacations])
+        self.assertEqual(
+            self.ids(date_from=self.vacations[1].start_date, date_to=self.vacations[2].end_date),
+            [self.vacations[1].id, self.vacations[2].id],
+        )
+
+    def test_full_text_search_on_description(self) -> None:
+        # English stemming: "beach" matches "beaches", "island" matches "islands".
+        self.assertEqual(self.ids(q="beach"), [self.beach.id])
+        self.assertEqual(self.ids(q="quiet island"), [self.beach.id])
+        self.assertEqual(self.ids(q="mountains"), [])
+
+    def test_filters_combine_with_pagination(self) -> None:
+        data = self.client.get(reverse("api-vacation-list"), {"min_price": "1000", "limit": 2}).json()
+        self.assertEqual([v["id"] for v in data["results"]], [v.id for v in self.vacations[:2]])
+        self.assertIsNotNone(data["next_cursor"])
+
+    def test_invalid_filters(self) -> None:
+        for params in (
+            {"date_from": "2030-01-02", "date_to": "2030-01-01"},
+            {"min_price": "10", "max_price": "5"},
+            {"country": "x"},
+        ):
+            response = self.client.get(reverse("api-vacation-list"), params)
+            self.assertEqual(response.status_code, 400, params)
+
+
+class DataCommandTests(VacationsTestCase):
+    def test_init_data_bulk_inserts(self) -> None:
+        out = StringIO()
+        with CaptureQueriesContext(connection) as ctx:
+            call_command("init_data", stdout=out)
+        self.assertIn("initialized", out.getvalue())
+        self.assertEqual((User.objects.count(), Country.objects.count(), Vacation.objects.count()), (2, 10, 12))
+        inserts = [q for q in ctx.captured_queries if q["sql"].startswith("INSERT")]
+        self.assertEqual(len(inserts), 4)
+
+    def test_generate_load_data(self) -> None:
+        before = Vacation.objects.count()
+        out = StringIO()
+        call_command("generate_load_data", users=30, vacations=40, likes=300, seed=3, stdout=out)
+
+        self.assertIn("rows/sec", out.getvalue())
+        new = Vacation.objects.order_by("id")[before:]
+        counts = sorted((v.like_count for v in new), reverse=True)
+        self.assertEqual(sum(counts), 300)
+        self.assertEqual(Like.objects.filter(vacation__in=new).count(), 300)
+        self.assertEqual(sum(LikeRollup.objects.filter(vacation__in=new).values_list("likes", flat=True)), 300)
+        # Skewed: the most liked vacation has several times the median.
+        self.assertGreater(counts[0], 3 * counts[len(counts) // 2])
+
+    def test_generate_load_data_rejects_impossible_likes(self) -> None:
+        with self.assertRaises(CommandError):
+            call_command("generate_load_data", users=2, vacations=2, likes=5, stdout=StringIO())
+
+
+class SessionTests(VacationsTestCase):
+    def create_session(self, expires_in: timedelta) -> str:
+        store = SessionStore()
+        store["user_id"] = self.user.id
+        store.create()
+        Session.objects.filter(session_key=store.session_key).update(
+            expire_date=timezone.now() + expires_in
+        )
+        return store.session_key
+
+    def test_purge_deletes_only_expired_rows_in_batches(self) -> None:
+        expired = [self.create_session(timedelta(days=-1)) for _ in range(5)]
+        live = self.create_session(timedelta(days=1))
+
+        out = StringIO()
+        with CaptureQueriesContext(connection) as ctx:
+            call_command("purge_sessions", batch_size=2, stdout=out)
+
+        self.assertIn("Purged 5", out.getvalue())
+        self.assertFalse(Session.objects.filter(session_key__in=expired).exists())
+        self.assertTrue(Session.objects.filter(session_key=live).exists())
+        deletes = [q for q in ctx.captured_queries if q["sql"].startswith("DELETE")]
+        self.assertEqual(len(deletes), 3)
+
+    @override_settings(SESSION_ENGINE="django.contrib.sessions.backends.cached_db")
+    def test_cached_db_skips_session_table(self) -> None:
+        self.login(self.user)
+        self.client.get(reverse("api-vacation-list"))
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("api-vacation-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([q for q in ctx.captured_queries if '"django_session"' in q["sql"]])
+
+
+class QueryPlanTests(VacationsTestCase):
+    def test_hot_queries_use_indexes(self) -> None:
+        out = StringIO()
+        call_command("check_query_plans", seed=20000, stdout=out)
+        self.assertIn("All hot queries use an index", out.getvalue())
+        self.assertEqual(Vacation.objects.count(), 3)
+
+
+@override_settings(QUERY_BUDGET_ACTION="raise")
+class QueryBudgetTests(VacationsTestCase):
+    """Every vacations view stays within its declared statement budget."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        super().setUpTestData()
+        # Enough rows and countries for an N+1 to blow any budget.
+        for i in range(4):
+            cls.country = Country.objects.create(name=f"Country {i}")
+            for vacation in cls.create_vacations(5):
+                add_like(cls.user.id, vacation.id)
+
+    def vacation_form(self) -> dict:
+        start = date.today() + timedelta(days=60)
+        return {
+            "country": self.country.id, "country_id": self.country.id, "description": "Budget trip",
+            "start_date": start.isoformat(), "end_date": (start + timedelta(days=5)).isoformat(),
+            "price": "900", "image_filename": "budget.jpg",
+        }
+
+    def test_every_view_declares_a_budget(self) -> None:
+        import importlib
+        import inspect
+        import pkgutil
+        from django.views import View
+        import vacations.api.views as views_package
+        from vacations.query_budget import QUERY_BUDGETS
+
+        for module_info in pkgutil.iter_modules(views_package.__path__):
+            module = importlib.import_module(f"{views_package.__name__}.{module_info.name}")
+            for name, view in inspect.getmembers(module, inspect.isclass):
+                if issubclass(view, View) and view.__module__ == module.__name__:
+                    self.assertIn(f"{module.__name__}.{name}", QUERY_BUDGETS)
+
+    def test_admin_requests_within_budget(self) -> None:
+        self.login(self.admin)
+        vacation = self.vacations[1]
+        requests = [
+            ("get", reverse("admin-vacation-list"), None),
+            ("get", reverse("vacation-add-form"), None),
+            ("post", reverse("vacation-add-form"), self.vacation_form()),
+            ("post", reverse("vacation-add"), self.vacation_form()),
+            ("get", reverse("edit-vacation-page", args=[vacation.id]), None),
+            ("post", reverse("edit-vacation-page", args=[vacation.id]), self.vacation_form()),
+            ("get", reverse("vacation-edit-api", args=[vacation.id]), None),
+            ("delete", reverse("vacation-delete", args=[self.vacations[2].id]), None),
+        ]
+        for method, url, data in requests:
+            response = getattr(self.client, method)(url, data) if data else getattr(self.client, method)(url)
+            self.assertLess(response.status_code, 400, url)
+        response = self.client.put(
+            reverse("vacation-edit-api", args=[vacation.id]),
+            {k: v for k, v in self.vacation_form().items() if k not in ("country", "country_id")},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_user_requests_within_budget(self) -> None:
+        self.login(self.user)
+        liked, unliked = self.vacations[0], self.vacations[1]
+        requests = [
+            ("get", reverse("vacation-list"), {}),
+            ("get", reverse("vacation-list"), {"all": "true"}),
+            ("get", reverse("api-vacation-list"), {}),
+            ("get", reverse("api-vacation-list"), {"all": "true", "q": "trip"}),
+            ("get", reverse("vacation-detail", args=[liked.id]), {}),
+            ("post", reverse("vacation-like", args=[unliked.id]), {}),
+            ("delete", reverse("vacation-like", args=[unliked.id]), {}),
+            ("put", reverse("vacation-like", args=[unliked.id]), {}),
+            ("post", reverse("vacation-unlike", args=[liked.id]), {}),
+        ]
+        for method, url, params in requests:
+            response = getattr(self.client, method)(url, params) if method == "get" else getattr(self.client, method)(url)
+            self.assertLess(response.status_code, 400, url)
+        response = self.client.post(
+            reverse("like-batch"), {"like": [liked.id], "unlike": [unliked.id]}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_auth_requests_within_budget(self) -> None:
+        for name in ("home", "login-form", "register-form"):
+            self.assertEqual(self.client.get(reverse(name)).status_code, 200)
+        credentials = {"email": self.user.email, "password": self.user.password}
+        self.assertEqual(self.client.post(reverse("user-login"), credentials).status_code, 302)
+        self.assertEqual(self.client.post(reverse("logout")).status_code, 302)
+        self.assertEqual(
+            self.client.post(reverse("api-user-login"), credentials, content_type="application/json").status_code, 200
+        )
+        registration = {"first_name": "New", "last_name": "User", "password": "secret123"}
+        response = self.client.post(
+            reverse("user-register"), {**registration, "email": "new1@example.com"}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 201)
+        response = self.client.post(reverse("register-form"), {**registration, "email": "new2@example.com"})
+        self.assertEqual(response.status_code, 302)
+
+    def test_over_budget_request_is_logged_or_raised(self) -> None:
+        from unittest import mock
+        from vacations.api.views.admin_vacation_view import AdminVacationListView
+        from vacations.query_budget import QueryBudgetExceeded
+
+        self.login(self.admin)
+        with mock.patch.object(AdminVacationListView, "query_budget", 1):
+            with self.assertRaisesMessage(QueryBudgetExceeded, "AdminVacationListView ran 3 SQL statements"):
+                self.client.get(reverse("admin-vacation-list"))
+            with self.settings(QUERY_BUDGET_ACTION="log"), self.assertLogs("vacations.query_budget") as logs:
+                self.assertEqual(self.client.get(reverse("admin-vacation-list")).status_code, 200)
+        self.assertIn('FROM "vacations_vacation"', logs.output[0])
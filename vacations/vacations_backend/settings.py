@@ -21,10 +21,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "vacations.query_budget.QueryBudgetMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "vacations.middleware.CurrentUserMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
 ]
 
@@ -47,6 +49,19 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "vacations_backend.wsgi.application"
 
+# Connection reuse: a psycopg3 pool (DB_POOL=1) or persistent per-worker
+# connections (DB_CONN_MAX_AGE seconds). Django rejects both at once.
+# Health checks validate a reused connection (or pooled one) before use.
+DB_POOL = os.environ.get("DB_POOL", "0").lower() in ("1", "true", "yes", "on")
+DB_CONN_HEALTH_CHECKS = os.environ.get("DB_CONN_HEALTH_CHECKS", "1").lower() in ("1", "true", "yes", "on")
+DB_OPTIONS = {}
+if DB_POOL:
+    DB_OPTIONS["pool"] = {
+        "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", 2)),
+        "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", 10)),
+        "timeout": float(os.environ.get("DB_POOL_TIMEOUT", 10)),
+    }
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -55,9 +70,35 @@ DATABASES = {
         "PASSWORD": os.environ.get("DB_PASSWORD", "123456"),
         "HOST": os.environ.get("DB_HOST", "database"),
         "PORT": os.environ.get("DB_PORT", 5432),
+        "CONN_MAX_AGE": 0 if DB_POOL else int(os.environ.get("DB_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": DB_CONN_HEALTH_CHECKS,
+        "OPTIONS": DB_OPTIONS,
+    }
+}
+
+# Shared with the stats backend when CACHE_BACKEND=db. Not needed for
+# invalidation: writes bump vacations_dataversion from database triggers.
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "locmem")
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "django_cache",
+    } if CACHE_BACKEND == "db" else {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "vacations",
     }
 }
 
+# SESSION_MODE: "db" (default) or "cached_db" (local cache in front of the
+# table). Expired rows are purged with: python manage.py purge_sessions
+SESSION_ENGINE = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+}[os.environ.get("SESSION_MODE", "db")]
+
+# Query budgets (vacations.query_budget): "log", "raise" or "off".
+QUERY_BUDGET_ACTION = os.environ.get("QUERY_BUDGET_ACTION", "log" if DEBUG else "off")
+
 LANGUAGE_CODE = "en-us"
 TIME_ZONE = "UTC"
 USE_I18N = True
@@ -9,7 +9,7 @@ from vacations.api.views.vacation_api_view import (
     EditVacationView,
     DeleteVacationView
 )
-from vacations.api.views.like_view import LikeVacationView, UnlikeVacationView
+from vacations.api.views.like_view import LikeVacationView, UnlikeVacationView, LikeBatchView
 from vacations.api.views.vacation_detail_view import VacationDetailView
 from vacations.api.views.admin_vacation_view import AdminVacationListView
 from vacations.api.views.edit_vacation_view import EditVacationPageView
@@ -43,5 +43,6 @@ urlpatterns = [
   
    path('api/vacations/<int:vacation_id>/like/', LikeVacationView.as_view(), name='vacation-like'),
    path('api/vacations/<int:vacation_id>/unlike/', UnlikeVacationView.as_view(), name='vacation-unlike'),
+   path('api/likes/batch/', LikeBatchView.as_view(), name='like-batch'),
 
 ]
@@ -0,0 +1,33 @@
+"""
+Data-version tracking for derived data (cached statistics, ETags).
+
+Every statement that changes vacations, likes, users (or roles),
+countries or stats snapshots bumps that table's counter in
+``vacations_dataversion``, from a statement trigger running in the writing
+transaction (migration 0008).
+So every writer is covered, whichever service, raw SQL, COPY or psql
+session it comes from, and a counter only moves once the data it
+describes is committed. The counters are read from the database rather
+than a process-local cache.
+
+Readers derive ETags and cache keys from the counters of the tables a
+response reads, so unrelated writes keep them valid.
+"""
+from typing import Dict
+from vacations.models import DataVersion
+
+TABLES = ("vacation", "like", "user", "country", "snapshot")
+
+
+def get_table_versions(*tables: str) -> Dict[str, int]:
+    """
+    Return the change counters of the given tables in one query.
+
+    A missing row (tables flushed by a test run) reads as all zeros; the
+    next write recreates it with clock-seeded counters.
+
+    :param tables: Names from TABLES (model names, e.g. "vacation")
+    :return: Dict of table name to counter
+    """
+    row = DataVersion.objects.filter(pk=1).values(*tables).first()
+    return {table: int(row[table]) if row else 0 for table in tables}